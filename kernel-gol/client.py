@@ -7,7 +7,6 @@ print("kernel-gol/client.py #################################################")
 print("######################################################################")
 import argparse
 import atexit
-import itertools as it
 import json
 import logging
 import os
@@ -36,47 +35,6 @@ def removeprefix(text: str, prefix: str) -> str:
     return text
 
 
-def assemble_binary_data(
-    raw_binary_data: "np.ndarray",
-    nWav: int,
-    verbose: bool = False,
-) -> "np.ndarray":
-    if verbose:
-        log(f"- begin assemble_binary_data...")
-        log(f"  - raw_binary_data.dtype={raw_binary_data.dtype}")
-        log(f"  - raw_binary_data.shape={raw_binary_data.shape}")
-        log(f"  - raw_binary_data.flat[:nWav]={raw_binary_data.flat[:nWav]}")
-        log(f"  - nWav={nWav} verbose={verbose}")
-
-        for word in range(nWav):
-            log(f"---------------------------------------- binary word {word}")
-            values = (inner[word] for outer in raw_binary_data for inner in outer)
-            log(str([*it.islice(values, 10)]))
-
-    binary_ints = np.ascontiguousarray(raw_binary_data.astype(">u4").ravel())
-    assert binary_ints.shape == (nRow * nCol * nWav,)
-    if verbose:
-        log("------------------------------------------------ binary u32 ints")
-        for binary_int in binary_ints[:10]:
-            log(f"{len(binary_ints)=} {binary_int=}")
-
-    binary_strings = binary_ints.view(f'V{nWav * 4}')
-    assert binary_strings.shape == (nRow * nCol, )
-    if verbose:
-        log("------------------------------------------------- binary strings")
-        log(f"  - target dtype: V{nWav * 4}")
-        for binary_string in binary_strings[:10]:
-            log(f"{binary_string=}")
-
-    return binary_strings
-
-
-def assemble_state_data(
-        data: "np.ndarray", verbose: bool = False
-) -> "np.ndarray":
-    return assemble_binary_data(data, nWav=nWav, verbose=verbose)
-
-
 def create_initial_state(state_type, x_dim, y_dim):
   """Generate intitial state for Game of Life"""
 
@@ -201,7 +159,7 @@ temp_dir = f"{os.getenv('WSE_GOL_LOCAL_PATH', 'local')}/tmp/{uuid.uuid4()}"
 os.makedirs(temp_dir, exist_ok=True)
 atexit.register(shutil.rmtree, temp_dir, ignore_errors=True)
 log(f"  - {temp_dir=}")
-log("- installing polars")
+log("- installing polars and pyarrow")
 for attempt in range(4):
     try:
         subprocess.check_call(
@@ -211,6 +169,7 @@ for attempt in range(4):
                 f"--target={temp_dir}",
                 "--no-cache-dir",
                 "polars==1.6.0",
+                "pyarrow==17.0.0",
             ],
             env={
                 **os.environ,
@@ -244,34 +203,26 @@ from cerebras.sdk.runtime.sdkruntimepybind import (
     SdkRuntime,
 )  # pylint: disable=no-name-in-module
 
-log("- defining helper functions")
-def write_parquet_verbose(df: pl.DataFrame, file_name: str) -> None:
-    log(f"saving df to {file_name=}")
-    log(f"- {df.shape=}")
-
-    tmp_file = f"{os.getenv('WSE_GOL_LOCAL_PATH', 'local')}/tmp.pqt"
-    df.write_parquet(tmp_file, compression="lz4")
-    log("- write_parquet complete")
-
-    file_size_mb = os.path.getsize(tmp_file) / (1024 * 1024)
-    log(f"- saved file size: {file_size_mb:.2f} MB")
-
-    lazy_frame = pl.scan_parquet(tmp_file)
-    log("- LazyFrame describe:")
-    log(lazy_frame.describe())
-
-    original_row_count = df.shape[0]
-    lazy_row_count = lazy_frame.select(pl.count()).collect().item()
-    assert lazy_row_count == original_row_count, (
-        f"Row count mismatch between original and lazy frames: "
-        f"{original_row_count=}, {lazy_row_count=}"
-    )
-
-    shutil.copy(tmp_file, file_name)
-    log(f"- copy {tmp_file} to destination {file_name} complete")
-
-    log("- verbose save complete!")
+log("- importing pylib dependencies")
+# execute.sh stages standalone pylib modules into the local path
+sys.path.append(os.getenv("WSE_GOL_LOCAL_PATH", "local"))
+from _fossil_surfaces import SnapshotWriter, write_surfaces
+log("  - _fossil_surfaces")
+from _gol_kernel_emulator import diff_states, emulate_header
+log("  - _gol_kernel_emulator")
+from _grid_render import (
+    BRAILLE_CELL_SHAPE,
+    braille_image,
+    cells_image,
+    image_text,
+)
+log("  - _grid_render")
+from _parquet_output import VERIFY_MODES
+log("  - _parquet_output")
+from _tile_layout import device_to_planes
+log("  - _tile_layout")
 
+log("- defining helper functions")
 # adapted from https://stackoverflow.com/a/31347222/17332200
 def add_bool_arg(parser, name, default=False):
     group = parser.add_mutually_exclusive_group(required=False)
@@ -279,98 +230,6 @@ def add_bool_arg(parser, name, default=False):
     group.add_argument("--no-" + name, dest=name, action="store_false")
     parser.set_defaults(**{name: default})
 
-def draw_unicode(
-    grid: "np.ndarray",
-    total_rows: int,
-    total_cols: int,
-    max_render_rows: int = None,
-    max_render_cols: int = None,
-) -> str:
-    """
-    Renders the grid as Unicode Braille art.
-    Expects grid with shape (total_cols, total_rows).
-    """
-
-    # Determine render dimensions
-    render_rows = total_rows
-    if max_render_rows is not None:
-        render_rows = min(total_rows, max_render_rows)
-
-    render_cols = total_cols
-    if max_render_cols is not None:
-        render_cols = min(total_cols, max_render_cols)
-
-    # Helper to safely get a cell value (handles out-of-bounds)
-    def get_cell(r: int, c: int) -> int:
-        # Check against *total* dims
-        if r < total_rows and c < total_cols:
-            return grid[r][c] # Access as [row][col]
-        return 0  # Treat out-of-bounds as 'off'
-
-    output = []
-    # Iterate in 4-row, 2-column steps
-    for r in range(0, render_rows, 4):
-        line = ""
-        for c in range(0, render_cols, 2):
-            val = 0
-
-            # Braille dot mapping (base Unicode 0x2800)
-            # Left column dots (1, 2, 3, 7)
-            if get_cell(r, c):     val |= 0x01 # dot 1
-            if get_cell(r + 1, c): val |= 0x02 # dot 2
-            if get_cell(r + 2, c): val |= 0x04 # dot 3
-            if get_cell(r + 3, c): val |= 0x40 # dot 7
-
-            # Right column dots (4, 5, 6, 8)
-            if get_cell(r, c + 1):     val |= 0x08 # dot 4
-            if get_cell(r + 1, c + 1): val |= 0x10 # dot 5
-            if get_cell(r + 2, c + 1): val |= 0x20 # dot 6
-            if get_cell(r + 3, c + 1): val |= 0x80 # dot 8
-
-            # 0x2800 is the Unicode offset for the blank Braille pattern
-            line += chr(0x2800 + val)
-
-        output.append(line)
-
-    return "\n".join(output)
-
-
-def draw_ascii(
-    grid: "np.ndarray",
-    total_rows: int,
-    total_cols: int,
-    max_render_rows: int = None,
-    max_render_cols: int = None,
-) -> str:
-    """
-    Renders the grid as ASCII art (O for alive, . for dead).
-    Expects grid with shape (total_cols, total_rows).
-    """
-    render_rows = total_rows
-    if max_render_rows is not None:
-        render_rows = min(total_rows, max_render_rows)
-
-    render_cols = total_cols
-    if max_render_cols is not None:
-        render_cols = min(total_cols, max_render_cols)
-
-    cells_lines = []
-    for r in range(render_rows):
-        line = ""
-        for c in range(render_cols):
-            # grid shape is (total_cols, total_rows)
-            val = 0
-            # Check against *total* dims to avoid wrapping
-            if r < total_rows and c < total_cols:
-                val = grid[r][c]  # Access as [row][col]
-            else:
-                val = 0 # Out of bounds
-
-            line += "O" if val else "."
-        cells_lines.append(line)
-    return "\n".join(cells_lines)
-
-
 log("- reading env variables")
 # number of rows, columns, and genome words
 nCol = int(os.getenv("WSE_GOL_NCOL", 3))
@@ -401,6 +260,13 @@ log("- configuring argparse")
 parser = argparse.ArgumentParser()
 parser.add_argument("--name", help="the test compile output dir", default="out")
 add_bool_arg(parser, "suptrace", default=True)
+# diff against host emulator; warns only, unless --emucheck-strict
+add_bool_arg(parser, "emucheck", default=True)
+parser.add_argument(
+    "--emucheck-strict",
+    action="store_true",
+    help="exit nonzero if device states differ from host emulation",
+)
 parser.add_argument("--cmaddr", help="IP:port for CS system")
 parser.add_argument(
     '--initial-state',
@@ -408,8 +274,36 @@ parser.add_argument(
     default='glider',
 )
 parser.add_argument("--ncycle", default=40, type=int, help="run duration")
+parser.add_argument(
+    "--parquet-verify",
+    choices=VERIFY_MODES,
+    default="rows",
+    help="check written row counts, or also describe() written files",
+)
+parser.add_argument(
+    "--surface-format",
+    choices=["hex", "binary"],
+    default="hex",
+    help="store surfaces as hex text (data_hex) or raw bytes (data_raw)",
+)
+parser.add_argument(
+    "--snapshot-every",
+    default=0,
+    type=int,
+    help="also save surfaces every this many generations, if nonzero",
+)
+parser.add_argument(
+    "--chunk-rows",
+    default=64,
+    type=int,
+    help="PE rows per output row group, which bounds host memory",
+)
 log("- parsing arguments")
 args = parser.parse_args()
+# the kernel counts iterations in u16, and each resume extends the same
+# count, so every segment of a run must end within it
+if not 0 <= args.ncycle <= 0xFFFF:
+    parser.error(f"--ncycle {args.ncycle} is outside the kernel's u16 range")
 
 log("args =======================================================")
 log(args)
@@ -486,15 +380,19 @@ log(f"initial_state sum: {initial_state.ravel().sum()}")
 log(f"initial_state shape: {initial_state.shape}")
 log(f"initial_state dtype: {initial_state.dtype}")
 
+# render each image once, and crop 100x100 renders from it
+initial_braille = braille_image(initial_state)
+initial_cells = cells_image(initial_state)
+
 log("\npartial initial unicode rendering (100x100)")
-partial_initial_render = draw_unicode(
-    initial_state, nRow, nCol, max_render_rows=100, max_render_cols=100
+partial_initial_render = image_text(
+    initial_braille, 100, 100, cell_shape=BRAILLE_CELL_SHAPE
 )
 log(partial_initial_render)
 
 log("Saving initial render snapshots...")
 # 1. Initial Unicode (Full) (.txt)
-initial_full_output_render = draw_unicode(initial_state, nRow, nCol)
+initial_full_output_render = image_text(initial_braille)
 filename = "a=render-unicode+what=initial+ext=.txt"
 log(f"  - Saving full initial Unicode render to {filename} ...")
 pathlib.Path(filename).write_text(initial_full_output_render)
@@ -508,16 +406,14 @@ pathlib.Path(filename).write_text(partial_initial_render)
 log("  - ... done!")
 
 # 3. Initial Cells (Full) (.cells)
-initial_full_cells_render = draw_ascii(initial_state, nRow, nCol)
+initial_full_cells_render = image_text(initial_cells)
 filename = "a=render-cells+what=initial+ext=.cells"
 log(f"  - Saving full initial .cells render to {filename} ...")
 pathlib.Path(filename).write_text(initial_full_cells_render)
 log("  - ... done!")
 
 # 4. Initial Cells (100x100) (.cells)
-initial_render_100x100_cells = draw_ascii(
-    initial_state, nRow, nCol, max_render_rows=100, max_render_cols=100
-)
+initial_render_100x100_cells = image_text(initial_cells, 100, 100)
 filename = "a=render-cells+what=initial+render-rows=100+render-cols=100+ext=.cells"
 log(f"  - Saving 100x100 initial .cells render to {filename}")
 pathlib.Path(filename).write_text(initial_render_100x100_cells)
@@ -530,24 +426,67 @@ log(f"initial_state raw (up to 10x10): \n{initial_state[:10,:10]}")
 runner.memcpy_h2d(states_symbol, initial_state.flatten(), 0, 0, x_dim, y_dim, 1,
 streaming=False, order=MemcpyOrder.ROW_MAJOR, data_type=MemcpyDataType.MEMCPY_32BIT,nonblock=False)
 
+states_result = np.zeros([x_dim * y_dim * nWav], dtype=np.uint32)
+
 log(f'Run for {nCycleAtLeast} generations...')
-if nCycleAtLeast != 0:
-    # Launch the generate function on device
-    runner.launch('generate', np.uint16(nCycleAtLeast), nonblock=False)
+if nCycleAtLeast != 0 and 0 < args.snapshot_every < nCycleAtLeast:
+    # Run in segments, copying states off between them; each copy is queued
+    # behind its segment, and the next segment behind the copy, so the
+    # device stays busy while the host writes the previous snapshot
+    n_full, remainder = divmod(nCycleAtLeast, args.snapshot_every)
+    segments = [args.snapshot_every] * n_full + [remainder] * bool(remainder)
+    assert segments[0] > 1, "generate exits only after its first generation"
+    log(f" - snapshotting every {args.snapshot_every} generations")
+    buffers = [np.zeros_like(states_result) for __ in range(2)]
+    snapshots = SnapshotWriter(
+        "a=surfaces+i={surface}+what=snapshot+cycle={cycle}+ext=.pqt",
+        n_surf=nSurf,
+        surf_wavs=surfWavs,
+        dstream_algo=dstream_algo,
+        metadata=metadata,
+        log=log,
+        chunk_rows=args.chunk_rows,
+        data_format=args.surface_format,
+        verify=args.parquet_verify,
+    )
+    pending = None
+    cycle = 0
+    for k, segment in enumerate(segments):
+        runner.launch(
+            'generate' if k == 0 else 'resume', np.uint16(segment), nonblock=True
+        )
+        cycle += segment
+        buffer = buffers[k % 2]
+        snapshots.wait()  # buffer free once its previous snapshot is written
+        copy = runner.memcpy_d2h(buffer, states_symbol, 0, 0, x_dim, y_dim, nWav, streaming=False,
+        order=MemcpyOrder.ROW_MAJOR, data_type=MemcpyDataType.MEMCPY_32BIT, nonblock=True)
+        if pending is not None:
+            pending_copy, pending_buffer, pending_cycle = pending
+            runner.task_wait(pending_copy)
+            snapshots.submit(
+                pending_buffer.reshape((y_dim, x_dim, nWav)), pending_cycle
+            )
+        pending = (copy, buffer, cycle)
+
+    # final states are written below, as for an unsegmented run
+    runner.task_wait(pending[0])
+    states_result[:] = pending[1]
+    snapshots.close()
+else:
+    if nCycleAtLeast != 0:
+        # Launch the generate function on device
+        runner.launch('generate', np.uint16(nCycleAtLeast), nonblock=False)
 
-# Copy states back
-states_result = np.zeros([x_dim * y_dim * nWav], dtype=np.uint32)
-runner.memcpy_d2h(states_result, states_symbol, 0, 0, x_dim, y_dim, nWav, streaming=False,
-order=MemcpyOrder.ROW_MAJOR, data_type=MemcpyDataType.MEMCPY_32BIT, nonblock=False)
+    # Copy states back
+    runner.memcpy_d2h(states_result, states_symbol, 0, 0, x_dim, y_dim, nWav, streaming=False,
+    order=MemcpyOrder.ROW_MAJOR, data_type=MemcpyDataType.MEMCPY_32BIT, nonblock=False)
 
 # Stop the program
 runner.stop()
 
 log('Log output...')
 # Reshape states results to x_dim x y_dim frames
-all_states = states_result.reshape(
-    (y_dim, x_dim, nWav),
-).transpose(2, 0, 1)
+all_states = device_to_planes(states_result, y_dim, x_dim, nWav)
 
 grid = all_states[0]
 log(f"num cells set 1: {grid.ravel().sum()}")
@@ -558,18 +497,22 @@ log(f"grid max: {grid.max()}")
 log(f"grid min: {grid.min()}")
 assert set(map(int, grid.ravel())).issubset({0, 1})
 
+# render each image once, and crop 100x100 renders from it
+final_braille = braille_image(grid)
+final_cells = cells_image(grid)
+
 log("\npartial output unicode rendering (100x100)")
-partial_output_render = draw_unicode(
-    grid, nRow, nCol, max_render_rows=100, max_render_cols=100
+partial_output_render = image_text(
+    final_braille, 100, 100, cell_shape=BRAILLE_CELL_SHAPE
 )
 log(partial_output_render)
 
 log("\nfull output unicode rendering")
-full_output_render = draw_unicode(grid, nRow, nCol)
+full_output_render = image_text(final_braille)
 log(full_output_render)
 
 log("Generating .cells ASCII art...")
-full_cells_render = draw_ascii(grid, nRow, nCol)
+full_cells_render = image_text(final_cells)
 log("... .cells ASCII art generated (first 10 lines):")
 log("\n".join(line[:10] for line in full_cells_render.split("\n")[:10]))
 
@@ -582,9 +525,8 @@ pathlib.Path(filename).write_text(full_output_render)
 log("  - ... done!")
 
 # 2. Final Unicode (100x100) (.txt)
-render_100x100_unicode = draw_unicode(
-    grid, nRow, nCol, max_render_rows=100, max_render_cols=100
-)
+# We already rendered this for the log
+render_100x100_unicode = partial_output_render
 filename = "a=render-unicode+what=final+render-rows=100+render-cols=100+ext=.txt"
 log(f"  - Saving 100x100 final Unicode render to {filename} ...")
 pathlib.Path(filename).write_text(render_100x100_unicode)
@@ -597,9 +539,7 @@ pathlib.Path(filename).write_text(full_cells_render)
 log("  - ... done!")
 
 # 4. Final Cells (100x100) (.cells)
-render_100x100_cells = draw_ascii(
-    grid, nRow, nCol, max_render_rows=100, max_render_cols=100
-)
+render_100x100_cells = image_text(final_cells, 100, 100)
 filename = (
     "a=render-cells+what=final+render-rows=100+render-cols=100+ext=.cells"
 )
@@ -611,79 +551,34 @@ log("  - ... done!")
 log("\nstate layers")
 log(all_states[:, :10, :10])  # log first 5x5 of each wave
 
-log("Build state dataframe...")
-# states_z = states_result.reshape((x_dim * y_dim, nWav))
-# log(states_z[:5, :])  # log first 5 rows
-# log(f" - states_z.dtype={states_z.dtype}")
-# log(f" - states_z.shape={states_z.shape}")
-
-log("- verbose assemble_state_data")
-assembled_state_data = assemble_state_data(
-   states_result.reshape((y_dim, x_dim, nWav)),
-   verbose=True,
+log("Build surface dataframes...")
+write_surfaces(
+    states_result.reshape((y_dim, x_dim, nWav)),
+    [f"a=surfaces+i={i}+ext=.pqt" for i in range(nSurf)],
+    surf_wavs=surfWavs,
+    dstream_algo=dstream_algo,
+    metadata=metadata,
+    chunk_rows=args.chunk_rows,
+    data_format=args.surface_format,
+    verify=args.parquet_verify,
+    log=log,
 )
-log(f"  - assembled_state_data.dtype={assembled_state_data.dtype}")
-log(f"  - assembled_state_data.shape={assembled_state_data.shape}")
-
-log(f" - casting assembled_state_data to object")
-assembled_state_data = assembled_state_data.astype(object)
-log(f"  - assembled_state_data.dtype={assembled_state_data.dtype}")
-log(f"  - assembled_state_data.shape={assembled_state_data.shape}")
-
-log(f" - reshaping assembled_state_data")
-assembled_state_data = assembled_state_data.reshape((y_dim, x_dim))
-log(f"  - assembled_state_data.dtype={assembled_state_data.dtype}")
-log(f"  - assembled_state_data.shape={assembled_state_data.shape}")
-
-log(" - creating indices")
-positions = np.arange(x_dim * y_dim, dtype=np.uint32).reshape((y_dim, x_dim))
-rows, cols = np.indices(assembled_state_data.shape)
-log(" - creating DataFrame")
-df = pl.DataFrame({
-    "data_raw": pl.Series(assembled_state_data.ravel(), dtype=pl.Binary),
-    "is_extant": True,
-    "position": pl.Series(positions.ravel(), dtype=pl.UInt32),
-    "row": pl.Series(rows.ravel(), dtype=pl.UInt16),
-    "col": pl.Series(cols.ravel(), dtype=pl.UInt16),
-}).with_columns([
-    pl.lit(value, dtype=dtype).alias(key)
-    for key, (value, dtype) in metadata.items()
-])
-log(f" - data_raw: {df['data_raw'].head(3)}")
-assert (df["data_raw"].bin.size(unit="b") == nWav * 4).all()
-
-log(f" - encoding {len(df)} binary fossil rows to hex...")
-df = df.with_columns(
-    data_hex=pl.col("data_raw").bin.encode("hex"),
-).drop("data_raw")
-log(f" - ... done!")
-
-log(f" - data_hex: {df['data_hex'].head(3)}")
-assert (df["data_hex"].str.len_chars() == nWav * 8).all()
-assert (df["data_hex"].str.len_bytes() == nWav * 8).all()
-assert (df["data_hex"].str.contains("^[0-9a-fA-F]+$")).all()
-
-for i in range(nSurf):
-    log(f"saving surface {i}")
-    data_slice = pl.concat_str(
-       pl.col("data_hex").str.head(16),  # GOL state and counter
-       pl.col("data_hex").str.slice(16 + 8 * i * surfWavs, surfWavs * 8),
-    )
-    df_surf = df.with_columns(
-        dstream_algo=pl.lit(dstream_algo, dtype=pl.Categorical),
-        dstream_storage_bitoffset=pl.lit(64, dtype=pl.UInt16),
-        dstream_storage_bitwidth=pl.lit(surfWavs * 32, dtype=pl.UInt16),
-        dstream_S=pl.lit(surfWavs * 32, dtype=pl.UInt16),
-        dstream_T_bitoffset=pl.lit(32, dtype=pl.UInt16),
-        dstream_T_bitwidth=pl.lit(32, dtype=pl.UInt16),
-        gol_state=pl.col("data_hex").str.slice(0, 8).str.to_integer(base=16),
-        data_hex=data_slice,
-    )
-    write_parquet_verbose(
-        df_surf,
-        f"a=surfaces+i={i}+ext=.pqt",
-    )
 
-del df, df_surf
+if args.emucheck:
+    log("Check against host emulation...")
+    mismatches = diff_states(
+        states_result.reshape((y_dim, x_dim, nWav)),
+        emulate_header(
+            initial_state, nCycleAtLeast, n_surf=nSurf, surf_wavs=surfWavs
+        ),
+    )
+    for mismatch in mismatches:
+        logging.warning(f"  - {mismatch}")
+    if mismatches and args.emucheck_strict:
+        sys.exit("device states differ from host emulation")
+    elif mismatches:
+        logging.warning("  - ... device states differ from host emulation!")
+    else:
+        log("  - ... device states match host emulation!")
 
 log("SUCCESS!")
@@ -16,6 +16,12 @@ echo "MYLOCAL ${MYLOCAL}"
 mkdir -p "${MYLOCAL}"
 touch "${MYLOCAL}/.touch"
 cp -r "../cerebraslib" "${MYLOCAL}/cerebraslib"
+cp "../pylib/_fossil_surfaces.py" "${MYLOCAL}/_fossil_surfaces.py"
+cp "../pylib/_genome_serializer.py" "${MYLOCAL}/_genome_serializer.py"
+cp "../pylib/_gol_kernel_emulator.py" "${MYLOCAL}/_gol_kernel_emulator.py"
+cp "../pylib/_grid_render.py" "${MYLOCAL}/_grid_render.py"
+cp "../pylib/_parquet_output.py" "${MYLOCAL}/_parquet_output.py"
+cp "../pylib/_tile_layout.py" "${MYLOCAL}/_tile_layout.py"
 
 export WSE_GOL_LOCAL_PATH=${WSE_GOL_LOCAL_PATH:-"/local"}
 echo "WSE_GOL_LOCAL_PATH ${WSE_GOL_LOCAL_PATH}"
@@ -0,0 +1,278 @@
+"""Per-surface fossil tables from kernel-gol device state words.
+
+Each PE's state is `n_header` words (GOL state and generation counter),
+followed by `n_surf` hereditary stratigraphic surfaces of `surf_wavs` words
+each. Tables are built band by band of grid rows, slicing each surface's
+words straight from the uint32 state array, so peak memory scales with
+band size rather than with grid size.
+
+Surface data is stored as column "data_hex", big-endian hex text, or, with
+`data_format` "binary", as column "data_raw", the same big-endian bytes
+unencoded. Binary output halves surface size and skips hex encoding and
+decoding. Readers can filter on raw bytes directly (e.g., finding blank
+surfaces with `pl.col("data_raw").bin.ends_with(bytes(n))`, in place of
+a regex over hex), and can recover the hex layout with `with_data_hex`.
+Bit offsets in the dstream columns count from the start of the data either
+way.
+
+This module imports only numpy at load time, so that standalone scripts
+(e.g., `kernel-gol/client.py`) can load it directly, alongside
+`_genome_serializer` and `_parquet_output`.
+"""
+
+import concurrent.futures
+import typing
+
+import numpy as np
+
+try:
+    from ._genome_serializer import (
+        binary_to_series,
+        genomes_to_binary,
+        genomes_to_hex,
+    )
+    from ._parquet_output import ParquetChunkWriter
+except ImportError:  # loaded standalone, outside of pylib
+    from _genome_serializer import (
+        binary_to_series,
+        genomes_to_binary,
+        genomes_to_hex,
+    )
+    from _parquet_output import ParquetChunkWriter
+
+DATA_FORMATS = ("hex", "binary")
+
+
+def surface_word_index(
+    surface: int, surf_wavs: int, n_header: int = 2
+) -> typing.List[int]:
+    """Indices of the header words and surface `surface`'s words within
+    each PE's state."""
+    first = n_header + surface * surf_wavs
+    return [*range(n_header), *range(first, first + surf_wavs)]
+
+
+def surface_frame(
+    band: np.ndarray,
+    row_offset: int,
+    surface: int,
+    surf_wavs: int,
+    dstream_algo: str,
+    metadata: typing.Dict[str, typing.Tuple[typing.Any, typing.Any]],
+    data_format: str = "hex",
+):
+    """Fossil table of surface `surface` over `band`, a `(n_band_row, n_col,
+    n_wav)` slice of device state starting at grid row `row_offset`.
+
+    Surface data holds the header words then the surface's words, in
+    `data_format`, and `metadata` maps column names to `(value, dtype)`
+    literals.
+    """
+    import polars as pl
+
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"{data_format=} not one of {DATA_FORMATS}")
+
+    n_band_row, n_col, __ = band.shape
+    n = n_band_row * n_col
+    first = row_offset * n_col
+    words = band[..., surface_word_index(surface, surf_wavs)]
+    data = (
+        {"data_hex": genomes_to_hex(words, byteorder=">")}
+        if data_format == "hex"
+        else {
+            "data_raw": binary_to_series(
+                genomes_to_binary(words, byteorder=">")
+            )
+        }
+    )
+    return (
+        pl.DataFrame(
+            {
+                "is_extant": np.ones(n, dtype=bool),
+                "position": pl.Series(
+                    np.arange(first, first + n), dtype=pl.UInt32
+                ),
+                "row": pl.Series(
+                    np.repeat(np.arange(n_band_row) + row_offset, n_col),
+                    dtype=pl.UInt16,
+                ),
+                "col": pl.Series(
+                    np.tile(np.arange(n_col), n_band_row), dtype=pl.UInt16
+                ),
+            }
+        )
+        .with_columns(
+            [
+                pl.lit(value, dtype=dtype).alias(key)
+                for key, (value, dtype) in metadata.items()
+            ]
+        )
+        .with_columns(
+            **data,
+            dstream_algo=pl.lit(dstream_algo, dtype=pl.Categorical),
+            dstream_storage_bitoffset=pl.lit(64, dtype=pl.UInt16),
+            dstream_storage_bitwidth=pl.lit(surf_wavs * 32, dtype=pl.UInt16),
+            dstream_S=pl.lit(surf_wavs * 32, dtype=pl.UInt16),
+            dstream_T_bitoffset=pl.lit(32, dtype=pl.UInt16),
+            dstream_T_bitwidth=pl.lit(32, dtype=pl.UInt16),
+            gol_state=pl.Series(band[..., 0].ravel().astype(np.int64)),
+        )
+    )
+
+
+def write_surfaces(
+    states: np.ndarray,
+    paths: typing.Sequence[str],
+    surf_wavs: int,
+    dstream_algo: str,
+    metadata: typing.Dict[str, typing.Tuple[typing.Any, typing.Any]],
+    chunk_rows: int = 64,
+    data_format: str = "hex",
+    verify: str = "rows",
+    log: typing.Callable[[str], None] = print,
+) -> None:
+    """Write each surface of `(n_row, n_col, n_wav)` device `states` to the
+    Parquet file at the corresponding entry of `paths`, appending one row
+    group per band of `chunk_rows` grid rows."""
+    writers = [
+        ParquetChunkWriter(path, verify=verify, log=log) for path in paths
+    ]
+    try:
+        for row in range(0, states.shape[0], chunk_rows):
+            band = states[row : row + chunk_rows]
+            for surface, writer in enumerate(writers):
+                writer.write(
+                    surface_frame(
+                        band,
+                        row,
+                        surface,
+                        surf_wavs,
+                        dstream_algo,
+                        metadata,
+                        data_format=data_format,
+                    )
+                )
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.close()
+
+
+def with_data_hex(frame):
+    """Hex-format view of a binary-format fossil table, or lazy table,
+    replacing column "data_raw" with "data_hex" in place."""
+    import polars as pl
+
+    return frame.with_columns(
+        pl.col("data_raw").bin.encode("hex").alias("data_hex")
+    ).select(
+        pl.col("data_hex") if name == "data_raw" else pl.col(name)
+        for name in frame.collect_schema().names()
+    )
+
+
+def diff_surface_files(expected: str, actual: str) -> typing.List[str]:
+    """Descriptions of where the surface data in the fossil table at Parquet
+    path `actual` differs from that at `expected`, empty if they agree.
+
+    Only per-PE columns are compared, as run metadata (e.g., "replicate"
+    and "nCycle") differs between runs.
+    """
+    import polars as pl
+
+    def read(path: str) -> pl.DataFrame:
+        frame = pl.read_parquet(path)
+        if "data_raw" in frame.columns:
+            frame = with_data_hex(frame)
+        return frame.select(
+            "position", "row", "col", "gol_state", "data_hex"
+        ).sort("position")
+
+    expected_, actual_ = read(expected), read(actual)
+    if expected_.shape != actual_.shape:
+        return [f"shape {expected_.shape=} != {actual_.shape=}"]
+
+    mismatches = []
+    for name in expected_.columns:
+        differs = expected_[name] != actual_[name]
+        if differs.any():
+            first = int(differs.arg_true()[0])
+            mismatches.append(
+                f"{name} differs at {int(differs.sum())} PEs, first at "
+                f"position={expected_['position'][first]}: "
+                f"expected={expected_[name][first]!r} "
+                f"actual={actual_[name][first]!r}"
+            )
+    return mismatches
+
+
+class SnapshotWriter:
+    """Writes surface files of device state snapshots from a background
+    thread, so that the device can keep running while earlier snapshots
+    are serialized.
+
+    Each snapshot's surfaces go to `path_format.format(surface=i,
+    cycle=cycle)`, with column "snapshotCycle" added to `metadata`. At most
+    one snapshot write is in flight; `wait` blocks until it completes, after
+    which its host buffer can be reused, so two buffers suffice to copy one
+    snapshot off the device while another is written. Write errors are
+    raised from the next `submit` or `wait`, or from `close`.
+    """
+
+    def __init__(
+        self,
+        path_format: str,
+        n_surf: int,
+        surf_wavs: int,
+        dstream_algo: str,
+        metadata: typing.Dict[str, typing.Tuple[typing.Any, typing.Any]],
+        log: typing.Callable[[str], None] = print,
+        **write_kwargs,
+    ) -> None:
+        self.path_format = path_format
+        self.n_surf = n_surf
+        self.surf_wavs = surf_wavs
+        self.dstream_algo = dstream_algo
+        self.metadata = metadata
+        self.log = log
+        self.write_kwargs = write_kwargs
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._pending: typing.Optional[concurrent.futures.Future] = None
+
+    def submit(self, states: np.ndarray, cycle: int) -> None:
+        """Queue a write of `(n_row, n_col, n_wav)` device `states`, which
+        must not be modified until the write completes."""
+        self.wait()
+        self._pending = self._executor.submit(self._write, states, cycle)
+
+    def wait(self) -> None:
+        """Block until any in-flight write completes."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+
+    def _write(self, states: np.ndarray, cycle: int) -> None:
+        import polars as pl
+
+        self.log(f"writing snapshot at {cycle=}")
+        write_surfaces(
+            states,
+            [
+                self.path_format.format(surface=i, cycle=cycle)
+                for i in range(self.n_surf)
+            ],
+            surf_wavs=self.surf_wavs,
+            dstream_algo=self.dstream_algo,
+            metadata={**self.metadata, "snapshotCycle": (cycle, pl.UInt32)},
+            log=self.log,
+            **self.write_kwargs,
+        )
@@ -0,0 +1,52 @@
+"""Vectorized serialization of per-tile genome words.
+
+Genomes go from a `(..., n_word)` uint32 array to one fixed-width byte
+string per tile through a `V{n}` view, then into Arrow/polars columns
+without creating per-tile Python objects. This module imports only numpy
+at load time, and uses no package-relative imports, so that standalone
+scripts (e.g., `kernel-gol/client.py`) can load it directly.
+"""
+
+import numpy as np
+
+
+def genomes_to_binary(genomes: np.ndarray, byteorder: str = "=") -> np.ndarray:
+    """View `(..., n_word)` genome words as a flat array of `V{4 * n_word}`
+    byte strings, one per tile, in row-major order over leading axes.
+
+    Words are laid out in `byteorder` (numpy notation, i.e., "=", "<", or
+    ">"); if already so laid out and contiguous, no copy is made.
+    """
+    n_word = genomes.shape[-1]
+    words = np.ascontiguousarray(
+        genomes.astype(np.dtype(np.uint32).newbyteorder(byteorder), copy=False)
+    )
+    return words.reshape(-1, n_word).view(f"V{4 * n_word}").ravel()
+
+
+def binary_to_series(binary: np.ndarray, name: str = ""):
+    """Polars Binary series over `V{n}` byte strings, built from one Arrow
+    buffer rather than per-element Python objects."""
+    import polars as pl
+    import pyarrow as pa
+
+    binary = np.ascontiguousarray(binary)
+    array = pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(binary.dtype.itemsize),
+        len(binary),
+        [None, pa.py_buffer(binary)],
+    )
+    return pl.Series(name, array, dtype=pl.Binary)
+
+
+def genomes_to_hex(
+    genomes: np.ndarray,
+    name: str = "",
+    byteorder: str = "=",
+    uppercase: bool = False,
+):
+    """Polars String series of fixed-width hex genome strings, one per tile,
+    as from `genomes_to_binary`."""
+    series = binary_to_series(genomes_to_binary(genomes, byteorder), name)
+    series = series.bin.encode("hex")
+    return series.str.to_uppercase() if uppercase else series
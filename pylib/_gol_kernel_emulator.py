@@ -0,0 +1,221 @@
+"""Host-side emulation of the kernel-gol device kernel.
+
+The kernel streams each PE's `n_wav` state words to its neighbors one word
+per iteration, so a launch of `generate(n_cycle)` performs one Game of Life
+generation every `n_wav` iterations, and all PEs update synchronously from
+their neighbors' previous states. Each PE's state is the GOL state word, a
+generation counter word, then `n_surf` hereditary stratigraphic surfaces of
+`surf_wavs` words each. Edges are bounded, so PEs beyond the grid are dead.
+
+On each generation, a dead PE is cleared to all zero words. A live PE takes
+counter value `S + generation`, for surface size `S` in bits. After the
+first generation, each of a live PE's surfaces is copied from a live
+neighbor or kept, if the PE was live, uniformly at random. Then one bit of
+each surface, at the site the dstream algorithm assigns to the counter
+value, is set at random.
+
+Only GOL state and counter words are emulated exactly. Surface contents
+are out of scope: they depend on the device PRNG (CSL `<random>`), which is
+not replayed here, so `emulate_states` draws surface bits from a host
+generator, and matches device surfaces in distribution only. Accordingly,
+`diff_states` checks GOL state and counter words exactly, and of surfaces
+only that dead PEs' are cleared. `kernel-gol/client.py --emucheck-strict`
+runs that check against simfab output in CI.
+
+This module imports only numpy at load time, and uses no package-relative
+imports, so that standalone scripts (e.g., `kernel-gol/client.py`) can load
+it directly; `emulate_header` needs nothing further.
+"""
+
+import importlib
+import typing
+
+import numpy as np
+
+N_HEADER = 2  # GOL state and counter words
+
+# (row, col) offsets of neighbors in the order the kernel numbers them: its
+# W, E neighbors' own words arrive before their forwarded N, S words
+_NEIGHBOR_OFFSETS = (
+    (0, -1),  # W
+    (-1, -1),  # NW
+    (1, -1),  # SW
+    (0, 1),  # E
+    (-1, 1),  # NE
+    (1, 1),  # SE
+    (-1, 0),  # N
+    (1, 0),  # S
+)
+_OPTION_OFFSETS = np.array([*_NEIGHBOR_OFFSETS, (0, 0)])  # own state last
+
+
+def kernel_generations(n_cycle: int, n_wav: int) -> int:
+    """Number of GOL generations performed by `generate(n_cycle)`.
+
+    The kernel exits after completing iteration `n_cycle - 2`, so
+    `generate(1)` never returns, and `n_cycle` 0 means no launch at all.
+    """
+    if n_cycle < 0 or n_cycle == 1:
+        raise ValueError(f"{n_cycle=} does not complete on device")
+    if n_cycle == 0:
+        return 0
+    return (n_cycle - 2) // n_wav + 1
+
+
+def _pad(states: np.ndarray) -> np.ndarray:
+    """`states` surrounded by a border of zeros, i.e., dead PEs."""
+    return np.pad(states, [(1, 1), (1, 1)] + [(0, 0)] * (states.ndim - 2))
+
+
+def _neighbors(padded: np.ndarray) -> typing.List[np.ndarray]:
+    """Views of each PE's neighbors' states within `_pad`ded states."""
+    n_row, n_col = padded.shape[0] - 2, padded.shape[1] - 2
+    return [
+        padded[1 + dr : 1 + dr + n_row, 1 + dc : 1 + dc + n_col]
+        for dr, dc in _NEIGHBOR_OFFSETS
+    ]
+
+
+def _life_step(
+    gol_state: np.ndarray, neighbors: typing.Sequence[np.ndarray]
+) -> np.ndarray:
+    """Live mask after one generation, summing neighbor GOL state words as
+    the kernel does."""
+    count = sum(neighbor.astype(np.uint32) for neighbor in neighbors)
+    return np.where(gol_state != 0, (count == 2) | (count == 3), count == 3)
+
+
+def emulate_header(
+    initial_state: np.ndarray,
+    n_cycle: int,
+    n_surf: int = 3,
+    surf_wavs: int = 2,
+) -> np.ndarray:
+    """GOL state and counter words after `generate(n_cycle)` from `(n_row,
+    n_col)` `initial_state`, as a `(n_row, n_col, N_HEADER)` uint32 array.
+
+    These words are deterministic, so they match device output exactly.
+    """
+    n_wav = N_HEADER + n_surf * surf_wavs
+    n_gen = kernel_generations(n_cycle, n_wav)
+    header = np.zeros((*initial_state.shape, N_HEADER), dtype=np.uint32)
+    header[..., 0] = initial_state
+    if n_gen == 0:
+        return header
+
+    gol_state = header[..., 0]
+    for __ in range(n_gen):
+        gol_state = _life_step(gol_state, _neighbors(_pad(gol_state)))
+    header[..., 0] = gol_state
+    header[..., 1] = gol_state * np.uint32(surf_wavs * 32 + n_gen - 1)
+    return header
+
+
+def emulate_states(
+    initial_state: np.ndarray,
+    n_cycle: int,
+    n_surf: int = 3,
+    surf_wavs: int = 2,
+    dstream_algo: str = "dstream.hybrid_0_steady_1_tilted_2_algo",
+    seed: typing.Optional[int] = None,
+) -> np.ndarray:
+    """Device state after `generate(n_cycle)` from `(n_row, n_col)`
+    `initial_state`, as a `(n_row, n_col, n_wav)` uint32 array laid out as
+    copied off the device.
+
+    Surface words are not the device's: they follow the kernel's copy-in and
+    dstream site updates, but with bits drawn from a generator seeded with
+    `seed`. Requires the `downstream` package, for `dstream_algo`'s site
+    assignment.
+    """
+    n_wav = N_HEADER + n_surf * surf_wavs
+    n_gen = kernel_generations(n_cycle, n_wav)
+    states = np.zeros((*initial_state.shape, n_wav), dtype=np.uint32)
+    states[..., 0] = initial_state
+    if n_gen == 0:
+        return states
+
+    module, name = dstream_algo.rsplit(".", 1)
+    algo = getattr(importlib.import_module(f"downstream.{module}"), name)
+    S = surf_wavs * 32
+    rng = np.random.default_rng(seed)
+    shape = initial_state.shape
+    width = shape[1] + 2  # of padded states
+    option_offsets = _OPTION_OFFSETS @ (width, 1)  # within flat padded states
+
+    # generate assumes surfaces already filled, with random contents
+    states[..., 1] = S - 1
+    states[..., N_HEADER:] = rng.integers(
+        0, 2**32, size=(*shape, n_wav - N_HEADER), dtype=np.uint32
+    )
+    for generation in range(n_gen):
+        padded = _pad(states)
+        neighbors = _neighbors(padded)
+        alive = _life_step(states[..., 0], [x[..., 0] for x in neighbors])
+        update = np.where(alive[..., None], states, np.uint32(0))
+        update[..., 0] = alive
+        update[..., 1] = alive * np.uint32(S + generation)
+
+        # only live PEs' surfaces change, so work on flat indices of those
+        live = np.flatnonzero(alive)
+        n_live = len(live)
+        centre = live + live // shape[1] * 2 + width + 1
+        padded = padded.reshape(-1, n_wav)
+        update_ = update.reshape(-1, n_wav)
+
+        if generation > 0:
+            # own state last, kept if no neighbor is chosen
+            is_option = padded[centre + option_offsets[:, None], 0] != 0
+            rank = np.cumsum(is_option, axis=0)
+            for surface in range(n_surf):
+                first = N_HEADER + surface * surf_wavs
+                words = slice(first, first + surf_wavs)
+                choice = (rng.random(n_live) * rank[-1]).astype(rank.dtype)
+                source = centre + option_offsets[(rank <= choice).sum(axis=0)]
+                update_[live, words] = padded[source, words]
+
+        site = algo.assign_storage_site(S, S + generation)
+        if site is not None:
+            for surface in range(n_surf):
+                # surfaces are addressed as big-endian bit strings
+                word, bit = divmod(surface * S + site, 32)
+                mask = np.uint32(1 << (31 - bit))
+                target = update_[live, N_HEADER + word]
+                is_set = rng.random(n_live) < 0.5
+                update_[live, N_HEADER + word] = np.where(
+                    is_set, target | mask, target & ~mask
+                )
+
+        states = update
+
+    return states
+
+
+def diff_states(device: np.ndarray, emulated: np.ndarray) -> typing.List[str]:
+    """Descriptions of where `(n_row, n_col, n_wav)` `device` states
+    disagree with `emulated` states or header words, empty if they agree.
+
+    GOL state and counter words must match exactly, and PEs emulated as
+    dead must have all surface words cleared.
+    """
+    if device.shape[:2] != emulated.shape[:2]:
+        return [f"grid shape {device.shape[:2]=} != {emulated.shape[:2]=}"]
+
+    mismatches = []
+    checks = [
+        ("GOL state", device[..., 0] != emulated[..., 0]),
+        ("counter", device[..., 1] != emulated[..., 1]),
+        (
+            "dead surfaces",
+            (emulated[..., 0] == 0) & (device[..., N_HEADER:] != 0).any(-1),
+        ),
+    ]
+    for what, mismatch in checks:
+        if mismatch.any():
+            row, col = (int(x[0]) for x in np.nonzero(mismatch))
+            mismatches.append(
+                f"{what} differs at {int(mismatch.sum())} PEs, first at "
+                f"{row=} {col=}: device={device[row, col].tolist()} "
+                f"emulated={emulated[row, col].tolist()}"
+            )
+    return mismatches
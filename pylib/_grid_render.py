@@ -0,0 +1,77 @@
+"""Text renderings of Game of Life grids.
+
+Grids are rendered whole into arrays of Unicode code points, one per output
+character, from which the text of the full image or of any top-left crop
+can then be joined without rendering again. Braille images pack each 4x2
+block of cells into one character; .cells images use one character per
+cell, "O" for alive and "." for dead. This module depends only on numpy,
+and uses no package-relative imports, so that standalone scripts (e.g.,
+`kernel-gol/client.py`) can load it directly.
+"""
+
+import typing
+
+import numpy as np
+
+BRAILLE_CELL_SHAPE = (4, 2)
+
+# bit of each cell within its Braille character, by position in the 4x2 block
+_BRAILLE_SHIFTS = np.array(
+    [[0, 3], [1, 4], [2, 5], [6, 7]], dtype=np.uint32
+).reshape(1, 4, 1, 2)
+
+
+def braille_image(grid: np.ndarray) -> np.ndarray:
+    """Code points of `(n_row, n_col)` `grid` rendered as Braille art.
+
+    The grid is padded with dead cells to a multiple of 4 rows and 2 columns,
+    so the result has shape `(ceil(n_row / 4), ceil(n_col / 2))`.
+    """
+    n_row, n_col = grid.shape
+    block_row, block_col = BRAILLE_CELL_SHAPE
+    padded = np.zeros(
+        (
+            -(-n_row // block_row) * block_row,
+            -(-n_col // block_col) * block_col,
+        ),
+        dtype=np.uint32,
+    )
+    padded[:n_row, :n_col] = grid != 0
+    blocks = padded.reshape(
+        padded.shape[0] // block_row, block_row, -1, block_col
+    )
+    dots = np.bitwise_or.reduce(blocks << _BRAILLE_SHIFTS, axis=(1, 3))
+    return dots + np.uint32(0x2800)  # blank Braille pattern
+
+
+def cells_image(grid: np.ndarray) -> np.ndarray:
+    """Code points of `(n_row, n_col)` `grid` rendered as .cells art."""
+    return np.where(grid != 0, np.uint32(ord("O")), np.uint32(ord(".")))
+
+
+def image_text(
+    image: np.ndarray,
+    max_render_rows: typing.Optional[int] = None,
+    max_render_cols: typing.Optional[int] = None,
+    cell_shape: typing.Tuple[int, int] = (1, 1),
+) -> str:
+    """Join code point `image` into newline-separated lines of text.
+
+    Only characters covering the first `max_render_rows` rows and
+    `max_render_cols` columns of grid cells are included, each character
+    covering a `cell_shape` block of cells (e.g., `BRAILLE_CELL_SHAPE`).
+    """
+    n_line, n_char = image.shape
+    if max_render_rows is not None:
+        n_line = min(n_line, -(-max_render_rows // cell_shape[0]))
+    if max_render_cols is not None:
+        n_char = min(n_char, -(-max_render_cols // cell_shape[1]))
+    if n_line == 0:
+        return ""
+
+    buffer = np.full((n_line, n_char + 1), ord("\n"), dtype=np.uint32)
+    buffer[:, :n_char] = image[:n_line, :n_char]
+    # reinterpret the code points as a single string, then drop the final
+    # newline; numpy strips only trailing nulls, which cannot occur here
+    text = buffer.reshape(-1).view(f"U{buffer.size}")[0]
+    return text[:-1]
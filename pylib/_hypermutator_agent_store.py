@@ -0,0 +1,98 @@
+import sys
+import typing
+
+from ._hypermutator_backend import xp
+
+
+class AgentStore(typing.Protocol):
+    """Storage for per-agent fields of `(n_batch, pop_size)` populations.
+
+    Founders are labeled by agent position, plus `agent_offset` for a shard
+    of a larger population. Field attributes `ben`, `del_`, `mutator`, and
+    `founder` are writable arrays; they may be views that are invalidated by
+    `gather` or `permute`, so they should be re-read after each.
+    """
+
+    ben: "xp.ndarray"
+    del_: "xp.ndarray"
+    mutator: "xp.ndarray"
+    founder: "xp.ndarray"
+
+    def gather(self, index: "xp.ndarray") -> None:
+        """Replace each agent with the agent at per-replicate `index`."""
+
+    def permute(self, index: "xp.ndarray") -> None:
+        """Replace each agent with the agent at `index`, shared across
+        replicates."""
+
+
+def _initial_founder(
+    n_batch: int, pop_size: int, agent_offset: int
+) -> "xp.ndarray":
+    pop_founder = xp.arange(
+        agent_offset, agent_offset + pop_size, dtype=xp.int32
+    )
+    return xp.tile((pop_founder % 256).astype(xp.uint8), (n_batch, 1))
+
+
+class SeparateAgentStore:
+    """One array per field; each gather touches four arrays."""
+
+    def __init__(
+        self, n_batch: int, pop_size: int, agent_offset: int = 0
+    ) -> None:
+        pop_shape = (n_batch, pop_size)
+        self.ben = xp.zeros(pop_shape, dtype=xp.int8)
+        self.del_ = xp.zeros(pop_shape, dtype=xp.int8)
+        self.mutator = xp.ones(pop_shape, dtype=xp.uint8)
+        self.founder = _initial_founder(n_batch, pop_size, agent_offset)
+
+    def gather(self, index: "xp.ndarray") -> None:
+        for field in self.ben, self.del_, self.mutator, self.founder:
+            field[:] = xp.take_along_axis(field, index, axis=-1)
+
+    def permute(self, index: "xp.ndarray") -> None:
+        for field in self.ben, self.del_, self.mutator, self.founder:
+            field[:] = field[:, index]
+
+
+class PackedAgentStore:
+    """All fields packed into one `uint32` word per agent.
+
+    Bytes hold, from least to most significant, `ben`, `del_`, `mutator`,
+    and `founder` --- the same layout as output genomes. Fields are exposed
+    as strided byte views, so reorganizing agents takes a single gather.
+    """
+
+    def __init__(
+        self, n_batch: int, pop_size: int, agent_offset: int = 0
+    ) -> None:
+        assert sys.byteorder == "little", "byte views assume little endian"
+        self.pop = xp.zeros((n_batch, pop_size), dtype=xp.uint32)
+        self.mutator[:] = 1
+        self.founder[:] = _initial_founder(n_batch, pop_size, agent_offset)
+
+    def _field(self, byte: int) -> "xp.ndarray":
+        return self.pop.view(xp.uint8).reshape(*self.pop.shape, 4)[..., byte]
+
+    @property
+    def ben(self) -> "xp.ndarray":
+        return self._field(0).view(xp.int8)
+
+    @property
+    def del_(self) -> "xp.ndarray":
+        return self._field(1).view(xp.int8)
+
+    @property
+    def mutator(self) -> "xp.ndarray":
+        return self._field(2)
+
+    @property
+    def founder(self) -> "xp.ndarray":
+        return self._field(3)
+
+    def gather(self, index: "xp.ndarray") -> None:
+        self.pop = xp.take_along_axis(self.pop, index, axis=-1)
+
+    def permute(self, index: "xp.ndarray") -> None:
+        self.pop = xp.take(self.pop, index, axis=-1)
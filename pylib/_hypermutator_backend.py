@@ -0,0 +1,47 @@
+import datetime
+import os
+import sys
+
+import numpy as np
+import numpy as xp
+
+try:
+    import cupy
+
+    if cupy.cuda.is_available():
+        xp = cupy  # noqa: F811
+except Exception:
+    pass
+
+HOME = os.environ.get("HOME")
+SLURM_ARRAY_JOB_ID = os.environ.get("SLURM_ARRAY_JOB_ID", "nojid")
+SLURM_JOB_ID = os.environ.get("SLURM_JOB_ID", "nojid")
+SLURM_ARRAY_TASK_ID = int(os.environ.get("SLURM_ARRAY_TASK_ID", "32"))
+
+
+def log_environment() -> None:
+    """Print library versions and job identifiers, e.g., at the start of a
+    run; pandas and tqdm are imported here, not at module load, and the
+    main loops import tqdm only to show progress."""
+    import pandas as pd
+    import tqdm as tq
+
+    print("date", datetime.datetime.now())
+    print("sys.version", sys.version)
+    print("numpy/cupy", xp.__version__)
+    print("pandas", pd.__version__)
+    print("tqdm", tq.__version__)
+
+    print("HOME={} SLURM_ARRAY_JOB_ID={}".format(HOME, SLURM_ARRAY_JOB_ID))
+    print(
+        "SLURM_JOB_ID={} SLURM_ARRAY_TASK_ID={}".format(
+            SLURM_JOB_ID, SLURM_ARRAY_TASK_ID
+        )
+    )
+
+
+def to_numpy(x: "xp.ndarray") -> np.ndarray:
+    """Copy `x` to host memory, if it is not already a NumPy array."""
+    if not isinstance(x, np.ndarray):
+        x = x.get()
+    return x
@@ -0,0 +1,83 @@
+import concurrent.futures
+import os
+import tempfile
+import typing
+
+import numpy as np
+
+
+def _default_file_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# read once, at import, as changing the umask affects every thread
+_FILE_MODE = _default_file_mode()
+
+
+def save_checkpoint(path: str, arrays: typing.Dict[str, np.ndarray]) -> None:
+    """Write `arrays` to an `.npz` bundle at `path`, atomically.
+
+    The bundle is written to a temporary file in the same directory, synced,
+    and renamed into place, so `path` always holds a complete checkpoint,
+    even if the process is killed mid-write. The file gets the usual
+    permissions for a new file under the umask, not `mkstemp`'s owner-only
+    ones.
+
+    Bundles are plain `np.savez` archives, loaded eagerly, rather than
+    memory-mapped arrays: checkpoints hold one snapshot of population
+    state, which a resume needs in full anyway.
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".npz.tmp")
+    try:
+        os.fchmod(fd, _FILE_MODE)
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **arrays)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_checkpoint(path: str) -> typing.Dict[str, np.ndarray]:
+    """Read an `.npz` bundle written by `save_checkpoint`."""
+    with np.load(path) as bundle:
+        return {name: bundle[name] for name in bundle.files}
+
+
+class CheckpointWriter:
+    """Saves checkpoints from a background thread, so the main loop does not
+    wait on I/O.
+
+    At most one write is in flight; submitting another first waits for it,
+    which bounds memory to two snapshots. Write errors are raised from the
+    next `submit` or from `close`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._pending: typing.Optional[concurrent.futures.Future] = None
+
+    def submit(self, arrays: typing.Dict[str, np.ndarray]) -> None:
+        """Queue a write of `arrays`, which must not be modified after."""
+        self.wait()
+        self._pending = self._executor.submit(
+            save_checkpoint, self.path, arrays
+        )
+
+    def wait(self) -> None:
+        """Block until any in-flight write completes."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
@@ -0,0 +1,297 @@
+from collections import Counter
+import importlib
+import uuid
+
+import numpy as np
+import polars as pl
+from scipy import stats as sps
+
+from ._genome_serializer import genomes_to_hex
+from ._hypermutator_backend import log_environment
+from ._hypermutator_driver_config import DriverConfig, variant_module
+from ._parquet_output import ParquetOutput
+
+wavSize = 32  # number of bits in a wavelet
+
+
+def drive(variant: str, config: DriverConfig) -> None:
+    """Run the hypermutator simulation `variant` configured by `config`,
+    saving per-tile traits, genomes, and performance to Parquet files."""
+    log_environment()
+    nCol, nRow = config.n_col, config.n_row
+    nWav, nTrait = config.n_wav, config.n_trait
+    globalSeed = config.global_seed
+    nCycleAtLeast = config.n_cycle_at_least
+    msecAtLeast = config.msec_at_least
+    tscAtLeast = config.tsc_at_least
+    nColSubgrid = config.n_col_subgrid
+    nRowSubgrid = config.n_row_subgrid
+    tilePopSize = config.tile_pop_size
+    tournSize = config.tourn_size
+    genomeFlavor = config.genome_flavor
+    nBen = config.n_ben
+    profileEvery = config.profile_every
+    checkpointPath = config.checkpoint_path
+    checkpointEvery = config.checkpoint_every
+    resumeFrom = config.resume_from
+    summaryEvery = config.summary_every
+    fixationEvery = config.fixation_every
+    summaryPath = config.output_path("summary")
+    output = ParquetOutput(verify=config.parquet_verify)
+
+    # metadata columns, added to every output file
+    metadata = {
+        "genomeFlavor": (genomeFlavor, pl.Categorical),
+        "globalSeed": (globalSeed, pl.UInt32),
+        "nCol": (nCol, pl.UInt16),
+        "nRow": (nRow, pl.UInt16),
+        "nWav": (nWav, pl.UInt8),
+        "nTrait": (nTrait, pl.UInt8),
+        "nCycle": (nCycleAtLeast, pl.UInt32),
+        "nColSubgrid": (nColSubgrid, pl.UInt16),
+        "nRowSubgrid": (nRowSubgrid, pl.UInt16),
+        "tilePopSize": (tilePopSize, pl.UInt16),
+        "tournSize": (tournSize, pl.Float32),
+        "msec": (msecAtLeast, pl.Float32),
+        "tsc": (tscAtLeast, pl.UInt64),
+        "replicate": (str(uuid.uuid4()), pl.Categorical),
+        "nBen": (nBen, pl.UInt8),
+        "profileEvery": (profileEvery, pl.UInt32),
+        "checkpointEvery": (checkpointEvery, pl.UInt32),
+        "resumed": (bool(resumeFrom), pl.Boolean),
+        "summaryEvery": (summaryEvery, pl.UInt32),
+        "fixationEvery": (fixationEvery, pl.UInt32),
+    }
+    print(metadata)
+
+    print("do run ============================================================")
+    run = importlib.import_module(
+        f".{variant_module(variant)}", __package__
+    ).run
+
+    res = run(
+        n_col=nCol,
+        n_row=nRow,
+        n_row_subgrid=nRowSubgrid,
+        n_col_subgrid=nColSubgrid,
+        tile_pop_size=tilePopSize,
+        n_gen=nCycleAtLeast,
+        seed=globalSeed,
+        tourn_size=tournSize,
+        n_ben=nBen,
+        profile_every=profileEvery or None,
+        checkpoint_path=checkpointPath if checkpointEvery else None,
+        checkpoint_every=checkpointEvery or None,
+        resume_from=resumeFrom or None,
+        summary_path=summaryPath if summaryEvery else None,
+        summary_every=summaryEvery or None,
+        fixation_every=fixationEvery or None,
+    )
+    # kernel "auto" picks by platform, and kernels draw different numbers
+    print("kernel", res["kernel"])
+    metadata["kernel"] = (res["kernel"], pl.Categorical)
+
+    print("whoami ============================================================")
+    out_tensors = np.zeros((nCol, nRow), np.uint32)
+    whoami_data = out_tensors.copy()
+    whoami_data[:, :] = res["whoami"]
+    print(whoami_data[:20, :20])
+
+    print("whereami x ========================================================")
+    out_tensors = np.zeros((nCol, nRow), np.uint32)
+    whereami_x_data = out_tensors.copy()
+    whereami_x_data[:, :] = res["whereami_x"]
+    print(whereami_x_data[:20, :20])
+
+    print("whereami y ========================================================")
+    out_tensors = np.zeros((nCol, nRow), np.uint32)
+    whereami_y_data = out_tensors.copy()
+    whereami_y_data[:, :] = res["whereami_y"]
+    print(whereami_y_data[:20, :20])
+
+    print("trait data ========================================================")
+    out_tensors = np.zeros((nCol, nRow, nTrait), np.uint32)
+    traitCounts_data = out_tensors.copy()
+    traitCounts_data[:, :, :] = res["trait_counts"]
+    print("traitCounts_data", Counter(traitCounts_data.ravel()))
+
+    out_tensors = np.zeros((nCol, nRow, nTrait), np.uint32)
+    traitCycles_data = out_tensors.copy()
+    traitCycles_data[:, :, :] = res["last_seen"]
+    print("traitCycles_data", Counter(traitCycles_data.ravel()))
+
+    out_tensors = np.zeros((nCol, nRow, nTrait), np.uint32)
+    traitValues_data = out_tensors.copy()
+    traitValues_data[:, :, :] = res["trait_values"]
+    print("traitValues_data", str(Counter(traitValues_data.ravel()))[:500])
+
+    # save trait data values to a file
+    df = pl.DataFrame(
+        {
+            "trait count": pl.Series(traitCounts_data.ravel(), dtype=pl.UInt16),
+            "trait cycle last seen": pl.Series(
+                traitCycles_data.ravel(), dtype=pl.UInt32
+            ),
+            "trait value": pl.Series(traitValues_data.ravel(), dtype=pl.UInt8),
+            "tile": pl.Series(
+                np.repeat(whoami_data.ravel(), nTrait), dtype=pl.UInt32
+            ),
+            "row": pl.Series(
+                np.repeat(whereami_y_data.ravel(), nTrait), dtype=pl.UInt16
+            ),
+            "col": pl.Series(
+                np.repeat(whereami_x_data.ravel(), nTrait), dtype=pl.UInt16
+            ),
+        }
+    ).with_columns(
+        [
+            pl.lit(value, dtype=dtype).alias(key)
+            for key, (value, dtype) in metadata.items()
+        ]
+    )
+
+    for trait, group in df.group_by("trait value"):
+        print(f"trait {trait} total count is", group["trait count"].sum())
+
+    output.submit(df, config.output_path("traits"))
+    del df, traitCounts_data, traitCycles_data, traitValues_data
+
+    print("fitness ===========================================================")
+    out_tensors = np.zeros((nCol, nRow), np.float32)
+    fitness_data = out_tensors.copy()
+    fitness_data[:, :] = res["fitnesses"]
+    print(fitness_data[:20, :20])
+
+    print("genome values =====================================================")
+    out_tensors = np.zeros((nCol, nRow, nWav), np.uint32)
+    genome_data = out_tensors.copy()
+    genome_data[:, :, :] = res["genomes"]
+    # hex digits of each tile's words, in memory order, as one fixed-width
+    # string; kept as strings to prevent polars reading as int64 and overflowing
+    genome_hex = genomes_to_hex(genome_data, name="bitfield", uppercase=True)
+
+    # display genome values
+    assert len(genome_hex) == nRow * nCol
+    for word in range(nWav):
+        print(f"------------------------------------------ genome word {word}")
+        print(genome_data[:, :, word].ravel()[:100].tolist())
+
+    print("-------------------------------------------- genome binary strings")
+    for hex_string in genome_hex[:100]:
+        print(np.binary_repr(int(hex_string, 16), width=nWav * wavSize))
+
+    print("----------------------------------------------- genome hex strings")
+    for hex_string in genome_hex[:100]:
+        print(hex_string)
+
+    # save genome values to a file
+    df = pl.DataFrame(
+        {
+            "bitfield": genome_hex,
+            "fitness": pl.Series(fitness_data.ravel(), dtype=pl.Float32),
+            "tile": pl.Series(whoami_data.ravel(), dtype=pl.UInt32),
+            "row": pl.Series(whereami_y_data.ravel(), dtype=pl.UInt16),
+            "col": pl.Series(whereami_x_data.ravel(), dtype=pl.UInt16),
+        }
+    ).with_columns(
+        [
+            pl.lit(value, dtype=dtype).alias(key)
+            for key, (value, dtype) in metadata.items()
+        ]
+    )
+
+    output.submit(df, config.output_path("genomes"))
+    del df, fitness_data, genome_hex
+
+    print("cycle counter =====================================================")
+    cycle_counts = np.full(nCol * nRow, nCycleAtLeast, dtype=np.uint32)
+    if "simulated_generations" in res:  # fixed subgrids retired early
+        cycle_counts[:] = res["simulated_generations"].ravel()
+    print(cycle_counts[:100])
+
+    print("tsc diffs =========================================================")
+    print("---------------------------------------------------------- seconds")
+    tsc_sec = np.full(nRow * nCol, res["elapsed_ns"] * (10**-9))
+    print(tsc_sec[:100])
+    print(f"{np.mean(tsc_sec)=} {np.std(tsc_sec)=} {sps.sem(tsc_sec)=}")
+
+    print("------------------------------------------------ seconds per cycle")
+    tsc_cysec = tsc_sec / nCycleAtLeast
+    print(tsc_cysec[:100])
+    print(f"{np.mean(tsc_cysec)=} {np.std(tsc_cysec)=} {sps.sem(tsc_cysec)=}")
+
+    print("------------------------------------------------------ cycle hertz")
+    tsc_cyhz = 1 / tsc_cysec
+    print(tsc_cyhz[:100])
+    print(f"{np.mean(tsc_cyhz)=} {np.std(tsc_cyhz)=} {sps.sem(tsc_cyhz)=}")
+
+    print("----------------------------------------------------- ns per cycle")
+    tsc_cyns = tsc_cysec * 1e9
+    print(tsc_cyns[:100])
+    print(f"{np.mean(tsc_cyns)=} {np.std(tsc_cyns)=} {sps.sem(tsc_cyns)=}")
+
+    print("phase timing ======================================================")
+    phases = ["mutate", "select", "migrate", "last_seen"]
+    phase_ns = res.get("phase_ns")
+    profiled_cycles = 0 if phase_ns is None else len(phase_ns["generation"])
+    phase_cyns = {
+        phase: None if phase_ns is None else float(np.mean(phase_ns[phase]))
+        for phase in phases
+    }
+    print(f"{profiled_cycles=}")
+    for phase, cyns in phase_cyns.items():
+        print(f"- {phase}: {cyns} ns per cycle")
+
+    print("perf ==============================================================")
+    # save performance metrics to a file
+    df = pl.DataFrame(
+        {
+            "tsc seconds": pl.Series(tsc_sec, dtype=pl.Float32),
+            "tsc seconds per cycle": pl.Series(tsc_cysec, dtype=pl.Float32),
+            "tsc cycle hertz": pl.Series(tsc_cyhz, dtype=pl.Float32),
+            "tsc ns per cycle": pl.Series(tsc_cyns, dtype=pl.Float32),
+            "cycle count": pl.Series(cycle_counts, dtype=pl.UInt32),
+            "profiled cycles": pl.Series(
+                [profiled_cycles] * (nRow * nCol), dtype=pl.UInt32
+            ),
+            **{
+                f"{phase} ns per cycle": pl.Series(
+                    [cyns] * (nRow * nCol), dtype=pl.Float32
+                )
+                for phase, cyns in phase_cyns.items()
+            },
+            "tile": pl.Series(whoami_data.ravel(), dtype=pl.UInt32),
+            "row": pl.Series(whereami_y_data.ravel(), dtype=pl.UInt16),
+            "col": pl.Series(whereami_x_data.ravel(), dtype=pl.UInt16),
+        }
+    ).with_columns(
+        [
+            pl.lit(value, dtype=dtype).alias(key)
+            for key, (value, dtype) in metadata.items()
+        ]
+    )
+    output.submit(df, config.output_path("perf"))
+    del df, tsc_sec, tsc_cysec, tsc_cyhz, tsc_cyns
+
+    if phase_ns is not None:
+        print("phases ========================================================")
+        # save per-cycle phase timings to a file
+        df = pl.DataFrame(
+            {
+                "cycle": pl.Series(phase_ns["generation"], dtype=pl.UInt32),
+                **{
+                    f"{phase} ns": pl.Series(phase_ns[phase], dtype=pl.UInt64)
+                    for phase in phases
+                },
+            }
+        ).with_columns(
+            [
+                pl.lit(value, dtype=dtype).alias(key)
+                for key, (value, dtype) in metadata.items()
+            ]
+        )
+        print(df.describe())
+        output.submit(df, config.output_path("phases"))
+        del df
+
+    output.close()
@@ -0,0 +1,85 @@
+import dataclasses
+import os
+import typing
+
+
+def variant_module(variant: str) -> str:
+    """Name of the pylib module providing `run` for a driver variant."""
+    return "_hypermutator_" + variant.replace("-", "_")
+
+
+@dataclasses.dataclass(frozen=True)
+class DriverConfig:
+    """Hypermutator driver settings, as read from `WSE_GOL_*` environment
+    variables.
+
+    Parsing uses only the standard library, so configurations can be
+    checked without paying for numpy/polars imports.
+    """
+
+    n_col: int
+    n_row: int
+    n_wav: int
+    n_trait: int
+    global_seed: int
+    n_cycle_at_least: int
+    msec_at_least: int
+    tsc_at_least: int
+    n_col_subgrid: int
+    n_row_subgrid: int
+    tile_pop_size: int
+    tourn_size: float
+    genome_flavor: str
+    n_ben: int
+    profile_every: int
+    checkpoint_path: str
+    checkpoint_every: int
+    resume_from: str
+    summary_every: int
+    fixation_every: int
+    parquet_verify: str
+
+    @classmethod
+    def from_env(
+        cls, environ: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> "DriverConfig":
+        env = os.environ if environ is None else environ
+        checkpoint_path = env.get("WSE_GOL_CHECKPOINT_PATH", "")
+        return cls(
+            n_col=int(env.get("WSE_GOL_NCOL", 3)),
+            n_row=int(env.get("WSE_GOL_NROW", 3)),
+            n_wav=int(env.get("WSE_GOL_NWAV", 4)),
+            n_trait=int(env.get("WSE_GOL_NTRAIT", 1)),
+            global_seed=int(env["WSE_GOL_GLOBAL_SEED"]),
+            n_cycle_at_least=int(env["WSE_GOL_NCYCLE_AT_LEAST"]),
+            msec_at_least=int(env["WSE_GOL_MSEC_AT_LEAST"]),
+            tsc_at_least=int(env["WSE_GOL_TSC_AT_LEAST"]),
+            n_col_subgrid=int(env["WSE_GOL_NCOL_SUBGRID"]),
+            n_row_subgrid=int(env["WSE_GOL_NROW_SUBGRID"]),
+            tile_pop_size=int(env["WSE_GOL_POPSIZE"]),
+            tourn_size=int(env["WSE_GOL_TOURNSIZE_NUMERATOR"])
+            / int(env["WSE_GOL_TOURNSIZE_DENOMINATOR"]),
+            genome_flavor=env["WSE_GOL_GENOME_FLAVOR"],
+            n_ben=int(env["NBEN"]),
+            profile_every=int(env.get("WSE_GOL_PROFILE_EVERY", 0)),
+            checkpoint_path=checkpoint_path,
+            checkpoint_every=int(env.get("WSE_GOL_CHECKPOINT_EVERY", 0)),
+            resume_from=(
+                checkpoint_path
+                if checkpoint_path and os.path.exists(checkpoint_path)
+                else ""
+            ),
+            summary_every=int(env.get("WSE_GOL_SUMMARY_EVERY", 0)),
+            fixation_every=int(env.get("WSE_GOL_FIXATION_EVERY", 0)),
+            parquet_verify=env.get("WSE_GOL_PARQUET_VERIFY", "rows"),
+        )
+
+    def output_path(self, what: str) -> str:
+        """Name of the Parquet output file for `what` data."""
+        return (
+            f"a={what}"
+            f"+flavor={self.genome_flavor}"
+            f"+seed={self.global_seed}"
+            f"+ncycle={self.n_cycle_at_least}"
+            "+ext=.pqt"
+        )
@@ -0,0 +1,317 @@
+import typing
+
+import numpy as np
+
+from ._hypermutator_backend import to_numpy, xp
+from ._hypermutator_geometry import HypermutatorGeometry
+from ._hypermutator_mutator_init import MutatorInit
+from ._hypermutator_sharding import simulate_sharded
+from ._hypermutator_simulate import simulate
+from ._hypermutator_topology import Topology
+from ._hypermutator_tournament import Tournament
+
+
+def run_engine(
+    geometry: HypermutatorGeometry,
+    n_gen: int,
+    seed: int,
+    n_ben: int,
+    mutator_init: MutatorInit,
+    topology: Topology,
+    tournament: Tournament,
+    pben: float = 0.000001,
+    pdel: float = 0.0001,
+    n_replicate: typing.Optional[int] = None,
+    packed: bool = False,
+    compose_migration: bool = False,
+    sparse_mutation: bool = False,
+    n_shard: typing.Optional[int] = None,
+    counter_rng: bool = False,
+    histogram: bool = False,
+    kernel: str = "auto",
+    profile_every: typing.Optional[int] = None,
+    incremental_traits: bool = False,
+    checkpoint_path: typing.Optional[str] = None,
+    checkpoint_every: typing.Optional[int] = None,
+    resume_from: typing.Optional[str] = None,
+    summary_path: typing.Optional[str] = None,
+    summary_every: typing.Optional[int] = None,
+    fixation_every: typing.Optional[int] = None,
+) -> typing.Union[dict, typing.List[dict]]:
+    """Simulate hypermutator evolution on a tiled population.
+
+    Each generation applies, in order, mutation, tournament selection within
+    `topology`'s selection bounds, migration (if `topology` has any), and
+    bookkeeping of the last generation each mutator trait value was seen on
+    each tile.
+
+    Parameters
+    ----------
+    geometry : HypermutatorGeometry
+        Grid, subgrid, and per-tile population dimensions.
+    n_gen : int
+        Number of generations to simulate.
+    seed : int
+        Seed for the random number generator.
+    n_ben : int
+        Cap on beneficial mutation count per agent.
+    mutator_init : MutatorInit
+        How mutator alleles enter the population.
+    topology : Topology
+        Spatial structure of selection and migration.
+    tournament : Tournament
+        Selection policy.
+    pben, pdel : float, optional
+        Per-agent, per-generation beneficial and deleterious mutation rates,
+        scaled by each agent's mutator value.
+    n_replicate : int, optional
+        If provided, advance this many independent populations together in
+        one batched loop, replicate `i` seeded with `seed + i`.
+
+        Each replicate draws from its own random stream, so it reproduces
+        the unbatched run with that seed exactly. Batching amortizes
+        per-generation interpreter overhead across replicates, which
+        dominates at small population sizes.
+    packed : bool, default False
+        If True, store each agent's fields packed into a single `uint32`
+        word, so that selection and migration each reorganize agents with
+        one gather instead of four. Results are identical either way.
+    compose_migration : bool, default False
+        If True, fold the migration permutation into the selection winner
+        indices, so agents are reorganized by one gather per generation
+        rather than two. Results are identical either way.
+    sparse_mutation : bool, default False
+        If True, sample the sites of rare mutation events directly instead
+        of drawing a Poisson variate for every agent, so that mutation cost
+        scales with the number of events. Results are equivalent in
+        distribution, but not draw-for-draw, to the default.
+    n_shard : int, optional
+        If provided, partition subgrids across this many worker processes,
+        which can evolve them independently because selection and migration
+        never cross subgrid boundaries. Each shard draws from its own random
+        stream, so results depend on `n_shard`, unless `counter_rng` is set.
+    counter_rng : bool, default False
+        If True, draw random numbers from Philox4x32-10 keyed by seed, with
+        counter (slot within tile, tile, generation, phase), instead of from
+        a sequential `RandomState` stream. Each agent's draws then do not
+        depend on batching, sharding, or backend, so trajectories are
+        identical for any `n_shard` and comparable between NumPy and CuPy.
+        Not supported with `sparse_mutation`.
+    histogram : bool, default False
+        If True, represent each tile by counts of its distinct genotypes,
+        rather than agent by agent, drawing selection and mutation as
+        multinomial and binomial splits of genotype classes. Memory and time
+        then scale with genotype diversity instead of population size, which
+        pays off for large `tile_pop_size`. Results are equivalent in
+        distribution to the default; each tile's reported genome is that of
+        a randomly sampled agent. Requires a `StochasticTournament` and
+        selection groups made of whole tiles, and does not support `packed`,
+        `compose_migration`, `sparse_mutation`, `counter_rng`, or the
+        "numba" `kernel`; `kernel` is otherwise ignored.
+    kernel : {"auto", "numba", "numpy"}, default "auto"
+        Main loop implementation. "numba" compiles each generation's
+        selection, migration, and bookkeeping, together with the next
+        generation's mutation, into a single parallel pass over tiles, with
+        no intermediate arrays. It requires numba, a NumPy backend, and a
+        `StochasticTournament`, and does not support `packed`,
+        `compose_migration`, `sparse_mutation`, or `counter_rng`. Each tile
+        draws from its own splitmix64 stream, so results are reproducible
+        regardless of thread count, and equivalent in distribution, but not
+        draw-for-draw, to "numpy". "auto" selects "numba" wherever it is
+        supported, so which kernel runs, and hence which random draws a seed
+        gives, depends on the platform and options; results are reproducible
+        only for a fixed kernel, and report the one that ran as "kernel".
+    profile_every : int, optional
+        If provided, time each phase of every `profile_every`-th generation,
+        reported as "phase_ns". Requires the "numpy" kernel.
+    incremental_traits : bool, default False
+        If True, maintain per-tile mutator counts across generations,
+        recounting only tiles whose selection group carries both alleles
+        and diffing only slots that migrate, rather than reducing over the
+        whole population each generation. Results are identical either way.
+        Requires the "numpy" kernel and selection groups made of whole
+        tiles, and does not support `compose_migration`.
+    checkpoint_path : str, optional
+        File to save an `.npz` checkpoint to after every `checkpoint_every`
+        generations, with population and last-seen arrays, random stream
+        state, and the next generation to run. Checkpoints are written from
+        a background thread and renamed into place atomically, so the file
+        always holds a complete checkpoint. With `n_shard`, each shard
+        writes its own file, at `shard_checkpoint_path`.
+    checkpoint_every : int, optional
+        Generations between checkpoints; required with `checkpoint_path`.
+    resume_from : str, optional
+        Checkpoint to continue from, instead of from founders. Given the
+        arguments of the checkpointed run, results are identical to an
+        uninterrupted run. On CuPy, checkpointing requires `counter_rng`.
+    summary_path : str, optional
+        Parquet file to stream a time series of population summaries to,
+        one row per replicate every `summary_every` generations: mean and
+        max fitness, mutator fraction, number of distinct founders, and
+        per-subgrid fixation. Summaries are cheap device reductions, handed
+        to a background thread that appends them in row groups, so the main
+        loop does not wait on disk and memory does not grow with `n_gen`.
+        With the "numba" kernel, summarized agents already carry the next
+        generation's mutations. The file's schema metadata records the
+        "kernel" that ran. Not supported with `n_shard`.
+    summary_every : int, optional
+        Generations between summaries; required with `summary_path`.
+    fixation_every : int, optional
+        If provided, every `fixation_every` generations, stop simulating
+        subgrids whose mutator trait has fixed for good: for the mutator
+        allele, or for the wildtype allele if mutator alleles cannot arise
+        de novo. The run ends early once all subgrids have fixed. Fixed
+        subgrids' trait counts and last-seen generations are then exactly
+        those of a full run, but their other fields are as of retirement,
+        and the remaining subgrids draw different random numbers than they
+        would in a full run. Adds "simulated_generations" to results.
+        Requires the "numpy" kernel, and does not support checkpointing or
+        summaries.
+
+    Returns
+    -------
+    dict
+        Final population state, as `(n_row, n_col, ...)` host arrays keyed
+        "whereami_x", "whereami_y", "whoami", "genomes", "fitnesses",
+        "trait_counts", "trait_values", and "last_seen", plus the main loop's
+        "elapsed_ns" and "kernel" ("numba", "numpy", or "histogram"). If
+        profiled, "phase_ns" maps "generation" to sampled generations, and
+        each phase name to its elapsed nanoseconds in each.
+        If `n_replicate` is provided, a list of such dicts, one per
+        replicate, each reporting the whole batch's "elapsed_ns" and
+        "phase_ns". If `fixation_every` is provided, "simulated_generations"
+        gives, per tile, the generations its subgrid was simulated for.
+    """
+    seeds = (
+        [seed] if n_replicate is None else [*range(seed, seed + n_replicate)]
+    )
+    simulate_kwargs = dict(
+        n_gen=n_gen,
+        n_ben=n_ben,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=tournament,
+        pben=pben,
+        pdel=pdel,
+        packed=packed,
+        compose_migration=compose_migration,
+        sparse_mutation=sparse_mutation,
+        counter_rng=counter_rng,
+        histogram=histogram,
+        kernel=kernel,
+        profile_every=profile_every,
+        incremental_traits=incremental_traits,
+        checkpoint_path=checkpoint_path,
+        checkpoint_every=checkpoint_every,
+        resume_from=resume_from,
+        summary_path=summary_path,
+        summary_every=summary_every,
+        fixation_every=fixation_every,
+    )
+    if n_shard is None:
+        state, elapsed_ns = simulate(geometry, seeds=seeds, **simulate_kwargs)
+    else:
+        state, elapsed_ns = simulate_sharded(
+            geometry, seeds=seeds, n_shard=n_shard, **simulate_kwargs
+        )
+
+    results = [
+        _assemble_result(
+            geometry,
+            pop_ben=state.ben[i],
+            pop_del=state.del_[i],
+            pop_mutator=state.mutator[i],
+            pop_founder=state.founder[i],
+            last_seen0=state.last_seen0[i],
+            last_seen1=state.last_seen1[i],
+            elapsed_ns=elapsed_ns,
+            simulated_generations=(
+                None
+                if state.simulated_generations is None
+                else state.simulated_generations[i]
+            ),
+        )
+        for i in range(len(seeds))
+    ]
+    for result in results:
+        result["kernel"] = state.kernel
+        if state.phase_ns is not None:
+            result["phase_ns"] = state.phase_ns
+    return results[0] if n_replicate is None else results
+
+
+def _assemble_result(
+    geometry: HypermutatorGeometry,
+    pop_ben: "xp.ndarray",
+    pop_del: "xp.ndarray",
+    pop_mutator: "xp.ndarray",
+    pop_founder: "xp.ndarray",
+    last_seen0: "xp.ndarray",
+    last_seen1: "xp.ndarray",
+    elapsed_ns: int,
+    simulated_generations: typing.Optional["xp.ndarray"] = None,
+) -> dict:
+    n_row, n_col = geometry.n_row, geometry.n_col
+    tile_pop_size = geometry.tile_pop_size
+    reshape = geometry.to_grid
+
+    genomes = np.zeros((n_row, n_col, 1), dtype=np.int32)
+    genomes[:, :, 0] = reshape(pop_founder[::tile_pop_size])
+    genomes[:, :, 0] <<= 8
+    genomes[:, :, 0] |= reshape(pop_mutator[::tile_pop_size])
+    genomes[:, :, 0] <<= 8
+    genomes[:, :, 0] |= reshape(pop_del[::tile_pop_size])
+    genomes[:, :, 0] <<= 8
+    genomes[:, :, 0] |= reshape(pop_ben[::tile_pop_size])
+
+    fitnesses = reshape(pop_ben[::tile_pop_size] - pop_del[::tile_pop_size])
+
+    trait1 = (pop_mutator != 1).reshape(-1, tile_pop_size).sum(axis=1)
+    assert (trait1 <= tile_pop_size).all()
+    trait0 = tile_pop_size - trait1
+    assert (trait0 <= tile_pop_size).all()
+    traits_counts = np.stack(
+        (
+            reshape(trait0),
+            reshape(trait1),
+        ),
+        axis=-1,
+    )
+
+    trait_values = np.stack(
+        (
+            reshape(np.zeros(n_row * n_col)),
+            reshape(np.ones(n_row * n_col)),
+        ),
+        axis=-1,
+    )
+
+    last_seen_ = np.stack(
+        (
+            reshape(last_seen0),
+            reshape(last_seen1),
+        ),
+        axis=-1,
+    )
+
+    mgrid = np.mgrid[0:n_row, 0:n_col]
+    whereami_x, whereami_y = mgrid
+
+    whoami = np.arange(n_row * n_col).reshape(n_row, n_col)
+
+    result = {
+        "whereami_x": whereami_x,
+        "whereami_y": whereami_y,
+        "whoami": whoami,
+        "genomes": genomes,
+        "fitnesses": fitnesses,
+        "trait_counts": traits_counts,
+        "trait_values": trait_values,
+        "last_seen": last_seen_,
+        "elapsed_ns": elapsed_ns,
+    }
+    if simulated_generations is not None:
+        result["simulated_generations"] = reshape(
+            np.repeat(to_numpy(simulated_generations), geometry.sub_size)
+        )
+    return result
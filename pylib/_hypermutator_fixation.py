@@ -0,0 +1,215 @@
+import dataclasses
+import typing
+
+from ._hypermutator_agent_store import AgentStore
+from ._hypermutator_backend import xp
+from ._hypermutator_geometry import HypermutatorGeometry
+from ._hypermutator_topology import Topology
+
+
+_FIELD_NAMES = ("ben", "del_", "mutator", "founder")
+
+
+class SubgridFreezer:
+    """Retires subgrids whose mutator trait has fixed, so that the main loop
+    simulates only subgrids whose trait outcome can still change.
+
+    Selection and migration never cross subgrid boundaries, and mutation
+    never removes a mutator allele, so a subgrid fixed for the mutator
+    allele stays fixed. A subgrid fixed for the wildtype allele stays fixed
+    too, if mutator alleles cannot arise de novo. Once fixed, every tile of
+    the subgrid carries only the fixed allele through the final generation,
+    so its last-seen generation for that allele is filled in as
+    `n_gen - 1`, and its other last-seen values are final.
+
+    The active population is a stack of subgrid slots, laid out like a
+    shard, with slot `k` of replicate `i` holding subgrid `slot_sub[i, k]`.
+    Replicates retire subgrids at different times, so each keeps its active
+    subgrids in its leading slots; trailing slots of replicates with fewer
+    active subgrids hold retired copies, which are simulated but ignored.
+    """
+
+    def __init__(
+        self,
+        geometry: HypermutatorGeometry,
+        n_batch: int,
+        n_gen: int,
+        wildtype_absorbing: bool,
+    ) -> None:
+        self.geometry = geometry
+        self.n_gen = n_gen
+        self.wildtype_absorbing = wildtype_absorbing
+
+        pop_shape = (n_batch, geometry.pop_size)
+        tile_shape = (n_batch, geometry.n_tile)
+        self.fields = {
+            "ben": xp.zeros(pop_shape, dtype=xp.int8),
+            "del_": xp.zeros(pop_shape, dtype=xp.int8),
+            "mutator": xp.zeros(pop_shape, dtype=xp.uint8),
+            "founder": xp.zeros(pop_shape, dtype=xp.uint8),
+        }
+        self.last_seen0 = xp.zeros(tile_shape, dtype=xp.uint32)
+        self.last_seen1 = xp.zeros(tile_shape, dtype=xp.uint32)
+        self.simulated_generations = xp.zeros(
+            (n_batch, geometry.n_sub), dtype=xp.uint32
+        )
+
+        self.slot_sub = xp.tile(
+            xp.arange(geometry.n_sub, dtype=xp.int64), (n_batch, 1)
+        )
+        self.slot_active = xp.ones((n_batch, geometry.n_sub), dtype=bool)
+
+    @property
+    def slot_geometry(self) -> HypermutatorGeometry:
+        """Geometry of the active population's subgrid slots, stacked into
+        one column, as for a shard."""
+        return dataclasses.replace(
+            self.geometry,
+            n_row=self.geometry.n_row_subgrid * self.slot_sub.shape[1],
+            n_col=self.geometry.n_col_subgrid,
+        )
+
+    def _index(
+        self,
+        slots: typing.Tuple["xp.ndarray", "xp.ndarray"],
+        per_sub: int,
+    ) -> typing.Tuple["xp.ndarray", "xp.ndarray"]:
+        """Flat slot-space and full-population indices of `per_sub`
+        consecutive elements for each slot in `(batch, slot)` pairs."""
+        batch, slot = slots
+        offset = xp.arange(per_sub, dtype=xp.int64)
+        slot_index = slot[:, None] * per_sub + offset
+        full_index = self.slot_sub[batch, slot][:, None] * per_sub + offset
+        return slot_index, full_index
+
+    def _write_back(
+        self,
+        slots: typing.Tuple["xp.ndarray", "xp.ndarray"],
+        generation: int,
+        agents: AgentStore,
+        last_seen0: "xp.ndarray",
+        last_seen1: "xp.ndarray",
+    ) -> None:
+        batch = slots[0][:, None]
+        slot_index, full_index = self._index(
+            slots, self.geometry.sub_size * self.geometry.tile_pop_size
+        )
+        for name in _FIELD_NAMES:
+            field = getattr(agents, name)
+            self.fields[name][batch, full_index] = field[batch, slot_index]
+
+        slot_index, full_index = self._index(slots, self.geometry.sub_size)
+        self.last_seen0[batch, full_index] = last_seen0[batch, slot_index]
+        self.last_seen1[batch, full_index] = last_seen1[batch, slot_index]
+        self.simulated_generations[slots[0], self.slot_sub[slots]] = (
+            generation + 1
+        )
+
+    def retire(
+        self,
+        generation: int,
+        agents: AgentStore,
+        last_seen0: "xp.ndarray",
+        last_seen1: "xp.ndarray",
+        tile_trait: "xp.ndarray",
+    ) -> bool:
+        """Retire active subgrids fixed after `generation`, given per-tile
+        mutator counts over slots. Returns whether any were retired."""
+        n_batch, n_slot = self.slot_active.shape
+        sub_pop_size = self.geometry.sub_size * self.geometry.tile_pop_size
+        sub_trait = tile_trait.reshape(n_batch, n_slot, -1).sum(axis=-1)
+        fixed1 = sub_trait == sub_pop_size
+        fixed0 = (sub_trait == 0) & self.wildtype_absorbing
+        retired = (fixed0 | fixed1) & self.slot_active
+        if not retired.any():
+            return False
+
+        slots = xp.nonzero(retired)
+        self._write_back(slots, generation, agents, last_seen0, last_seen1)
+        for fixed, last_seen in [
+            (fixed0, self.last_seen0),
+            (fixed1, self.last_seen1),
+        ]:
+            batch, slot = xp.nonzero(fixed & retired)
+            _, full_index = self._index((batch, slot), self.geometry.sub_size)
+            last_seen[batch[:, None], full_index] = self.n_gen - 1
+
+        self.slot_active &= ~retired
+        return True
+
+    @property
+    def n_active(self) -> int:
+        """Slots needed to hold the most active subgrids of any replicate."""
+        return int(self.slot_active.sum(axis=-1).max())
+
+    def slot_topology(
+        self, topology: Topology
+    ) -> typing.Tuple[
+        "xp.ndarray", "xp.ndarray", typing.Optional["xp.ndarray"]
+    ]:
+        """Selection bounds and migration permutation over subgrid slots,
+        repeating one subgrid's, offset to each slot."""
+        subgrid = dataclasses.replace(
+            self.geometry,
+            n_row=self.geometry.n_row_subgrid,
+            n_col=self.geometry.n_col_subgrid,
+        )
+        n_slot = self.slot_sub.shape[1]
+
+        def repeat(x: "xp.ndarray") -> "xp.ndarray":
+            offset = xp.arange(n_slot, dtype=x.dtype) * x.dtype.type(x.size)
+            return (offset[:, None] + x).ravel()
+
+        group_min, group_max = topology.selection_bounds(subgrid)
+        tcm = topology.migration_permutation(subgrid)
+        return (
+            repeat(group_min),
+            repeat(group_max),
+            None if tcm is None else repeat(tcm),
+        )
+
+    def compact(
+        self,
+        agents: AgentStore,
+        last_seen0: "xp.ndarray",
+        last_seen1: "xp.ndarray",
+        make_agents: typing.Callable[[int, int], AgentStore],
+    ) -> typing.Tuple[AgentStore, "xp.ndarray", "xp.ndarray"]:
+        """Move each replicate's active subgrids into its leading slots and
+        drop slots no replicate needs, returning new slot-space state."""
+        n_batch = self.slot_active.shape[0]
+        # stable sort puts active slots first, in subgrid order
+        order = xp.argsort(~self.slot_active, axis=-1, kind="stable")
+        keep = order[:, : self.n_active]
+
+        def gather(x: "xp.ndarray", per_sub: int) -> "xp.ndarray":
+            offset = xp.arange(per_sub, dtype=xp.int64)
+            index = (keep[:, :, None] * per_sub + offset).reshape(n_batch, -1)
+            return xp.take_along_axis(x, index, axis=-1)
+
+        sub_pop_size = self.geometry.sub_size * self.geometry.tile_pop_size
+        compacted = make_agents(n_batch, keep.shape[1] * sub_pop_size)
+        for name in _FIELD_NAMES:
+            getattr(compacted, name)[:] = gather(
+                getattr(agents, name), sub_pop_size
+            )
+
+        self.slot_sub = xp.take_along_axis(self.slot_sub, keep, axis=-1)
+        self.slot_active = xp.take_along_axis(self.slot_active, keep, axis=-1)
+        return (
+            compacted,
+            gather(last_seen0, self.geometry.sub_size),
+            gather(last_seen1, self.geometry.sub_size),
+        )
+
+    def finish(
+        self,
+        generation: int,
+        agents: AgentStore,
+        last_seen0: "xp.ndarray",
+        last_seen1: "xp.ndarray",
+    ) -> None:
+        """Write back subgrids still active after `generation`."""
+        slots = xp.nonzero(self.slot_active)
+        self._write_back(slots, generation, agents, last_seen0, last_seen1)
+        self.slot_active[:] = False
@@ -0,0 +1,76 @@
+import dataclasses
+
+import numpy as np
+
+from ._hypermutator_backend import to_numpy
+from ._tile_layout import grid_to_subgrid_major, subgrid_major_to_grid
+
+
+@dataclasses.dataclass(frozen=True)
+class HypermutatorGeometry:
+    """Dimensions of a tiled hypermutator population.
+
+    Agents are stored flat, `tile_pop_size` consecutive agents per tile.
+    Tiles are ordered subgrid-major: each run of `sub_size` consecutive tiles
+    is one `n_row_subgrid` x `n_col_subgrid` subgrid in row-major order, and
+    subgrids are themselves laid out row-major over the `n_row` x `n_col`
+    grid.
+    """
+
+    n_row: int
+    n_col: int
+    n_row_subgrid: int
+    n_col_subgrid: int
+    tile_pop_size: int
+
+    @property
+    def n_tile(self) -> int:
+        return self.n_row * self.n_col
+
+    @property
+    def pop_size(self) -> int:
+        return self.n_tile * self.tile_pop_size
+
+    @property
+    def n_sub_row(self) -> int:
+        return self.n_row // self.n_row_subgrid
+
+    @property
+    def n_sub_col(self) -> int:
+        return self.n_col // self.n_col_subgrid
+
+    @property
+    def n_sub(self) -> int:
+        return self.n_sub_row * self.n_sub_col
+
+    @property
+    def sub_size(self) -> int:
+        return self.n_col_subgrid * self.n_row_subgrid
+
+    def to_grid(self, x: np.ndarray) -> np.ndarray:
+        """Rearrange per-tile values from subgrid-major order into a
+        `(n_row, n_col)` grid."""
+        x = to_numpy(x)
+
+        assert x.size == self.n_sub * self.sub_size
+
+        return subgrid_major_to_grid(
+            x.ravel(),
+            self.n_sub_row,
+            self.n_sub_col,
+            self.n_row_subgrid,
+            self.n_col_subgrid,
+        )
+
+    def from_grid(self, grid: np.ndarray) -> np.ndarray:
+        """Inverse of `to_grid`, flattening a `(n_row, n_col)` grid into
+        subgrid-major order."""
+        assert grid.shape == (self.n_row, self.n_col)
+
+        return grid_to_subgrid_major(
+            grid,
+            self.n_sub_row,
+            self.n_sub_col,
+            self.n_row_subgrid,
+            self.n_col_subgrid,
+        )
@@ -0,0 +1,389 @@
+import time
+import typing
+
+from ._hypermutator_backend import xp
+from ._hypermutator_geometry import HypermutatorGeometry
+from ._hypermutator_mutator_init import MutatorInit
+from ._hypermutator_rng import ReplicateRandomState
+from ._hypermutator_simulation_state import SimulationState
+from ._hypermutator_topology import Topology
+from ._hypermutator_tournament import StochasticTournament, Tournament
+
+
+class GenotypeTable(typing.NamedTuple):
+    """Counts of distinct genotypes per tile, one row per nonempty class.
+
+    Genotypes are packed as in output genomes: `ben`, `del_`, `mutator`, and
+    `founder` bytes, from least to most significant.
+    """
+
+    tile: "xp.ndarray"
+    genotype: "xp.ndarray"
+    count: "xp.ndarray"
+
+
+def _consolidate(
+    tile: "xp.ndarray", genotype: "xp.ndarray", count: "xp.ndarray"
+) -> GenotypeTable:
+    """Merge rows of the same class and drop empty ones."""
+    keep = count > 0
+    key = (tile[keep] << 32) | genotype[keep]
+    key, inverse = xp.unique(key, return_inverse=True)
+    count = xp.bincount(
+        inverse.ravel(), weights=count[keep], minlength=key.size
+    )
+    return GenotypeTable(key >> 32, key & 0xFFFFFFFF, count.astype(xp.int64))
+
+
+def _field(genotype: "xp.ndarray", byte: int) -> "xp.ndarray":
+    return ((genotype >> (8 * byte)) & 0xFF).astype(xp.uint8)
+
+
+def _with_field(
+    genotype: "xp.ndarray", byte: int, value: "xp.ndarray"
+) -> "xp.ndarray":
+    value = value.astype(xp.uint8).astype(xp.int64)
+    return (genotype & ~(0xFF << (8 * byte))) | (value << (8 * byte))
+
+
+def _fitness(genotype: "xp.ndarray") -> "xp.ndarray":
+    ben = _field(genotype, 0).view(xp.int8)
+    del_ = _field(genotype, 1).view(xp.int8)
+    return ben - del_  # int8 arithmetic, as for per-agent fields
+
+
+def winner_probabilities(
+    group: "xp.ndarray",
+    fitness: "xp.ndarray",
+    count: "xp.ndarray",
+    p_two: float,
+) -> "xp.ndarray":
+    """Probability that a tournament within each class's group is won by
+    that class.
+
+    With probability `p_two`, two competitors are drawn uniformly with
+    replacement and the fitter wins, ties going to the first; otherwise
+    one random competitor wins. Class `i` with frequency `p_i` thus wins a
+    two-competitor tournament with probability `p_i * (F(f_i) + F-(f_i))`,
+    where `F` and `F-` are the frequencies of fitness at most and below
+    `f_i`.
+    """
+    fitness = fitness.astype(xp.int64) - xp.iinfo(xp.int8).min
+    key = (group << 8) | fitness
+    order = xp.argsort(key)
+    sorted_key = key[order]
+    cum = xp.concatenate([xp.zeros(1, dtype=xp.int64), xp.cumsum(count[order])])
+    group_start = cum[xp.searchsorted(sorted_key, group[order] << 8)]
+    group_stop = cum[xp.searchsorted(sorted_key, (group[order] + 1) << 8)]
+    below = cum[xp.searchsorted(sorted_key, sorted_key, "left")]
+    at_most = cum[xp.searchsorted(sorted_key, sorted_key, "right")]
+
+    n = (group_stop - group_start).astype(xp.float64)
+    freq = count[order] / n
+    two = freq * ((below - group_start) + (at_most - group_start)) / n
+
+    result = xp.empty_like(freq)
+    result[order] = (1.0 - p_two) * freq + p_two * two
+    return result
+
+
+def _tournament_p_two(tournament: StochasticTournament) -> float:
+    # a tournament is singleton iff floor(u + tourn_size) == 1, u ~ U[0, 1)
+    tourn_size = tournament.tourn_size
+    p_one = min(1.0, 2.0 - tourn_size) - max(0.0, 1.0 - tourn_size)
+    return 1.0 - max(0.0, p_one)
+
+
+def _multinomial(
+    stream: "xp.random.RandomState",
+    n: "xp.ndarray",
+    prob: "xp.ndarray",
+    start: "xp.ndarray",
+    stop: "xp.ndarray",
+) -> typing.Tuple["xp.ndarray", "xp.ndarray", "xp.ndarray"]:
+    """For each draw `k`, distribute `n[k]` items over categories
+    `start[k]:stop[k]` of `prob`, which should sum to one.
+
+    Uses conditional binomials, one category at a time, so categories should
+    be in decreasing order of probability for early termination. Returns
+    draw indices, category indices, and counts.
+    """
+    remaining = n.astype(xp.int64)
+    remaining_prob = xp.ones(n.shape, dtype=xp.float64)
+    active = xp.flatnonzero((remaining > 0) & (start < stop))
+    offset = 0
+    draws, categories, counts = [], [], []
+    while active.size:
+        category = start[active] + offset
+        is_last = category == stop[active] - 1
+        p = xp.where(
+            is_last,
+            1.0,
+            xp.clip(prob[category] / remaining_prob[active], 0.0, 1.0),
+        )
+        drawn = stream.binomial(remaining[active], p)
+        draws.append(active)
+        categories.append(category)
+        counts.append(drawn)
+
+        remaining[active] -= drawn
+        remaining_prob[active] -= prob[category]
+        active = active[(remaining[active] > 0) & ~is_last]
+        offset += 1
+
+    if not draws:
+        empty = xp.zeros(0, dtype=xp.int64)
+        return empty, empty, empty
+    return (
+        xp.concatenate(draws),
+        xp.concatenate(categories),
+        xp.concatenate(counts),
+    )
+
+
+def _poisson_continue_prob(lam: "xp.ndarray", k: int) -> "xp.ndarray":
+    """P(K > k | K >= k) for K ~ Poisson(`lam`), without cancellation."""
+    # P(K = k | K >= k) = 1 / sum_m lam^m k! / (k + m)!
+    term = xp.ones_like(lam)
+    total = xp.ones_like(lam)
+    for m in range(1, 64):
+        term = term * lam / (k + m)
+        total += term
+    return 1.0 - 1.0 / total
+
+
+def _mutate_poisson(
+    stream: "xp.random.RandomState",
+    table: GenotypeTable,
+    rate: float,
+    byte: int,
+    cap: typing.Optional[int],
+) -> GenotypeTable:
+    """Add Poisson(`rate` * mutator) to field `byte` of every agent."""
+    if rate == 0.0:
+        return table
+    lam = rate * _field(table.genotype, 2)
+    value = _field(table.genotype, byte).view(xp.int8).astype(xp.int64)
+    tiles, genotypes, counts = [], [], []
+
+    remaining = table.count
+    row = xp.arange(remaining.size)
+    k = 0
+    while row.size:
+        n_continue = stream.binomial(
+            remaining, _poisson_continue_prob(lam[row], k)
+        )
+        n_stop = remaining - n_continue
+        new_value = value[row] + k
+        if cap is not None:
+            new_value = xp.minimum(new_value, cap)
+        tiles.append(table.tile[row])
+        genotypes.append(_with_field(table.genotype[row], byte, new_value))
+        counts.append(n_stop)
+
+        keep = n_continue > 0
+        row, remaining = row[keep], n_continue[keep]
+        k += 1
+
+    return _consolidate(
+        xp.concatenate(tiles), xp.concatenate(genotypes), xp.concatenate(counts)
+    )
+
+
+def _mutate_denovo(
+    stream: "xp.random.RandomState", table: GenotypeTable, rate: float
+) -> GenotypeTable:
+    """Convert Binomial(count, `rate`) agents of each class to mutators."""
+    if rate == 0.0:
+        return table
+    is_wildtype = _field(table.genotype, 2) != 100
+    n_convert = xp.where(is_wildtype, stream.binomial(table.count, rate), 0)
+    converted = _with_field(
+        table.genotype, 2, xp.full(table.genotype.shape, 100, dtype=xp.uint8)
+    )
+    return _consolidate(
+        xp.concatenate([table.tile, table.tile]),
+        xp.concatenate([table.genotype, converted]),
+        xp.concatenate([table.count - n_convert, n_convert]),
+    )
+
+
+def _migration_pairs(
+    geometry: HypermutatorGeometry, topology: Topology
+) -> typing.Tuple["xp.ndarray", "xp.ndarray", "xp.ndarray", "xp.ndarray"]:
+    """Selection group of each tile and, for each destination tile and
+    source group, how many of the tile's slots are filled from that group
+    after selection and migration."""
+    tile_pop_size = geometry.tile_pop_size
+    group_min, group_max = topology.selection_bounds(geometry)
+    assert (group_min % tile_pop_size == 0).all(), "groups must be tiles"
+    assert (group_max % tile_pop_size == 0).all(), "groups must be tiles"
+    _, slot_group = xp.unique(group_min, return_inverse=True)
+    slot_group = slot_group.ravel().astype(xp.int64)
+    tile_group = slot_group[::tile_pop_size]
+    assert (slot_group == xp.repeat(tile_group, tile_pop_size)).all()
+
+    source = topology.migration_permutation(geometry)
+    if source is None:
+        source = xp.arange(geometry.pop_size)
+    dest_tile = xp.arange(geometry.pop_size) // tile_pop_size
+    key = (dest_tile << 32) | slot_group[source]
+    key, n = xp.unique(key, return_counts=True)
+    return tile_group, key >> 32, key & 0xFFFFFFFF, n
+
+
+def _select(
+    stream: "xp.random.RandomState",
+    table: GenotypeTable,
+    tile_group: "xp.ndarray",
+    pair_tile: "xp.ndarray",
+    pair_group: "xp.ndarray",
+    pair_n: "xp.ndarray",
+    p_two: float,
+) -> GenotypeTable:
+    """Fill each tile's slots with tournament winners from their source
+    groups.
+
+    Winners of different slots are independent given the parent population,
+    so slots filled from the same group are a multinomial draw over that
+    group's classes, weighted by win probability.
+    """
+    groups = _consolidate(tile_group[table.tile], table.genotype, table.count)
+    prob = winner_probabilities(
+        groups.tile, _fitness(groups.genotype), groups.count, p_two
+    )
+
+    order = xp.lexsort(xp.stack([-prob, groups.tile]))
+    group, genotype, prob = (
+        groups.tile[order],
+        groups.genotype[order],
+        prob[order],
+    )
+    start = xp.searchsorted(group, pair_group, "left")
+    stop = xp.searchsorted(group, pair_group, "right")
+
+    pair, category, count = _multinomial(stream, pair_n, prob, start, stop)
+    return _consolidate(pair_tile[pair], genotype[category], count)
+
+
+def _last_seen(
+    table: GenotypeTable,
+    n_tile: int,
+    tile_pop_size: int,
+    generation: int,
+    last_seen0: "xp.ndarray",
+    last_seen1: "xp.ndarray",
+) -> None:
+    is_mutator = _field(table.genotype, 2) != 1
+    trait = xp.bincount(
+        table.tile, weights=table.count * is_mutator, minlength=n_tile
+    )
+    last_seen0[trait < tile_pop_size] = generation
+    last_seen1[trait > 0] = generation
+
+
+def _initial_table(
+    rng: ReplicateRandomState,
+    geometry: HypermutatorGeometry,
+    mutator_init: MutatorInit,
+    agent_offset: int,
+) -> GenotypeTable:
+    pop_size = geometry.pop_size
+    pop_mutator = xp.ones((1, pop_size), dtype=xp.uint8)
+    mutator_init.initialize(rng, pop_mutator)
+    founder = (xp.arange(pop_size) + agent_offset) % 256
+    return _consolidate(
+        xp.arange(pop_size) // geometry.tile_pop_size,
+        (pop_mutator[0].astype(xp.int64) << 16) | (founder << 24),
+        xp.ones(pop_size, dtype=xp.int64),
+    )
+
+
+def _expand(
+    rng: ReplicateRandomState, table: GenotypeTable
+) -> typing.List["xp.ndarray"]:
+    """Per-agent fields, with agents in random order within each tile."""
+    genotype = xp.repeat(table.genotype, table.count)
+    tile = xp.repeat(table.tile, table.count)
+    order = xp.lexsort(xp.stack([rng.rand(genotype.size)[0], tile]))
+    genotype = genotype[order]
+    return [
+        _field(genotype, 0).view(xp.int8),
+        _field(genotype, 1).view(xp.int8),
+        _field(genotype, 2),
+        _field(genotype, 3),
+    ]
+
+
+def simulate_histogram(
+    geometry: HypermutatorGeometry,
+    n_gen: int,
+    seeds: typing.Sequence[int],
+    n_ben: int,
+    mutator_init: MutatorInit,
+    topology: Topology,
+    tournament: Tournament,
+    pben: float,
+    pdel: float,
+    tile_offset: int = 0,
+    progress: bool = True,
+) -> typing.Tuple[SimulationState, int]:
+    """Run the hypermutator main loop on per-tile genotype counts.
+
+    Equivalent in distribution to `simulate`, but stores and updates only
+    the distinct genotypes of each tile, with selection and mutation drawn
+    as multinomial and binomial splits of genotype classes. Cost scales
+    with genotype diversity rather than population size. Selection groups
+    must be whole tiles, as for all built-in topologies.
+
+    Replicates are simulated one after another, each from its own seed, and
+    expanded to per-agent state at the end, in random order within tiles.
+    """
+    assert isinstance(tournament, StochasticTournament)
+    p_two = _tournament_p_two(tournament)
+    tile_group, *pairs = _migration_pairs(geometry, topology)
+    n_tile, tile_pop_size = geometry.n_tile, geometry.tile_pop_size
+    denovo_rate = mutator_init.denovo_rate(pben)
+
+    n_batch = len(seeds)
+    fields = []
+    last_seen0 = xp.zeros((n_batch, n_tile), dtype=xp.uint32)
+    last_seen1 = xp.zeros((n_batch, n_tile), dtype=xp.uint32)
+    elapsed_ns = 0
+    for i, seed in enumerate(seeds):
+        rng = ReplicateRandomState([seed])
+        (stream,) = rng.rngs
+        table = _initial_table(
+            rng, geometry, mutator_init, tile_offset * tile_pop_size
+        )
+
+        generations: typing.Iterable[int] = range(n_gen)
+        if progress:
+            import tqdm as tq
+
+            generations = tq.tqdm(generations)
+        start_time = time.perf_counter_ns()
+        for generation in generations:
+            table = _mutate_denovo(stream, table, denovo_rate)
+            table = _mutate_poisson(stream, table, pben, 0, cap=n_ben)
+            table = _mutate_poisson(stream, table, pdel, 1, cap=None)
+            table = _select(stream, table, tile_group, *pairs, p_two)
+            _last_seen(
+                table,
+                n_tile,
+                tile_pop_size,
+                generation,
+                last_seen0[i],
+                last_seen1[i],
+            )
+        elapsed_ns += time.perf_counter_ns() - start_time
+
+        fields.append(_expand(rng, table))
+
+    state = SimulationState(
+        *(xp.stack(field) for field in zip(*fields)),
+        last_seen0=last_seen0,
+        last_seen1=last_seen1,
+        kernel="histogram",
+    )
+    return state, elapsed_ns
@@ -0,0 +1,89 @@
+import math
+import typing
+
+from ._hypermutator_backend import xp
+from ._hypermutator_rng import ReplicateRandomState
+from ._hypermutator_sparse_mutation import sample_mutation_sites
+
+
+class MutatorInit(typing.Protocol):
+    """Strategy for how the mutator trait enters the population.
+
+    Populations are `(n_replicate, pop_size)` arrays.
+    """
+
+    def initialize(self, rng: ReplicateRandomState, pop_mutator) -> None:
+        """Seed mutator alleles into the founding population, in place."""
+
+    def mutate(
+        self,
+        rng: ReplicateRandomState,
+        pop_mutator,
+        pben: float,
+        sparse: bool = False,
+    ) -> typing.List["xp.ndarray"]:
+        """Introduce mutator alleles during `mutate()`, in place.
+
+        If `sparse`, sample mutation sites directly rather than drawing per
+        agent, with equivalent distribution. Returns, per replicate, indices
+        of agents converted from wildtype, each listed once, or an empty
+        list if none can be.
+        """
+
+    def denovo_rate(self, pben: float) -> float:
+        """Per-agent, per-generation probability of gaining the mutator
+        allele, for kernels that fuse mutation into their own loop."""
+
+
+class FiftyFiftyMutatorInit:
+    """Half of founders, in expectation, carry the mutator allele; no mutator
+    alleles arise de novo."""
+
+    def initialize(self, rng: ReplicateRandomState, pop_mutator) -> None:
+        pop_mutator[rng.rand(pop_mutator.shape[-1]) < 0.5] = 100
+
+    def mutate(
+        self,
+        rng: ReplicateRandomState,
+        pop_mutator,
+        pben: float,
+        sparse: bool = False,
+    ) -> typing.List["xp.ndarray"]:
+        return []
+
+    def denovo_rate(self, pben: float) -> float:
+        return 0.0
+
+
+class DeNovoMutatorInit:
+    """Founders are all wildtype; mutator alleles arise de novo at the
+    beneficial mutation rate each generation."""
+
+    def initialize(self, rng: ReplicateRandomState, pop_mutator) -> None:
+        pass
+
+    def mutate(
+        self,
+        rng: ReplicateRandomState,
+        pop_mutator,
+        pben: float,
+        sparse: bool = False,
+    ) -> typing.List["xp.ndarray"]:
+        pop_size = pop_mutator.shape[-1]
+        if sparse:
+            # agent has >= 1 Poisson(-log(1 - pben)) events w.p. exactly pben
+            rate = -math.log1p(-pben)
+            sites = sample_mutation_sites(rng, rate, pop_size)
+            converted = []
+            for row, row_sites in zip(pop_mutator, sites):
+                row_sites = xp.unique(row_sites[row[row_sites] == 1])
+                row[row_sites] = 100
+                converted.append(row_sites)
+            return converted
+
+        converted = (rng.rand(pop_size) < pben) & (pop_mutator == 1)
+        pop_mutator[converted] = 100
+        return [xp.flatnonzero(row) for row in converted]
+
+    def denovo_rate(self, pben: float) -> float:
+        return pben
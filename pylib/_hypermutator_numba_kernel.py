@@ -0,0 +1,198 @@
+import math
+import typing
+
+import numpy as np
+
+try:
+    import numba
+
+    njit = numba.njit
+    prange = numba.prange
+except ImportError:
+    numba = None
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+    prange = range
+
+
+HAS_NUMBA = numba is not None
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+@njit(cache=True, inline="always")
+def _splitmix64(state: np.uint64) -> typing.Tuple[np.uint64, float]:
+    """Advance `state`, returning it and a uniform draw on [0, 1)."""
+    state = state + _GOLDEN_GAMMA
+    z = state
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return state, (z >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+
+@njit(cache=True, inline="always")
+def _poisson(state: np.uint64, lam: float) -> typing.Tuple[np.uint64, int]:
+    """Draw Poisson(`lam`) by inversion, suited to the small rates here."""
+    state, u = _splitmix64(state)
+    k = 0
+    p = math.exp(-lam)
+    cdf = p
+    while u > cdf and p > 0.0:
+        k += 1
+        p *= lam / k
+        cdf += p
+    return state, k
+
+
+def seed_tile_states(seeds: typing.Sequence[int], n_tile: int) -> np.ndarray:
+    """Derive one independent splitmix64 state per replicate and tile."""
+    with np.errstate(over="ignore"):
+        keys = np.asarray(seeds, dtype=np.uint64)[:, None] * np.uint64(
+            n_tile
+        ) + np.arange(n_tile, dtype=np.uint64)
+        z = (keys + np.uint64(1)) * _GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+@njit(cache=True, parallel=True)
+def mutate_kernel(
+    ben: np.ndarray,
+    del_: np.ndarray,
+    mutator: np.ndarray,
+    rng_state: np.ndarray,
+    tile_pop_size: int,
+    n_ben: int,
+    pben: float,
+    pdel: float,
+    denovo_rate: float,
+) -> None:
+    """Apply one generation's mutations to every agent, in place."""
+    n_batch, n_tile = rng_state.shape
+    for rt in prange(n_batch * n_tile):
+        r, t = rt // n_tile, rt % n_tile
+        state = rng_state[r, t]
+        for j in range(t * tile_pop_size, (t + 1) * tile_pop_size):
+            state = _mutate_agent(
+                state, ben, del_, mutator, r, j, n_ben, pben, pdel, denovo_rate
+            )
+        rng_state[r, t] = state
+
+
+@njit(cache=True, inline="always")
+def _mutate_agent(
+    state: np.uint64,
+    ben: np.ndarray,
+    del_: np.ndarray,
+    mutator: np.ndarray,
+    r: int,
+    j: int,
+    n_ben: int,
+    pben: float,
+    pdel: float,
+    denovo_rate: float,
+) -> np.uint64:
+    if denovo_rate > 0.0:
+        state, u = _splitmix64(state)
+        if u < denovo_rate:
+            mutator[r, j] = 100
+
+    state, n = _poisson(state, pben * mutator[r, j])
+    ben[r, j] = min(ben[r, j] + n, n_ben)
+    state, n = _poisson(state, pdel * mutator[r, j])
+    del_[r, j] += n
+    return state
+
+
+@njit(cache=True, inline="always")
+def _fitness(ben: np.int8, del_: np.int8) -> int:
+    """`ben - del_`, wrapped to int8 as for NumPy int8 arrays."""
+    return ((int(ben) - int(del_) + 128) & 0xFF) - 128
+
+
+@njit(cache=True, parallel=True)
+def generation_kernel(
+    ben: np.ndarray,
+    del_: np.ndarray,
+    mutator: np.ndarray,
+    founder: np.ndarray,
+    out_ben: np.ndarray,
+    out_del: np.ndarray,
+    out_mutator: np.ndarray,
+    out_founder: np.ndarray,
+    last_seen0: np.ndarray,
+    last_seen1: np.ndarray,
+    rng_state: np.ndarray,
+    group_min: np.ndarray,
+    group_max: np.ndarray,
+    tcm: np.ndarray,
+    tile_pop_size: int,
+    generation: int,
+    tourn_size: float,
+    mutate_next: bool,
+    n_ben: int,
+    pben: float,
+    pdel: float,
+    denovo_rate: float,
+) -> None:
+    """Fused select, migrate, and last_seen for one generation, followed by
+    the next generation's mutation, in one pass over tiles.
+
+    Slot `j` of the output is filled with the winner of the tournament held
+    for slot `tcm[j]`, which composes selection with migration. Each tile
+    draws from its own random stream, so results do not depend on thread
+    count or scheduling.
+    """
+    n_batch, n_tile = rng_state.shape
+    for rt in prange(n_batch * n_tile):
+        r, t = rt // n_tile, rt % n_tile
+        state = rng_state[r, t]
+        n_mutator = 0
+        for j in range(t * tile_pop_size, (t + 1) * tile_pop_size):
+            src = tcm[j]
+            lo = group_min[src]
+            n = group_max[src] - lo
+
+            state, u = _splitmix64(state)
+            state, u1 = _splitmix64(state)
+            tc1 = lo + int(u1 * n)
+            tc2 = tc1
+            if int(math.floor(u + tourn_size)) != 1:
+                state, u2 = _splitmix64(state)
+                tc2 = lo + int(u2 * n)
+
+            fit1 = _fitness(ben[r, tc1], del_[r, tc1])
+            fit2 = _fitness(ben[r, tc2], del_[r, tc2])
+            win = tc1 if fit1 >= fit2 else tc2
+
+            out_ben[r, j] = ben[r, win]
+            out_del[r, j] = del_[r, win]
+            out_mutator[r, j] = mutator[r, win]
+            out_founder[r, j] = founder[r, win]
+            n_mutator += out_mutator[r, j] != 1
+
+        if n_mutator < tile_pop_size:
+            last_seen0[r, t] = generation
+        if n_mutator > 0:
+            last_seen1[r, t] = generation
+
+        if mutate_next:
+            for j in range(t * tile_pop_size, (t + 1) * tile_pop_size):
+                state = _mutate_agent(
+                    state,
+                    out_ben,
+                    out_del,
+                    out_mutator,
+                    r,
+                    j,
+                    n_ben,
+                    pben,
+                    pdel,
+                    denovo_rate,
+                )
+
+        rng_state[r, t] = state
@@ -0,0 +1,53 @@
+import contextlib
+import time
+import typing
+
+import numpy as np
+
+from ._hypermutator_backend import xp
+
+
+def _synchronize() -> None:
+    if xp is not np:
+        xp.cuda.Stream.null.synchronize()  # time kernels, not launches
+
+
+class PhaseTimer:
+    """Wall time of each main loop phase, for every `every`-th generation.
+
+    Device work is synchronized at phase boundaries of sampled generations
+    only, so unsampled generations run as usual.
+    """
+
+    def __init__(self, every: int) -> None:
+        if every < 1:
+            raise ValueError(f"profile interval must be positive, not {every}")
+        self.every = every
+        self.generations: typing.List[int] = []
+        self.phase_ns: typing.Dict[str, typing.List[int]] = {}
+
+    def is_sampled(self, generation: int) -> bool:
+        if generation % self.every:
+            return False
+        self.generations.append(generation)
+        return True
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> typing.Iterator[None]:
+        _synchronize()
+        start_time = time.perf_counter_ns()
+        yield
+        _synchronize()
+        elapsed_ns = time.perf_counter_ns() - start_time
+        self.phase_ns.setdefault(name, []).append(elapsed_ns)
+
+    def to_dict(self) -> typing.Dict[str, np.ndarray]:
+        """Sampled generations, keyed "generation", and per-phase elapsed
+        nanoseconds for each, keyed by phase name."""
+        return {
+            "generation": np.array(self.generations, dtype=np.uint32),
+            **{
+                name: np.array(elapsed_ns, dtype=np.int64)
+                for name, elapsed_ns in self.phase_ns.items()
+            },
+        }
@@ -0,0 +1,190 @@
+import typing
+
+import numpy as np
+
+from ._hypermutator_backend import xp
+
+
+class ReplicateRandomState:
+    """Independent `RandomState` stream per replicate, drawn row-wise.
+
+    Draws are returned with a leading replicate axis. Replicate `i` consumes
+    its stream exactly as a single, unbatched run seeded with `seeds[i]`
+    would, so batched replicates reproduce their unbatched counterparts.
+    """
+
+    def __init__(self, seeds: typing.Sequence[int]) -> None:
+        self.rngs = [xp.random.RandomState(seed) for seed in seeds]
+
+    def __len__(self) -> int:
+        return len(self.rngs)
+
+    def start_generation(self, generation: int) -> None:
+        pass
+
+    def get_state(self) -> typing.Dict[str, np.ndarray]:
+        """Position of each stream, as host arrays, for checkpointing.
+
+        Requires the NumPy backend.
+        """
+        states = [rng.get_state() for rng in self.rngs]
+        return {
+            "key": np.stack([state[1] for state in states]),
+            "pos": np.array([state[2] for state in states]),
+            "has_gauss": np.array([state[3] for state in states]),
+            "cached_gaussian": np.array([state[4] for state in states]),
+        }
+
+    def set_state(self, state: typing.Dict[str, np.ndarray]) -> None:
+        """Restore stream positions saved by `get_state`."""
+        for i, rng in enumerate(self.rngs):
+            rng.set_state(
+                (
+                    "MT19937",
+                    state["key"][i],
+                    int(state["pos"][i]),
+                    int(state["has_gauss"][i]),
+                    float(state["cached_gaussian"][i]),
+                )
+            )
+
+    def _stack(self, rows: typing.List["xp.ndarray"]) -> "xp.ndarray":
+        if len(rows) == 1:
+            return rows[0][None, ...]  # avoid copy in the unbatched case
+        return xp.stack(rows)
+
+    def rand(self, size: int) -> "xp.ndarray":
+        return self._stack([rng.rand(size) for rng in self.rngs])
+
+    def poisson(self, lam: "xp.ndarray") -> "xp.ndarray":
+        return self._stack(
+            [rng.poisson(row) for rng, row in zip(self.rngs, lam)]
+        )
+
+    def randint(
+        self, low: "xp.ndarray", high: "xp.ndarray", dtype: type
+    ) -> "xp.ndarray":
+        return self._stack(
+            [rng.randint(low, high, dtype=dtype) for rng in self.rngs]
+        )
+
+
+_PHILOX_M0, _PHILOX_M1 = 0xD2511F53, 0xCD9E8D57
+_PHILOX_W0, _PHILOX_W1 = 0x9E3779B9, 0xBB67AE85
+_MASK32 = 0xFFFFFFFF
+
+
+def philox4x32(
+    counter: typing.Sequence["xp.ndarray"], key: typing.Sequence["xp.ndarray"]
+) -> typing.List["xp.ndarray"]:
+    """Philox4x32-10 block function, vectorized over broadcast arrays.
+
+    Takes four counter words and two key words, each a `uint64` array
+    holding a 32-bit value, and returns the four output words likewise.
+    """
+    c0, c1, c2, c3 = counter
+    k0, k1 = key
+    for round_ in range(10):
+        if round_:
+            k0 = (k0 + xp.uint64(_PHILOX_W0)) & xp.uint64(_MASK32)
+            k1 = (k1 + xp.uint64(_PHILOX_W1)) & xp.uint64(_MASK32)
+        p0 = c0 * xp.uint64(_PHILOX_M0)
+        p1 = c2 * xp.uint64(_PHILOX_M1)
+        c0, c1, c2, c3 = (
+            (p1 >> xp.uint64(32)) ^ c1 ^ k0,
+            p1 & xp.uint64(_MASK32),
+            (p0 >> xp.uint64(32)) ^ c3 ^ k1,
+            p0 & xp.uint64(_MASK32),
+        )
+    return [c0, c1, c2, c3]
+
+
+class CounterRandomState:
+    """Stateless per-agent draws from Philox4x32-10, keyed by position.
+
+    Each draw for agent slot `j` of a replicate is a pure function of the
+    replicate's seed (the Philox key) and the counter (slot within tile,
+    global tile index, generation, phase), where phase counts draws within
+    the current generation. Draws do not depend on how replicates are
+    batched, on how tiles are partitioned across shards, or on whether
+    NumPy or CuPy is the backend.
+
+    Interface matches `ReplicateRandomState`, except that draws must span
+    the whole (sub)population, i.e., `size` agents starting at tile
+    `tile_offset`.
+    """
+
+    _INIT_GENERATION = _MASK32  # initialization draws precede generation 0
+
+    def __init__(
+        self,
+        seeds: typing.Sequence[int],
+        tile_pop_size: int,
+        tile_offset: int = 0,
+    ) -> None:
+        seeds = xp.asarray([int(seed) for seed in seeds], dtype=xp.uint64)
+        self.key = (
+            (seeds & xp.uint64(_MASK32))[:, None],
+            (seeds >> xp.uint64(32))[:, None],
+        )
+        self.tile_pop_size = tile_pop_size
+        self.tile_offset = tile_offset
+        self.start_generation(self._INIT_GENERATION)
+
+    def __len__(self) -> int:
+        return len(self.key[0])
+
+    def start_generation(self, generation: int) -> None:
+        self.generation = generation
+        self.phase = 0
+
+    def get_state(self) -> typing.Dict[str, np.ndarray]:
+        """Empty; draws depend only on position, so there is nothing to
+        checkpoint."""
+        return {}
+
+    def set_state(self, state: typing.Dict[str, np.ndarray]) -> None:
+        pass
+
+    def _uniform(self, size: int) -> "xp.ndarray":
+        index = xp.arange(size, dtype=xp.uint64)
+        tile_pop_size = xp.uint64(self.tile_pop_size)
+        counter = (
+            index % tile_pop_size,
+            index // tile_pop_size + xp.uint64(self.tile_offset),
+            xp.uint64(self.generation),
+            xp.uint64(self.phase),
+        )
+        self.phase += 1
+
+        hi, lo, _, _ = philox4x32(counter, self.key)
+        bits = (hi << xp.uint64(21)) ^ (lo >> xp.uint64(11))
+        return bits.astype(xp.float64) * (1.0 / 9007199254740992.0)
+
+    def rand(self, size: int) -> "xp.ndarray":
+        return self._uniform(size)
+
+    def poisson(self, lam: "xp.ndarray") -> "xp.ndarray":
+        """Poisson draws by sequential inversion of one uniform per agent,
+        which takes few iterations at the small rates used here."""
+        u = self._uniform(lam.shape[-1]).ravel()
+        lam = xp.broadcast_to(lam, (len(self), lam.shape[-1])).ravel()
+        k = xp.zeros(u.shape, dtype=xp.int64)
+        p = xp.exp(-lam)
+        cdf = p.copy()
+
+        idx = xp.flatnonzero(u > cdf)
+        while idx.size:
+            k[idx] += 1
+            p[idx] *= lam[idx] / k[idx]
+            cdf[idx] += p[idx]
+            idx = idx[(u[idx] > cdf[idx]) & (p[idx] > 0)]
+
+        return k.reshape(len(self), -1)
+
+    def randint(
+        self, low: "xp.ndarray", high: "xp.ndarray", dtype: type
+    ) -> "xp.ndarray":
+        u = self._uniform(low.shape[-1])
+        span = (high - low).astype(xp.float64)
+        return (low + xp.floor(u * span).astype(xp.int64)).astype(dtype)
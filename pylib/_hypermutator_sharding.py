@@ -0,0 +1,223 @@
+import concurrent.futures
+import contextlib
+import dataclasses
+import multiprocessing
+import time
+import typing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ._hypermutator_backend import to_numpy
+from ._hypermutator_geometry import HypermutatorGeometry
+from ._hypermutator_simulate import simulate
+from ._hypermutator_simulation_state import SimulationState
+
+
+def shard_seed(seed: int, shard: int) -> int:
+    """Derive an independent random seed for one shard of a replicate."""
+    return int(np.random.SeedSequence([seed, shard]).generate_state(1)[0])
+
+
+def shard_checkpoint_path(path: str, shard: int) -> str:
+    """Checkpoint file for one shard of a run checkpointed to `path`."""
+    return f"{path}.shard{shard}"
+
+
+def shard_subgrids(n_sub: int, n_shard: int) -> typing.List[range]:
+    """Split subgrid indices into `n_shard` contiguous, near-equal runs."""
+    n_shard = min(n_shard, n_sub)
+    bounds = [shard * n_sub // n_shard for shard in range(n_shard + 1)]
+    return [range(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def shard_geometry(
+    geometry: HypermutatorGeometry, subgrids: range
+) -> HypermutatorGeometry:
+    """Geometry of a run of subgrids simulated on their own.
+
+    Subgrids are stacked into one column, which keeps the shard's flat,
+    subgrid-major agent layout identical to its slice of the full
+    population.
+    """
+    return dataclasses.replace(
+        geometry,
+        n_row=geometry.n_row_subgrid * len(subgrids),
+        n_col=geometry.n_col_subgrid,
+    )
+
+
+def _field_specs(
+    n_batch: int, geometry: HypermutatorGeometry
+) -> typing.Dict[str, typing.Tuple[tuple, np.dtype]]:
+    pop_shape = (n_batch, geometry.pop_size)
+    tile_shape = (n_batch, geometry.n_tile)
+    return {
+        "ben": (pop_shape, np.dtype(np.int8)),
+        "del_": (pop_shape, np.dtype(np.int8)),
+        "mutator": (pop_shape, np.dtype(np.uint8)),
+        "founder": (pop_shape, np.dtype(np.uint8)),
+        "last_seen0": (tile_shape, np.dtype(np.uint32)),
+        "last_seen1": (tile_shape, np.dtype(np.uint32)),
+    }
+
+
+def _run_shard(
+    shm_names: typing.Dict[str, str],
+    geometry: HypermutatorGeometry,
+    subgrids: range,
+    shard: int,
+    seeds: typing.Sequence[int],
+    simulate_kwargs: dict,
+) -> typing.Tuple[
+    typing.Optional[typing.Dict[str, np.ndarray]],
+    typing.Optional[np.ndarray],
+    str,
+]:
+    if not simulate_kwargs.get("counter_rng"):
+        seeds = [shard_seed(seed, shard) for seed in seeds]
+    # else, counter-based draws are keyed by global tile, so share seeds
+    for name in "checkpoint_path", "resume_from":
+        if simulate_kwargs.get(name) is not None:
+            path = shard_checkpoint_path(simulate_kwargs[name], shard)
+            simulate_kwargs = {**simulate_kwargs, name: path}
+    state, _ = simulate(
+        shard_geometry(geometry, subgrids),
+        seeds=seeds,
+        tile_offset=subgrids.start * geometry.sub_size,
+        progress=False,
+        **simulate_kwargs,
+    )
+
+    agent_slice = slice(
+        subgrids.start * geometry.sub_size * geometry.tile_pop_size,
+        subgrids.stop * geometry.sub_size * geometry.tile_pop_size,
+    )
+    tile_slice = slice(
+        subgrids.start * geometry.sub_size,
+        subgrids.stop * geometry.sub_size,
+    )
+    specs = _field_specs(len(seeds), geometry)
+    for field, name in shm_names.items():
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            shape, dtype = specs[field]
+            out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            is_tile_field = field.startswith("last_seen")
+            out[:, tile_slice if is_tile_field else agent_slice] = to_numpy(
+                getattr(state, field)
+            )
+            del out  # release buffer export before close
+        finally:
+            shm.close()
+
+    simulated_generations = state.simulated_generations
+    if simulated_generations is not None:
+        simulated_generations = to_numpy(simulated_generations)
+    return state.phase_ns, simulated_generations, state.kernel
+
+
+def _sum_phase_ns(
+    shard_phase_ns: typing.List[typing.Optional[typing.Dict[str, np.ndarray]]],
+) -> typing.Optional[typing.Dict[str, np.ndarray]]:
+    if shard_phase_ns[0] is None:
+        return None
+    summed = {
+        phase: sum(phase_ns[phase] for phase_ns in shard_phase_ns)
+        for phase in shard_phase_ns[0]
+    }
+    summed["generation"] = shard_phase_ns[0]["generation"]
+    return summed
+
+
+def simulate_sharded(
+    geometry: HypermutatorGeometry,
+    seeds: typing.Sequence[int],
+    n_shard: int,
+    **simulate_kwargs,
+) -> typing.Tuple[SimulationState, int]:
+    """Run `simulate` with subgrids partitioned across worker processes.
+
+    Selection and migration never cross subgrid boundaries, so each shard
+    of contiguous subgrids evolves independently. Workers write final state
+    directly into shared memory at their shard's offset. Workers are
+    spawned, so each pays interpreter and import startup.
+
+    Per-phase timings, if profiled, are summed over shards, and generations
+    simulated per subgrid, if reported, are concatenated. Checkpoints, if
+    any, are kept per shard, at `shard_checkpoint_path`. Each shard draws
+    from its own random stream, derived from each seed and
+    the shard index. Results are reproducible for a given `n_shard`, but
+    differ from unsharded runs, unless `counter_rng` is set, in which case
+    results are identical for any `n_shard`.
+
+    Parameters
+    ----------
+    geometry : HypermutatorGeometry
+        Full population geometry.
+    seeds : sequence of int
+        One seed per replicate.
+    n_shard : int
+        Number of worker processes; capped at the number of subgrids.
+    **simulate_kwargs
+        Forwarded to `simulate`.
+
+    Returns
+    -------
+    tuple of SimulationState and int
+        Final host state, and elapsed wall time for all shards, in
+        nanoseconds.
+    """
+    if simulate_kwargs.get("summary_path") is not None:
+        raise ValueError("summaries are not supported with sharding")
+    shards = shard_subgrids(geometry.n_sub, n_shard)
+    specs = _field_specs(len(seeds), geometry)
+
+    with contextlib.ExitStack() as stack:
+        shms = {}
+        for field, (shape, dtype) in specs.items():
+            nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            stack.callback(shm.unlink)
+            stack.callback(shm.close)
+            shms[field] = shm
+
+        start_time = time.perf_counter_ns()
+        # spawn, not fork: forking after a threaded kernel has run can deadlock
+        with concurrent.futures.ProcessPoolExecutor(
+            len(shards), mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_shard,
+                    {field: shm.name for field, shm in shms.items()},
+                    geometry,
+                    subgrids,
+                    shard,
+                    seeds,
+                    simulate_kwargs,
+                )
+                for shard, subgrids in enumerate(shards)
+            ]
+            phase_ns, simulated_generations, kernels = zip(
+                *(future.result() for future in futures)
+            )
+        elapsed_ns = time.perf_counter_ns() - start_time
+
+        state = SimulationState(
+            **{
+                field: np.ndarray(
+                    shape, dtype=dtype, buffer=shms[field].buf
+                ).copy()
+                for field, (shape, dtype) in specs.items()
+            },
+            phase_ns=_sum_phase_ns(phase_ns),
+            simulated_generations=(
+                None
+                if simulated_generations[0] is None
+                else np.concatenate(simulated_generations, axis=-1)
+            ),
+            kernel=kernels[0],  # shards share options, so pick alike
+        )
+
+    return state, elapsed_ns
@@ -0,0 +1,478 @@
+import time
+import typing
+
+import numpy as np
+
+from ._hypermutator_agent_store import PackedAgentStore, SeparateAgentStore
+from ._hypermutator_backend import xp
+from ._hypermutator_checkpoint import CheckpointWriter, load_checkpoint
+from ._hypermutator_geometry import HypermutatorGeometry
+from ._hypermutator_fixation import SubgridFreezer
+from ._hypermutator_histogram import simulate_histogram
+from ._hypermutator_mutator_init import MutatorInit
+from ._hypermutator_numba_kernel import (
+    HAS_NUMBA,
+    generation_kernel,
+    mutate_kernel,
+    seed_tile_states,
+)
+from ._hypermutator_phase_timer import PhaseTimer
+from ._hypermutator_rng import CounterRandomState, ReplicateRandomState
+from ._hypermutator_simulation_state import SimulationState
+from ._hypermutator_sparse_mutation import sample_mutation_sites
+from ._hypermutator_summary import SummaryWriter, summarize
+from ._hypermutator_topology import Topology
+from ._hypermutator_trait_tracker import TraitTracker
+from ._hypermutator_tournament import StochasticTournament, Tournament
+
+
+def _use_numba_kernel(
+    kernel: str, tournament: Tournament, numpy_options: bool
+) -> bool:
+    eligible = (
+        HAS_NUMBA
+        and xp is np
+        and isinstance(tournament, StochasticTournament)
+        and not numpy_options
+    )
+    if kernel == "auto":
+        return eligible
+    elif kernel == "numba":
+        if not eligible:
+            raise ValueError(
+                "numba kernel requires numba, a NumPy backend, and a "
+                "StochasticTournament, and does not support packed, "
+                "compose_migration, sparse_mutation, counter_rng, "
+                "profile_every, incremental_traits, or fixation_every"
+            )
+        return True
+    elif kernel == "numpy":
+        return False
+    else:
+        raise ValueError(f"unknown kernel {kernel!r}")
+
+
+_CHECKPOINT_FIELDS = (
+    "ben",
+    "del_",
+    "mutator",
+    "founder",
+    "last_seen0",
+    "last_seen1",
+)
+
+
+def _agent_fields(
+    agents: typing.Union[PackedAgentStore, SeparateAgentStore],
+) -> typing.List["xp.ndarray"]:
+    return [agents.ben, agents.del_, agents.mutator, agents.founder]
+
+
+def _host_copy(x: "xp.ndarray") -> np.ndarray:
+    return x.copy() if isinstance(x, np.ndarray) else x.get()
+
+
+def _check_resumable(
+    checkpoint: typing.Dict[str, np.ndarray],
+    seeds: typing.Sequence[int],
+    kernel: str,
+    pop_shape: typing.Tuple[int, int],
+) -> None:
+    if checkpoint["ben"].shape != pop_shape:
+        raise ValueError(
+            f"checkpoint population shape {checkpoint['ben'].shape} does "
+            f"not match {pop_shape}"
+        )
+    if not np.array_equal(checkpoint["seeds"], seeds):
+        raise ValueError(
+            f"checkpoint seeds {checkpoint['seeds']} do not match {seeds}"
+        )
+    if str(checkpoint["kernel"]) != kernel:
+        raise ValueError(
+            f"checkpoint kernel {checkpoint['kernel']} does not match {kernel}"
+        )
+
+
+def simulate(
+    geometry: HypermutatorGeometry,
+    n_gen: int,
+    seeds: typing.Sequence[int],
+    n_ben: int,
+    mutator_init: MutatorInit,
+    topology: Topology,
+    tournament: Tournament,
+    pben: float,
+    pdel: float,
+    packed: bool = False,
+    compose_migration: bool = False,
+    sparse_mutation: bool = False,
+    counter_rng: bool = False,
+    histogram: bool = False,
+    kernel: str = "auto",
+    profile_every: typing.Optional[int] = None,
+    incremental_traits: bool = False,
+    checkpoint_path: typing.Optional[str] = None,
+    checkpoint_every: typing.Optional[int] = None,
+    resume_from: typing.Optional[str] = None,
+    summary_path: typing.Optional[str] = None,
+    summary_every: typing.Optional[int] = None,
+    fixation_every: typing.Optional[int] = None,
+    tile_offset: int = 0,
+    progress: bool = True,
+) -> typing.Tuple[SimulationState, int]:
+    """Run the hypermutator main loop for one population per seed.
+
+    See `run_engine` for parameter details. Returns final state and the
+    main loop's elapsed wall time, in nanoseconds. If `geometry` is a shard
+    of a larger population, `tile_offset` gives the global index of its
+    first tile, which labels founders and keys `counter_rng` draws.
+    """
+    if histogram:
+        if (
+            packed
+            or compose_migration
+            or sparse_mutation
+            or counter_rng
+            or profile_every is not None
+            or incremental_traits
+            or checkpoint_every is not None
+            or resume_from is not None
+            or summary_every is not None
+            or fixation_every is not None
+            or kernel == "numba"
+        ):
+            raise ValueError(
+                "histogram does not support packed, compose_migration, "
+                "sparse_mutation, counter_rng, profile_every, "
+                "incremental_traits, checkpointing, summaries, "
+                "fixation_every, or kernel='numba' (histogram mode ignores "
+                "kernel)"
+            )
+        return simulate_histogram(
+            geometry,
+            n_gen,
+            seeds,
+            n_ben,
+            mutator_init,
+            topology,
+            tournament,
+            pben,
+            pdel,
+            tile_offset=tile_offset,
+            progress=progress,
+        )
+
+    if counter_rng and sparse_mutation:
+        raise ValueError("counter_rng does not support sparse_mutation")
+    if incremental_traits and compose_migration:
+        raise ValueError(
+            "incremental_traits does not support compose_migration"
+        )
+    if (checkpoint_every is None) != (checkpoint_path is None):
+        raise ValueError("checkpoint_every and checkpoint_path go together")
+    if (summary_every is None) != (summary_path is None):
+        raise ValueError("summary_every and summary_path go together")
+    if fixation_every is not None and (
+        checkpoint_every is not None
+        or resume_from is not None
+        or summary_every is not None
+    ):
+        raise ValueError(
+            "fixation_every does not support checkpointing or summaries"
+        )
+    if (checkpoint_every is not None or resume_from is not None) and not (
+        xp is np or counter_rng
+    ):
+        raise ValueError("checkpointing on CuPy requires counter_rng")
+    rng = (
+        CounterRandomState(seeds, geometry.tile_pop_size, tile_offset)
+        if counter_rng
+        else ReplicateRandomState(seeds)
+    )
+    n_batch = len(seeds)
+
+    n_tile = geometry.n_tile
+    tile_pop_size = geometry.tile_pop_size
+    pop_size = geometry.pop_size
+
+    use_numba = _use_numba_kernel(
+        kernel,
+        tournament,
+        packed
+        or compose_migration
+        or sparse_mutation
+        or counter_rng
+        or profile_every is not None
+        or incremental_traits
+        or fixation_every is not None,
+    )
+    kernel_name = "numba" if use_numba else "numpy"
+    agent_store = PackedAgentStore if packed else SeparateAgentStore
+    agents = agent_store(
+        n_batch, pop_size, agent_offset=tile_offset * tile_pop_size
+    )
+    mutator_init.initialize(rng, agents.mutator)
+
+    last_seen0 = xp.zeros((n_batch, n_tile), dtype=xp.uint32)
+    last_seen1 = xp.zeros((n_batch, n_tile), dtype=xp.uint32)
+
+    start_generation = 0
+    checkpoint = None
+    if resume_from is not None:
+        checkpoint = load_checkpoint(resume_from)
+        _check_resumable(checkpoint, seeds, kernel_name, agents.ben.shape)
+        start_generation = int(checkpoint["generation"])
+        live = [*_agent_fields(agents), last_seen0, last_seen1]
+        for name, field in zip(_CHECKPOINT_FIELDS, live):
+            field[:] = xp.asarray(checkpoint[name])
+        rng.set_state(
+            {
+                name[len("rng_") :]: value
+                for name, value in checkpoint.items()
+                if name.startswith("rng_")
+            }
+        )
+
+    def mutate() -> None:
+        pop_ben, pop_del, pop_mutator = agents.ben, agents.del_, agents.mutator
+        converted = mutator_init.mutate(
+            rng, pop_mutator, pben, sparse=sparse_mutation
+        )
+        if tracker is not None:
+            tracker.converted(converted)
+
+        if sparse_mutation:
+            ben_sites = sample_mutation_sites(rng, pben, pop_size, pop_mutator)
+            for row, sites in zip(pop_ben, ben_sites):
+                xp.add.at(row, sites, 1)
+                row[sites] = xp.minimum(row[sites], n_ben)
+
+            del_sites = sample_mutation_sites(rng, pdel, pop_size, pop_mutator)
+            for row, sites in zip(pop_del, del_sites):
+                xp.add.at(row, sites, 1)
+            return
+
+        pop_ben[:] += rng.poisson(pben * pop_mutator)
+        pop_ben[pop_ben > n_ben] = n_ben
+        pop_del[:] += rng.poisson(pdel * pop_mutator)
+
+    group_min, group_max = topology.selection_bounds(geometry)
+    tcm = topology.migration_permutation(geometry)
+    tracker = (
+        TraitTracker(geometry, agents.mutator, group_min, tcm)
+        if incremental_traits
+        else None
+    )
+
+    freezer = (
+        None
+        if fixation_every is None
+        else SubgridFreezer(
+            geometry,
+            n_batch,
+            n_gen,
+            wildtype_absorbing=mutator_init.denovo_rate(pben) == 0,
+        )
+    )
+
+    def select() -> None:
+        fitness = agents.ben - agents.del_
+
+        tc_win = tournament.select(rng, fitness, group_min, group_max)
+        if compose_migration and tcm is not None:
+            # migration fills slot j from slot tcm[j], so after selection
+            # slot j holds the winner of tournament tcm[j]
+            tc_win = xp.take(tc_win, tcm, axis=-1)
+
+        agents.gather(tc_win)
+        if tracker is not None:
+            tracker.selected(agents.mutator)
+
+    def migrate() -> None:
+        if tcm is None or compose_migration:
+            return
+
+        if tracker is None:
+            agents.permute(tcm)
+        else:
+            before = tracker.before_migration(agents.mutator)
+            agents.permute(tcm)
+            tracker.migrated(agents.mutator, before)
+
+    def tile_trait(pop_mutator: "xp.ndarray") -> "xp.ndarray":
+        if tracker is not None:
+            return tracker.count
+        return (pop_mutator != 1).reshape(n_batch, n_tile, -1).sum(axis=-1)
+
+    def last_seen(generation: int) -> None:
+        trait = tile_trait(agents.mutator)
+        last_seen0[trait < tile_pop_size] = generation
+        last_seen1[trait > 0] = generation
+
+    fields = _agent_fields(agents)
+    if use_numba:
+        rng_state = seed_tile_states(seeds, n_tile)
+        if checkpoint is not None:
+            rng_state[:] = checkpoint["tile_rng"]
+        spare = [xp.empty_like(field) for field in fields]
+        mutate_args = (n_ben, pben, pdel, mutator_init.denovo_rate(pben))
+        tcm_ = tcm if tcm is not None else xp.arange(pop_size, dtype=xp.int32)
+
+        def step(generation: int) -> None:
+            nonlocal fields, spare
+            if generation == 0:
+                mutate_kernel(
+                    *fields[:3], rng_state, tile_pop_size, *mutate_args
+                )
+
+            generation_kernel(
+                *fields,
+                *spare,
+                last_seen0,
+                last_seen1,
+                rng_state,
+                group_min,
+                group_max,
+                tcm_,
+                tile_pop_size,
+                generation,
+                tournament.tourn_size,
+                generation + 1 < n_gen,
+                *mutate_args,
+            )
+            fields, spare = spare, fields
+
+    else:
+
+        def step(generation: int) -> None:
+            rng.start_generation(generation)
+            mutate()
+            select()
+            migrate()
+            last_seen(generation)
+
+    timer = None if profile_every is None else PhaseTimer(profile_every)
+    if timer is not None:
+        untimed_step = step
+
+        def step(generation: int) -> None:
+            if not timer.is_sampled(generation):
+                untimed_step(generation)
+                return
+
+            rng.start_generation(generation)
+            with timer.phase("mutate"):
+                mutate()
+            with timer.phase("select"):
+                select()
+            with timer.phase("migrate"):
+                migrate()
+            with timer.phase("last_seen"):
+                last_seen(generation)
+
+    def snapshot(generation: int) -> typing.Dict[str, np.ndarray]:
+        live = fields if use_numba else _agent_fields(agents)
+        arrays = {
+            name: _host_copy(field)
+            for name, field in zip(
+                _CHECKPOINT_FIELDS, [*live, last_seen0, last_seen1]
+            )
+        }
+        for name, value in rng.get_state().items():
+            arrays[f"rng_{name}"] = value
+        if use_numba:
+            arrays["tile_rng"] = rng_state.copy()
+        arrays["generation"] = np.array(generation)
+        arrays["seeds"] = np.array(seeds, dtype=np.int64)
+        arrays["kernel"] = np.array(kernel_name)
+        return arrays
+
+    def summary(generation: int) -> typing.Dict[str, np.ndarray]:
+        pop_ben, pop_del, pop_mutator, pop_founder = (
+            fields if use_numba else _agent_fields(agents)
+        )
+        trait = tile_trait(pop_mutator)
+        return summarize(
+            geometry, generation, seeds, pop_ben, pop_del, pop_founder, trait
+        )
+
+    def freeze(generation: int) -> None:
+        """Retire fixed subgrids, and compact the active population if that
+        frees any slots."""
+        nonlocal agents, last_seen0, last_seen1, n_tile, pop_size
+        nonlocal group_min, group_max, tcm, tracker
+        trait = tile_trait(agents.mutator)
+        if not freezer.retire(
+            generation, agents, last_seen0, last_seen1, trait
+        ):
+            return
+        if freezer.n_active in (0, n_tile // geometry.sub_size):
+            return
+
+        agents, last_seen0, last_seen1 = freezer.compact(
+            agents, last_seen0, last_seen1, agent_store
+        )
+        slot_geometry = freezer.slot_geometry
+        n_tile, pop_size = slot_geometry.n_tile, slot_geometry.pop_size
+        group_min, group_max, tcm = freezer.slot_topology(topology)
+        if tracker is not None:
+            tracker = TraitTracker(
+                slot_geometry, agents.mutator, group_min, tcm
+            )
+
+    checkpointer = (
+        None if checkpoint_path is None else CheckpointWriter(checkpoint_path)
+    )
+    summarizer = (
+        None
+        if summary_path is None
+        else SummaryWriter(summary_path, metadata={"kernel": kernel_name})
+    )
+    generations: typing.Iterable[int] = range(start_generation, n_gen)
+    if progress:
+        import tqdm as tq
+
+        generations = tq.tqdm(
+            generations, initial=start_generation, total=n_gen
+        )
+    generation = start_generation - 1
+    start_time = time.perf_counter_ns()
+    try:
+        for generation in generations:
+            step(generation)
+            if summarizer is not None and (generation + 1) % summary_every == 0:
+                summarizer.push(summary(generation))
+            if (
+                checkpointer is not None
+                and (generation + 1) % checkpoint_every == 0
+            ):
+                checkpointer.submit(snapshot(generation + 1))
+            if freezer is not None and (generation + 1) % fixation_every == 0:
+                freeze(generation)
+                if freezer.n_active == 0:
+                    break
+    finally:
+        for writer in checkpointer, summarizer:
+            if writer is not None:
+                writer.close()
+
+    end_time = time.perf_counter_ns()
+    elapsed_ns = end_time - start_time
+
+    simulated_generations = None
+    if freezer is not None:
+        freezer.finish(generation, agents, last_seen0, last_seen1)
+        fields = [freezer.fields[name] for name in _CHECKPOINT_FIELDS[:4]]
+        last_seen0, last_seen1 = freezer.last_seen0, freezer.last_seen1
+        simulated_generations = freezer.simulated_generations
+    elif not use_numba:
+        fields = _agent_fields(agents)
+    state = SimulationState(
+        *fields,
+        last_seen0=last_seen0,
+        last_seen1=last_seen1,
+        phase_ns=None if timer is None else timer.to_dict(),
+        simulated_generations=simulated_generations,
+        kernel=kernel_name,
+    )
+    return state, elapsed_ns
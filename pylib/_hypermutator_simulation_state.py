@@ -0,0 +1,24 @@
+import typing
+
+import numpy as np
+
+from ._hypermutator_backend import xp
+
+
+class SimulationState(typing.NamedTuple):
+    """Per-agent fields, as `(n_batch, pop_size)` arrays, and per-tile last
+    generation each mutator trait value was seen, as `(n_batch, n_tile)`
+    arrays, plus per-phase timings, if profiled, and per-subgrid generations
+    simulated, as an `(n_batch, n_sub)` array, if fixed subgrids were
+    retired early, and the main loop implementation that ran: "numba",
+    "numpy", or "histogram"."""
+
+    ben: "xp.ndarray"
+    del_: "xp.ndarray"
+    mutator: "xp.ndarray"
+    founder: "xp.ndarray"
+    last_seen0: "xp.ndarray"
+    last_seen1: "xp.ndarray"
+    phase_ns: typing.Optional[typing.Dict[str, np.ndarray]] = None
+    simulated_generations: typing.Optional["xp.ndarray"] = None
+    kernel: typing.Optional[str] = None
@@ -0,0 +1,57 @@
+import typing
+
+from ._hypermutator_backend import xp
+from ._hypermutator_rng import ReplicateRandomState
+
+
+def sample_mutation_sites(
+    rng: ReplicateRandomState,
+    rate: float,
+    pop_size: int,
+    weights: typing.Optional["xp.ndarray"] = None,
+) -> typing.List["xp.ndarray"]:
+    """Sample rare mutation events without a per-agent random draw.
+
+    For each replicate, each agent independently receives
+    Poisson(`rate` * weight) events, where weight is the agent's entry in
+    `weights`, or 1 if `weights` is not provided. This matches drawing
+    `rng.poisson(rate * weights)` agent by agent in distribution, but work
+    scales with the number of events rather than with `pop_size`.
+
+    Candidate events are drawn as a Poisson process at the uniform rate
+    `rate * max_weight` per agent, scattered to uniformly random agents, and
+    then thinned by accepting each with probability weight / `max_weight`.
+    The bound `max_weight` is taken from the dtype of `weights`, so no pass
+    over the population is needed to find it.
+
+    Parameters
+    ----------
+    rng : ReplicateRandomState
+        Per-replicate random streams.
+    rate : float
+        Per-agent event rate at unit weight.
+    pop_size : int
+        Number of agents per replicate.
+    weights : xp.ndarray, optional
+        Nonnegative integer `(n_replicate, pop_size)` rate multipliers.
+
+    Returns
+    -------
+    list of xp.ndarray
+        Per replicate, agent indices of events, repeated for agents receiving
+        more than one event.
+    """
+    max_weight = 1 if weights is None else int(xp.iinfo(weights.dtype).max)
+
+    sites = []
+    for i, stream in enumerate(rng.rngs):
+        n_candidate = int(stream.poisson(rate * max_weight * pop_size))
+        candidates = stream.randint(0, pop_size, size=n_candidate)
+        if weights is not None:
+            accept = (
+                stream.rand(n_candidate) * max_weight < weights[i, candidates]
+            )
+            candidates = candidates[accept]
+        sites.append(candidates)
+
+    return sites
@@ -0,0 +1,148 @@
+import queue
+import threading
+import typing
+
+import numpy as np
+
+from ._hypermutator_backend import to_numpy, xp
+from ._hypermutator_geometry import HypermutatorGeometry
+
+
+def summarize(
+    geometry: HypermutatorGeometry,
+    generation: int,
+    seeds: typing.Sequence[int],
+    pop_ben: "xp.ndarray",
+    pop_del: "xp.ndarray",
+    pop_founder: "xp.ndarray",
+    tile_trait: "xp.ndarray",
+) -> typing.Dict[str, np.ndarray]:
+    """Per-replicate population summary, as host arrays, one row per seed.
+
+    Reduces `(n_batch, pop_size)` agent fields, plus `(n_batch, n_tile)`
+    per-tile mutator counts, on device, so only summaries are copied off.
+    Column "subgrid_fixation" holds, per subgrid, 1 if it has fixed the
+    mutator allele, 0 if it has fixed the wildtype allele, and -1 otherwise.
+    """
+    n_batch = len(seeds)
+    fitness = pop_ben - pop_del  # int8, wrapping, as ranked by selection
+    sub_pop_size = geometry.sub_size * geometry.tile_pop_size
+    sub_trait = tile_trait.reshape(n_batch, geometry.n_sub, -1).sum(axis=-1)
+    fixation = xp.full(sub_trait.shape, -1, dtype=xp.int8)
+    fixation[sub_trait == 0] = 0
+    fixation[sub_trait == sub_pop_size] = 1
+
+    # founders are byte labels, so count distinct ones per replicate by
+    # offsetting each replicate into its own run of 256 bins
+    offset = xp.arange(n_batch, dtype=xp.int64)[:, None] * 256
+    founder_counts = xp.bincount(
+        (pop_founder + offset).ravel(), minlength=n_batch * 256
+    ).reshape(n_batch, 256)
+
+    return {
+        "generation": np.full(n_batch, generation, dtype=np.uint32),
+        "seed": np.array(seeds, dtype=np.int64),
+        "mean_fitness": to_numpy(fitness.mean(axis=-1)),
+        "max_fitness": to_numpy(fitness.max(axis=-1)),
+        "mutator_fraction": to_numpy(
+            tile_trait.sum(axis=-1) / geometry.pop_size
+        ),
+        "founder_diversity": to_numpy(
+            (founder_counts > 0).sum(axis=-1).astype(xp.uint16)
+        ),
+        "n_subgrid_fixed_mutator": to_numpy((fixation == 1).sum(axis=-1)),
+        "n_subgrid_fixed_wildtype": to_numpy((fixation == 0).sum(axis=-1)),
+        "subgrid_fixation": to_numpy(fixation),
+    }
+
+
+class SummaryWriter:
+    """Appends summaries from `summarize` to a Parquet file from a
+    background thread.
+
+    Summaries pass through a queue of at most `max_pending` entries, and the
+    thread buffers at most `row_group_size` rows before writing them out as
+    one row group, so memory stays bounded however long the run. `push`
+    waits only if the queue is full, i.e., if writes fall a whole queue
+    behind. The file is created with the first row group, with `metadata`,
+    if provided, as its schema's key-value metadata. Write errors are raised
+    from the next `push` or from `close`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        row_group_size: int = 4096,
+        max_pending: int = 64,
+        metadata: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> None:
+        self.path = path
+        self.metadata = metadata
+        self.row_group_size = row_group_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: typing.Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def push(self, summary: typing.Dict[str, np.ndarray]) -> None:
+        self._raise_error()
+        self._queue.put(summary)
+
+    def close(self) -> None:
+        """Flush buffered rows and close the file."""
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(
+                f"summary writer for {self.path} failed"
+            ) from self._error
+
+    def _drain(self) -> None:
+        import pyarrow.parquet as pq
+
+        writer = None
+        buffered: typing.List[typing.Dict[str, np.ndarray]] = []
+        closed = False
+        try:
+            while not closed:
+                summary = self._queue.get()
+                closed = summary is None
+                if not closed:
+                    buffered.append(summary)
+                n_buffered = sum(len(rows["seed"]) for rows in buffered)
+                if buffered and (closed or n_buffered >= self.row_group_size):
+                    table = _to_table(buffered).replace_schema_metadata(
+                        self.metadata
+                    )
+                    if writer is None:
+                        writer = pq.ParquetWriter(self.path, table.schema)
+                    writer.write_table(table)
+                    buffered.clear()
+        except BaseException as e:
+            self._error = e
+            while not closed:  # keep pushes from blocking until closed
+                closed = self._queue.get() is None
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def _to_table(summaries: typing.List[typing.Dict[str, np.ndarray]]):
+    import pyarrow as pa
+
+    columns = {
+        name: np.concatenate([summary[name] for summary in summaries])
+        for name in summaries[0]
+    }
+    fixation = columns.pop("subgrid_fixation")
+    return pa.table(
+        {
+            **columns,
+            "subgrid_fixation": pa.FixedSizeListArray.from_arrays(
+                fixation.ravel(), fixation.shape[1]
+            ),
+        }
+    )
@@ -0,0 +1,142 @@
+import concurrent.futures
+import importlib
+import itertools as it
+import multiprocessing
+import os
+import typing
+
+import numpy as np
+
+from ._genome_serializer import genomes_to_hex
+from ._hypermutator_driver_config import variant_module
+
+
+def sweep_grid(**axes: typing.Sequence) -> typing.List[dict]:
+    """Configurations for every combination of `axes` values, e.g.,
+    `sweep_grid(n_ben=[1, 3], tile_pop_size=[4, 16])`."""
+    return [dict(zip(axes, values)) for values in it.product(*axes.values())]
+
+
+def partition_path(root: str, config: dict) -> str:
+    """Hive-style directory for `config` under `root`, one `key=value`
+    level per configuration key, in order."""
+    return os.path.join(
+        root, *(f"{key}={value}" for key, value in config.items())
+    )
+
+
+def replicate_table(result: dict, seed: int, n_gen: int):
+    """Per-tile results of one `n_gen`-generation replicate, as a pyarrow
+    table."""
+    import pyarrow as pa
+
+    n_tile = result["whoami"].size
+    trait_counts = result["trait_counts"].reshape(n_tile, -1)
+    last_seen = result["last_seen"].reshape(n_tile, -1)
+    simulated_generations = result.get("simulated_generations")
+    return pa.table(
+        {
+            "seed": np.full(n_tile, seed, dtype=np.uint32),
+            "tile": result["whoami"].ravel().astype(np.uint32),
+            "row": result["whereami_y"].ravel().astype(np.uint16),
+            "col": result["whereami_x"].ravel().astype(np.uint16),
+            "fitness": result["fitnesses"].ravel().astype(np.float32),
+            "bitfield": genomes_to_hex(
+                result["genomes"].astype(np.uint32), uppercase=True
+            ).to_arrow(),
+            "wildtype_count": trait_counts[:, 0].astype(np.uint16),
+            "mutator_count": trait_counts[:, 1].astype(np.uint16),
+            "wildtype_last_seen": last_seen[:, 0].astype(np.uint32),
+            "mutator_last_seen": last_seen[:, 1].astype(np.uint32),
+            "simulated_generations": (
+                np.full(n_tile, n_gen, dtype=np.uint32)
+                if simulated_generations is None
+                else simulated_generations.ravel().astype(np.uint32)
+            ),
+            "elapsed_ns": np.full(n_tile, result["elapsed_ns"], np.uint64),
+        }
+    )
+
+
+def _warm_up() -> None:
+    """Import the simulator once per worker, ahead of its first task."""
+    from . import _hypermutator_engine  # noqa: F401
+
+
+def _run_config(
+    root: str,
+    config: dict,
+    n_gen: int,
+    seed: int,
+    n_replicate: int,
+    common_kwargs: dict,
+) -> str:
+    import pyarrow.parquet as pq
+
+    kwargs = {**common_kwargs, **config}
+    variant = kwargs.pop("variant")
+    run = importlib.import_module(
+        f".{variant_module(variant)}", __package__
+    ).run
+    results = run(n_gen=n_gen, seed=seed, n_replicate=n_replicate, **kwargs)
+
+    directory = partition_path(root, config)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "part-0.parquet")
+    temp_path = f"{path}.tmp"
+    writer = None
+    for i, result in enumerate(results):
+        table = replicate_table(result, seed + i, n_gen)
+        if writer is None:
+            writer = pq.ParquetWriter(temp_path, table.schema)
+        writer.write_table(table, row_group_size=table.num_rows)
+    writer.close()
+    os.replace(temp_path, path)
+    return path
+
+
+def run_sweep(
+    configs: typing.Iterable[dict],
+    root: str,
+    n_gen: int,
+    seed: int = 1,
+    n_replicate: int = 1,
+    max_workers: typing.Optional[int] = None,
+    **common_kwargs,
+) -> typing.List[str]:
+    """Run each configuration on a pool of worker processes, writing a
+    hive-partitioned Parquet dataset under `root`.
+
+    Each configuration is a dict of `run` keyword arguments for driver
+    `variant`, which it must include, e.g., as from `sweep_grid`. Its keys
+    become partition levels, so configurations should share keys, in the
+    same order. `common_kwargs` (e.g., `n_row` and `n_col`) go to every run
+    without partitioning. Replicate `i` of every configuration is seeded
+    with `seed + i`, and is written as one row group of per-tile results.
+
+    Workers import the simulator once, at startup, and are reused across
+    configurations. Each configuration's file is written under a temporary
+    name, then renamed into place, so the dataset never holds partial
+    files. The whole sweep can then be read lazily, e.g.,
+    `pl.scan_parquet(f"{root}/**/*.parquet", hive_partitioning=True)`.
+
+    Returns paths of written files, in configuration order.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up,
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_config,
+                root,
+                config,
+                n_gen,
+                seed,
+                n_replicate,
+                common_kwargs,
+            )
+            for config in configs
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,204 @@
+import functools
+import os
+import tempfile
+import typing
+
+import numpy as np
+
+from ._hypermutator_backend import xp
+from ._hypermutator_geometry import HypermutatorGeometry
+
+
+class Topology(typing.Protocol):
+    """Strategy for the spatial structure of selection and migration."""
+
+    def selection_bounds(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Tuple["xp.ndarray", "xp.ndarray"]:
+        """Return per-slot `(group_min, group_max)` tournament bounds."""
+
+    def migration_permutation(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Optional["xp.ndarray"]:
+        """Return source index for each slot after migration, or None if the
+        topology has no migration step."""
+
+
+def _tile_selection_bounds(
+    geometry: HypermutatorGeometry,
+) -> typing.Tuple["xp.ndarray", "xp.ndarray"]:
+    tile_pop_size = geometry.tile_pop_size
+    tc0 = xp.arange(geometry.pop_size, dtype=xp.uint32)
+    group_min = tc0 - tc0 % (tile_pop_size)
+    group_max = group_min + tile_pop_size
+    return group_min, group_max
+
+
+_CACHE_VERSION = 1
+
+
+def _assert_is_permutation(tcm: np.ndarray, pop_size: int) -> None:
+    assert tcm.size == pop_size
+    assert ((0 <= tcm) & (tcm < pop_size)).all()
+    assert (np.bincount(tcm, minlength=pop_size) == 1).all()
+
+
+def _cache_path(name: str, geometry: HypermutatorGeometry) -> str:
+    cache_dir = os.environ.get(
+        "WSE_GOL_TOPOLOGY_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "wse-gol", "topology"),
+    )
+    if not cache_dir:
+        return ""
+    key = "-".join(
+        map(
+            str,
+            (
+                name,
+                _CACHE_VERSION,
+                geometry.n_row,
+                geometry.n_col,
+                geometry.n_row_subgrid,
+                geometry.n_col_subgrid,
+                geometry.tile_pop_size,
+            ),
+        )
+    )
+    return os.path.join(cache_dir, f"{key}.npy")
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_permutation(
+    name: str,
+    geometry: HypermutatorGeometry,
+    build: typing.Callable[[HypermutatorGeometry], np.ndarray],
+) -> np.ndarray:
+    """Memoize `build(geometry)` in memory and, unless the
+    `WSE_GOL_TOPOLOGY_CACHE` directory is set empty, on disk."""
+    path = _cache_path(name, geometry)
+    if path and os.path.exists(path):
+        tcm = np.load(path)
+        _assert_is_permutation(tcm, geometry.pop_size)
+        return tcm
+
+    tcm = build(geometry)
+    _assert_is_permutation(tcm, geometry.pop_size)
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(path), suffix=".npy", delete=False
+            ) as file:
+                np.save(file, tcm)
+            os.replace(file.name, path)  # atomic, so readers never see partial
+        except OSError:
+            pass  # caching is best effort
+    return tcm
+
+
+def _tile_subgrids(
+    geometry: HypermutatorGeometry, local: np.ndarray
+) -> np.ndarray:
+    """Repeat a one-subgrid permutation over all subgrids."""
+    offsets = np.arange(geometry.n_sub) * local.size
+    return (local[None, :] + offsets[:, None]).ravel().astype(np.int32)
+
+
+def _build_ring_permutation(geometry: HypermutatorGeometry) -> np.ndarray:
+    tile_pop_size = geometry.tile_pop_size
+    n_local = geometry.sub_size * tile_pop_size
+    arange = np.arange(n_local)
+    slot = arange % tile_pop_size
+
+    tcm = arange - (slot == 0) + (slot == tile_pop_size - 1)
+    return _tile_subgrids(geometry, tcm % n_local)
+
+
+def _build_serpentine_permutation(
+    geometry: HypermutatorGeometry,
+) -> np.ndarray:
+    tile_pop_size = geometry.tile_pop_size
+    n_row_subgrid = geometry.n_row_subgrid
+    n_col_subgrid = geometry.n_col_subgrid
+    n_local = geometry.sub_size * tile_pop_size
+    arange = np.arange(n_local)
+    slot = arange % tile_pop_size
+    sub_row, sub_col = np.divmod(arange // tile_pop_size, n_col_subgrid)
+
+    tcm = arange - (slot == 0) + (slot == tile_pop_size - 1)
+
+    if n_col_subgrid > 2 and n_row_subgrid > 2:
+        # slot 1 moves forward along the serpentine, slot 2 backward; the
+        # vertical neighbor of column c is column n_col_subgrid - 1 - c
+        is_even_row = sub_row % 2 == 0
+        down = ((slot == 1) & is_even_row) | ((slot == 2) & ~is_even_row)
+        up = ((slot == 1) & ~is_even_row) | ((slot == 2) & is_even_row)
+        down &= sub_col < n_col_subgrid - 1
+        up &= sub_col > 0
+        tcm += down * (2 * (n_col_subgrid - 1 - sub_col) + 1) * tile_pop_size
+        tcm -= up * (2 * sub_col + 1) * tile_pop_size
+
+    out_of_bounds = (tcm < 0) | (tcm >= n_local)
+    tcm[out_of_bounds] = arange[out_of_bounds]
+    return _tile_subgrids(geometry, tcm)
+
+
+class WellMixedTopology:
+    """Selection draws from the whole subgrid; there is no migration."""
+
+    def selection_bounds(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Tuple["xp.ndarray", "xp.ndarray"]:
+        group_size = geometry.sub_size * geometry.tile_pop_size
+        tc0 = xp.arange(geometry.pop_size, dtype=xp.uint32)
+        group_min = tc0 - tc0 % group_size
+        group_max = group_min + group_size
+        return group_min, group_max
+
+    def migration_permutation(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Optional["xp.ndarray"]:
+        return None
+
+
+class RingTopology:
+    """Selection draws from within each tile; migration shifts the first and
+    last agent of each tile into adjacent tiles, in subgrid order, wrapping
+    around at subgrid edges."""
+
+    def selection_bounds(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Tuple["xp.ndarray", "xp.ndarray"]:
+        return _tile_selection_bounds(geometry)
+
+    def migration_permutation(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Optional["xp.ndarray"]:
+        return xp.asarray(
+            _cached_permutation("ring", geometry, _build_ring_permutation)
+        )
+
+
+class SerpentineTopology:
+    """Selection draws from within each tile; migration shifts the first and
+    last agent of each tile into adjacent tiles, in subgrid order, without
+    wraparound.
+
+    For subgrids larger than 2x2, the second and third agent of each tile
+    additionally move between vertically adjacent subgrid rows along a
+    serpentine path.
+    """
+
+    def selection_bounds(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Tuple["xp.ndarray", "xp.ndarray"]:
+        return _tile_selection_bounds(geometry)
+
+    def migration_permutation(
+        self, geometry: HypermutatorGeometry
+    ) -> typing.Optional["xp.ndarray"]:
+        return xp.asarray(
+            _cached_permutation(
+                "serpentine", geometry, _build_serpentine_permutation
+            )
+        )
@@ -0,0 +1,59 @@
+import typing
+
+from ._hypermutator_backend import xp
+from ._hypermutator_rng import ReplicateRandomState
+
+
+class Tournament(typing.Protocol):
+    """Strategy for choosing, for every agent slot, which agent's offspring
+    fills it next generation."""
+
+    def select(
+        self,
+        rng: ReplicateRandomState,
+        fitness: "xp.ndarray",
+        group_min: "xp.ndarray",
+        group_max: "xp.ndarray",
+    ) -> "xp.ndarray":
+        """Return winner indices, one per agent slot, each drawn from within
+        `[group_min, group_max)` of that slot.
+
+        `fitness` and the returned indices are `(n_replicate, pop_size)`;
+        bounds are shared across replicates.
+        """
+
+
+class StochasticTournament:
+    """Tournament with fractional size between 1 and 2.
+
+    Each slot holds a binary tournament with probability
+    `tourn_size - 1` and otherwise copies a single random competitor. Ties go
+    to the first competitor.
+    """
+
+    def __init__(self, tourn_size: float) -> None:
+        self.tourn_size = tourn_size
+
+    def select(
+        self,
+        rng: ReplicateRandomState,
+        fitness: "xp.ndarray",
+        group_min: "xp.ndarray",
+        group_max: "xp.ndarray",
+    ) -> "xp.ndarray":
+        pop_size = fitness.shape[-1]
+        pop_tourns = xp.floor(rng.rand(pop_size) + self.tourn_size).astype(
+            xp.uint8
+        )
+        # assert (xp.clip(pop_tourns, 1, 2) == pop_tourns).all()
+
+        tc1 = rng.randint(group_min, group_max, dtype=xp.uint32)
+        tc2 = rng.randint(group_min, group_max, dtype=xp.uint32)
+        tc2[pop_tourns == 1] = tc1[pop_tourns == 1]
+
+        return xp.where(
+            xp.take_along_axis(fitness, tc1, axis=-1)
+            >= xp.take_along_axis(fitness, tc2, axis=-1),
+            tc1,
+            tc2,
+        )
@@ -0,0 +1,96 @@
+import typing
+
+from ._hypermutator_backend import xp
+from ._hypermutator_geometry import HypermutatorGeometry
+
+
+class TraitTracker:
+    """Per-tile mutator allele counts, kept current without reducing over the
+    whole population each generation.
+
+    Counts change only where agents change allele. Selection copies agents
+    within their group, so only groups carrying both alleles need recounting;
+    migration moves a fixed set of slots, whose alleles are diffed directly;
+    and de novo conversions are added as reported. Selection groups must
+    consist of whole, contiguous tiles.
+    """
+
+    def __init__(
+        self,
+        geometry: HypermutatorGeometry,
+        pop_mutator: "xp.ndarray",
+        group_min: "xp.ndarray",
+        tcm: typing.Optional["xp.ndarray"],
+    ) -> None:
+        tile_pop_size = geometry.tile_pop_size
+        n_tile = geometry.n_tile
+        self._tile_pop_size = tile_pop_size
+
+        group_start = group_min[::tile_pop_size] // tile_pop_size
+        whole_tiles = xp.repeat(group_start * tile_pop_size, tile_pop_size)
+        if (group_min != whole_tiles).any():
+            raise ValueError("trait tracking requires whole-tile groups")
+        is_start = group_start == xp.arange(n_tile, dtype=group_start.dtype)
+        starts = xp.flatnonzero(is_start)
+        self._tile_group = xp.cumsum(is_start) - 1
+        if (starts[self._tile_group] != group_start).any():
+            raise ValueError("trait tracking requires contiguous groups")
+        self._group_bounds = starts, xp.append(starts[1:], n_tile)
+        self._group_pop_size = (
+            self._group_bounds[1] - self._group_bounds[0]
+        ) * tile_pop_size
+
+        if tcm is None:
+            self._moved = None
+        else:
+            moved = xp.flatnonzero(tcm != xp.arange(tcm.size, dtype=tcm.dtype))
+            self._moved = moved
+            self._moved_tile = moved // tile_pop_size
+
+        self.count = self._recount(pop_mutator)
+
+    def _recount(self, pop_mutator: "xp.ndarray") -> "xp.ndarray":
+        n_batch = pop_mutator.shape[0]
+        return (
+            (pop_mutator != 1)
+            .reshape(n_batch, -1, self._tile_pop_size)
+            .sum(axis=-1, dtype=xp.int64)
+        )
+
+    def converted(self, sites: typing.List["xp.ndarray"]) -> None:
+        """Add per-replicate agent indices newly carrying the mutator."""
+        for count, row_sites in zip(self.count, sites):
+            xp.add.at(count, row_sites // self._tile_pop_size, 1)
+
+    def selected(self, pop_mutator: "xp.ndarray") -> None:
+        """Recount tiles whose groups carried both alleles before selection."""
+        n_batch = pop_mutator.shape[0]
+        cum = xp.zeros((n_batch, self.count.shape[1] + 1), dtype=xp.int64)
+        xp.cumsum(self.count, axis=-1, out=cum[:, 1:])
+        start, stop = self._group_bounds
+        group_count = cum[:, stop] - cum[:, start]
+        mixed = (0 < group_count) & (group_count < self._group_pop_size)
+        batch, tile = xp.nonzero(mixed[:, self._tile_group])
+        if batch.size == 0:
+            return
+
+        tiles = pop_mutator.reshape(n_batch, -1, self._tile_pop_size)
+        self.count[batch, tile] = (tiles[batch, tile] != 1).sum(axis=-1)
+
+    def before_migration(
+        self, pop_mutator: "xp.ndarray"
+    ) -> typing.Optional["xp.ndarray"]:
+        """Snapshot alleles at slots that migration overwrites."""
+        if self._moved is None:
+            return None
+        return pop_mutator[:, self._moved] != 1
+
+    def migrated(
+        self, pop_mutator: "xp.ndarray", before: typing.Optional["xp.ndarray"]
+    ) -> None:
+        """Apply allele changes at migrated slots, given `before_migration`."""
+        if before is None:
+            return
+        after = pop_mutator[:, self._moved] != 1
+        delta = after.astype(xp.int64) - before
+        xp.add.at(self.count, (slice(None), self._moved_tile), delta)
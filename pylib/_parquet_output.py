@@ -0,0 +1,230 @@
+"""Atomic, optionally verified, background Parquet output.
+
+This module imports nothing beyond the standard library at load time, and
+uses no package-relative imports, so that standalone scripts (e.g.,
+`kernel-gol/client.py`) can load it directly.
+"""
+
+import concurrent.futures
+import os
+import tempfile
+import typing
+
+VERIFY_MODES = ("rows", "describe", "none")
+
+
+def _default_file_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# read once, at import, as changing the umask affects every thread
+_FILE_MODE = _default_file_mode()
+
+
+def _verify(
+    tmp_path: str,
+    path: str,
+    n_row: int,
+    verify: str,
+    log: typing.Callable[[str], None],
+) -> None:
+    if verify != "none":
+        import pyarrow.parquet as pq
+
+        n_written = pq.read_metadata(tmp_path).num_rows
+        if n_written != n_row:
+            raise RuntimeError(
+                f"row count mismatch between written and original frames "
+                f"for {path}: {n_written=}, {n_row=}"
+            )
+        log(f"- verified {n_row} rows")
+    if verify == "describe":
+        import polars as pl
+
+        log("- LazyFrame describe:")
+        log(str(pl.scan_parquet(tmp_path).describe()))
+
+
+def write_parquet_atomic(
+    df: "pl.DataFrame",  # noqa: F821
+    path: str,
+    verify: str = "rows",
+    compression: str = "lz4",
+    log: typing.Callable[[str], None] = print,
+) -> None:
+    """Write `df` to Parquet at `path`, atomically.
+
+    The file is written to a temporary file in the same directory, checked,
+    and renamed into place, so `path` only ever holds a complete, verified
+    file. With `verify` "rows", the row count recorded in the file footer
+    is checked against `df`, which reads metadata only. With "describe",
+    the written file is also scanned in full and its summary statistics
+    logged. With "none", the file is not checked.
+    """
+    if verify not in VERIFY_MODES:
+        raise ValueError(f"{verify=} not one of {VERIFY_MODES}")
+
+    log(f"saving df to {path=}")
+    log(f"- {df.shape=}")
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".pqt.tmp")
+    os.close(fd)
+    try:
+        df.write_parquet(tmp_path, compression=compression)
+        file_size_mb = os.path.getsize(tmp_path) / (1024 * 1024)
+        log(f"- write_parquet complete, {file_size_mb:.2f} MB")
+
+        _verify(tmp_path, path, len(df), verify, log)
+        os.chmod(tmp_path, _FILE_MODE)  # mkstemp creates files owner-only
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    log(f"- saved {path}")
+
+
+class ParquetOutput:
+    """Writes dataframes with `write_parquet_atomic` from a background
+    thread, so that the next dataframe can be built during I/O.
+
+    At most one write is in flight; submitting another first waits for it,
+    which bounds memory to two dataframes. Write errors are raised from the
+    next `submit` or from `close`.
+    """
+
+    def __init__(
+        self,
+        verify: str = "rows",
+        compression: str = "lz4",
+        log: typing.Callable[[str], None] = print,
+    ) -> None:
+        if verify not in VERIFY_MODES:
+            raise ValueError(f"{verify=} not one of {VERIFY_MODES}")
+        self.verify = verify
+        self.compression = compression
+        self.log = log
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._pending: typing.Optional[concurrent.futures.Future] = None
+
+    def submit(self, df: "pl.DataFrame", path: str) -> None:  # noqa: F821
+        """Queue a write of `df` to `path`."""
+        self.wait()
+        self._pending = self._executor.submit(
+            write_parquet_atomic,
+            df,
+            path,
+            verify=self.verify,
+            compression=self.compression,
+            log=self.log,
+        )
+
+    def wait(self) -> None:
+        """Block until any in-flight write completes."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self) -> "ParquetOutput":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ParquetChunkWriter:
+    """Appends dataframes to one Parquet file, each as its own row group,
+    from a background thread, so that a large table can be written without
+    ever being held in memory whole.
+
+    The file is written under a temporary name in the destination directory,
+    then verified as by `write_parquet_atomic` and renamed into place by
+    `close`. All chunks must share a schema. At most one append is in
+    flight; writing another chunk first waits for it. Write errors are
+    raised from the next `write` or from `close`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        verify: str = "rows",
+        compression: str = "lz4",
+        log: typing.Callable[[str], None] = print,
+    ) -> None:
+        if verify not in VERIFY_MODES:
+            raise ValueError(f"{verify=} not one of {VERIFY_MODES}")
+        self.path = path
+        self.verify = verify
+        self.compression = compression
+        self.log = log
+        self.n_row = 0
+        dirname = os.path.dirname(os.path.abspath(path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=dirname, suffix=".pqt.tmp")
+        os.close(fd)
+        self._writer = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._pending: typing.Optional[concurrent.futures.Future] = None
+
+    def write(self, df: "pl.DataFrame") -> None:  # noqa: F821
+        """Queue an append of `df` as a row group."""
+        self.wait()
+        self._pending = self._executor.submit(self._append, df)
+
+    def wait(self) -> None:
+        """Block until any in-flight append completes."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self) -> None:
+        """Finish the file and move it into place."""
+        try:
+            self.wait()
+            if self._writer is None:
+                raise RuntimeError(f"no chunks written to {self.path}")
+            self._writer.close()
+            self._writer = None
+            _verify(
+                self._tmp_path, self.path, self.n_row, self.verify, self.log
+            )
+            os.chmod(self._tmp_path, _FILE_MODE)
+            os.replace(self._tmp_path, self.path)
+            self.log(f"- saved {self.path}")
+        except BaseException:
+            if self._writer is not None:
+                self._writer.close()
+            os.unlink(self._tmp_path)
+            raise
+        finally:
+            self._executor.shutdown()
+
+    def abort(self) -> None:
+        """Discard the file, e.g., after an error producing chunks."""
+        try:
+            self.wait()
+        except BaseException:
+            pass
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            os.unlink(self._tmp_path)
+            self._executor.shutdown()
+
+    def _append(self, df: "pl.DataFrame") -> None:  # noqa: F821
+        import pyarrow.parquet as pq
+
+        table = df.to_arrow()
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self._tmp_path, table.schema, compression=self.compression
+            )
+        self._writer.write_table(table, row_group_size=table.num_rows)
+        self.n_row += table.num_rows
@@ -0,0 +1,63 @@
+"""Host-side layouts of per-tile values.
+
+Each conversion is a single reshape/transpose, returning a view where the
+source memory order allows and otherwise making one copy. This module
+depends only on numpy, and uses no package-relative imports, so that
+standalone scripts (e.g., `kernel-gol/client.py`) can load it directly.
+"""
+
+import numpy as np
+
+
+def subgrid_major_to_grid(
+    x: np.ndarray,
+    n_sub_row: int,
+    n_sub_col: int,
+    n_row_subgrid: int,
+    n_col_subgrid: int,
+) -> np.ndarray:
+    """Rearrange `(n_tile, ...)` per-tile values from subgrid-major order
+    into a `(n_row, n_col, ...)` grid.
+
+    In subgrid-major order, each run of `n_row_subgrid * n_col_subgrid`
+    consecutive tiles is one subgrid in row-major order, and subgrids are
+    themselves laid out row-major over the grid. Trailing axes are carried
+    along unchanged.
+    """
+    trailing = x.shape[1:]
+    blocks = x.reshape(
+        n_sub_row, n_sub_col, n_row_subgrid, n_col_subgrid, *trailing
+    )
+    return blocks.swapaxes(1, 2).reshape(
+        n_sub_row * n_row_subgrid, n_sub_col * n_col_subgrid, *trailing
+    )
+
+
+def grid_to_subgrid_major(
+    grid: np.ndarray,
+    n_sub_row: int,
+    n_sub_col: int,
+    n_row_subgrid: int,
+    n_col_subgrid: int,
+) -> np.ndarray:
+    """Inverse of `subgrid_major_to_grid`, flattening a `(n_row, n_col,
+    ...)` grid into `(n_tile, ...)` subgrid-major order."""
+    trailing = grid.shape[2:]
+    blocks = grid.reshape(
+        n_sub_row, n_row_subgrid, n_sub_col, n_col_subgrid, *trailing
+    )
+    return blocks.swapaxes(1, 2).reshape(-1, *trailing)
+
+
+def device_to_planes(
+    x: np.ndarray, n_row: int, n_col: int, n_word: int
+) -> np.ndarray:
+    """View a flat row-major device copy of `n_word` words per PE as
+    `(n_word, n_row, n_col)` planes, one per word."""
+    return x.reshape(n_row, n_col, n_word).transpose(2, 0, 1)
+
+
+def planes_to_device(planes: np.ndarray) -> np.ndarray:
+    """Inverse of `device_to_planes`, flattening `(n_word, n_row, n_col)`
+    planes into row-major device order."""
+    return planes.transpose(1, 2, 0).ravel()
@@ -0,0 +1,93 @@
+"""Command-line entry point for the hypermutator simulation drivers.
+
+    python -m pylib.hypermutator --variant 5050-spatial2d
+
+Settings are read from `WSE_GOL_*` environment variables. Heavy
+dependencies (numpy, polars, scipy, and the simulator itself) are imported
+only once a run starts, so `--help` and `--dry-run` return quickly.
+"""
+
+import argparse
+import dataclasses
+import os
+import sys
+import time
+import typing
+
+from ._hypermutator_driver_config import DriverConfig
+
+VARIANTS = (
+    "5050",
+    "5050-spatial",
+    "5050-spatial2d",
+    "denovo",
+    "denovo-spatial",
+    "denovo-spatial2d",
+)
+
+_LOGGED_ENV = (
+    "WSE_GOL_NCOL",
+    "WSE_GOL_NROW",
+    "WSE_GOL_NCOL_SUBGRID",
+    "WSE_GOL_NROW_SUBGRID",
+    "WSE_GOL_MSEC_AT_LEAST",
+    "WSE_GOL_TSC_AT_LEAST",
+    "WSE_GOL_NCYCLE_AT_LEAST",
+    "WSE_GOL_GLOBAL_SEED",
+    "WSE_GOL_GENOME_FLAVOR",
+    "WSE_GOL_POPSIZE",
+    "WSE_GOL_TOURNSIZE_NUMERATOR",
+    "WSE_GOL_TOURNSIZE_DENOMINATOR",
+    "NBEN",
+    "WSE_GOL_PROFILE_EVERY",
+    "WSE_GOL_CHECKPOINT_PATH",
+    "WSE_GOL_CHECKPOINT_EVERY",
+    "WSE_GOL_SUMMARY_EVERY",
+    "WSE_GOL_FIXATION_EVERY",
+    "WSE_GOL_PARQUET_VERIFY",
+)
+
+
+def _parse_args(argv: typing.Optional[typing.List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m pylib.hypermutator",
+        description=__doc__.split("\n\n")[0],
+    )
+    parser.add_argument("--variant", choices=VARIANTS, required=True)
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the configuration read from the environment and exit",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    args = _parse_args(argv)
+    print(f"pylib.hypermutator --variant {args.variant} ".ljust(70, "#"))
+    print("#" * 70)
+
+    print("- log environment variables")
+    for name in _LOGGED_ENV:
+        print(f"  - {name}={os.environ.get(name)!r}")
+
+    config = DriverConfig.from_env()
+    print("- configuration")
+    for name, value in dataclasses.asdict(config).items():
+        print(f"  - {name}={value!r}")
+    if args.dry_run:
+        print("- dry run, exiting")
+        return
+
+    print("- importing driver")
+    start = time.perf_counter()
+    from ._hypermutator_driver import drive
+
+    print(f"  - imported in {time.perf_counter() - start:.3f}s")
+
+    drive(args.variant, config)
+    print("SUCCESS!")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _topology_cache_dir(tmp_path_factory, monkeypatch):
+    # keep test runs from writing to the user's topology cache
+    cache_dir = tmp_path_factory.getbasetemp() / "topology-cache"
+    monkeypatch.setenv("WSE_GOL_TOPOLOGY_CACHE", str(cache_dir))
@@ -0,0 +1,186 @@
+import os
+
+import numpy as np
+import polars as pl
+import pyarrow.parquet as pq
+
+from pylib._fossil_surfaces import (
+    SnapshotWriter,
+    diff_surface_files,
+    surface_word_index,
+    with_data_hex,
+    write_surfaces,
+)
+from pylib._genome_serializer import binary_to_series, genomes_to_binary
+
+
+def _reference_surfaces(states, n_surf, surf_wavs, dstream_algo, metadata):
+    """Surface tables as built from one full hex-encoded frame."""
+    n_row, n_col, n_wav = states.shape
+    rows, cols = np.indices((n_row, n_col))
+    df = (
+        pl.DataFrame(
+            {
+                "data_raw": binary_to_series(
+                    genomes_to_binary(states, byteorder=">")
+                ),
+                "is_extant": True,
+                "position": pl.Series(
+                    np.arange(n_row * n_col), dtype=pl.UInt32
+                ),
+                "row": pl.Series(rows.ravel(), dtype=pl.UInt16),
+                "col": pl.Series(cols.ravel(), dtype=pl.UInt16),
+            }
+        )
+        .with_columns(
+            [
+                pl.lit(value, dtype=dtype).alias(key)
+                for key, (value, dtype) in metadata.items()
+            ]
+        )
+        .with_columns(data_hex=pl.col("data_raw").bin.encode("hex"))
+        .drop("data_raw")
+    )
+    for i in range(n_surf):
+        yield df.with_columns(
+            dstream_algo=pl.lit(dstream_algo, dtype=pl.Categorical),
+            dstream_storage_bitoffset=pl.lit(64, dtype=pl.UInt16),
+            dstream_storage_bitwidth=pl.lit(surf_wavs * 32, dtype=pl.UInt16),
+            dstream_S=pl.lit(surf_wavs * 32, dtype=pl.UInt16),
+            dstream_T_bitoffset=pl.lit(32, dtype=pl.UInt16),
+            dstream_T_bitwidth=pl.lit(32, dtype=pl.UInt16),
+            gol_state=pl.col("data_hex")
+            .str.slice(0, 8)
+            .str.to_integer(base=16),
+            data_hex=pl.concat_str(
+                pl.col("data_hex").str.head(16),
+                pl.col("data_hex").str.slice(16 + 8 * i * surf_wavs, 16),
+            ),
+        )
+
+
+def test_surface_word_index():
+    assert surface_word_index(0, 2) == [0, 1, 2, 3]
+    assert surface_word_index(2, 2) == [0, 1, 6, 7]
+
+
+def test_write_surfaces_matches_full_frame(tmp_path):
+    states = np.random.default_rng(1).integers(
+        0, 2**32, size=(5, 3, 8), dtype=np.uint32
+    )
+    metadata = {
+        "globalSeed": (1, pl.UInt32),
+        "kernel": ("gol", pl.Categorical),
+    }
+    paths = [str(tmp_path / f"a=surfaces+i={i}+ext=.pqt") for i in range(3)]
+    write_surfaces(
+        states,
+        paths,
+        surf_wavs=2,
+        dstream_algo="dstream.steady_algo",
+        metadata=metadata,
+        chunk_rows=2,
+        log=lambda line: None,
+    )
+
+    expected = _reference_surfaces(
+        states, 3, 2, "dstream.steady_algo", metadata
+    )
+    for path, reference in zip(paths, expected):
+        assert pq.ParquetFile(path).metadata.num_row_groups == 3
+        written = pl.read_parquet(path)
+        assert written.columns == reference.columns
+        assert written.schema == reference.schema
+        assert written.cast({pl.Categorical: pl.String}).equals(
+            reference.cast({pl.Categorical: pl.String})
+        )
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        path.split("/")[-1] for path in paths
+    )
+    umask = os.umask(0)
+    os.umask(umask)
+    for path in tmp_path.iterdir():
+        assert path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_write_surfaces_binary_matches_hex(tmp_path):
+    states = np.random.default_rng(2).integers(
+        0, 2**32, size=(64, 64, 8), dtype=np.uint32
+    )
+    states[:8, :, 2:] = 0  # blank surfaces
+    for data_format in "hex", "binary":
+        write_surfaces(
+            states,
+            [str(tmp_path / f"{data_format}{i}.pqt") for i in range(3)],
+            surf_wavs=2,
+            dstream_algo="dstream.steady_algo",
+            metadata={},
+            data_format=data_format,
+            log=lambda line: None,
+        )
+
+    for i in range(3):
+        hex_ = pl.scan_parquet(tmp_path / f"hex{i}.pqt")
+        binary = pl.scan_parquet(tmp_path / f"binary{i}.pqt")
+        assert with_data_hex(binary).collect().equals(hex_.collect())
+
+        blank = pl.col("data_raw").bin.ends_with(bytes(8))
+        assert binary.filter(blank).select(pl.len()).collect().item() == 512
+
+        hex_size = (tmp_path / f"hex{i}.pqt").stat().st_size
+        binary_size = (tmp_path / f"binary{i}.pqt").stat().st_size
+        assert binary_size < hex_size
+
+
+def test_snapshot_writer_double_buffered(tmp_path):
+    buffers = [np.zeros((4, 3, 8), dtype=np.uint32) for __ in range(2)]
+    snapshots = SnapshotWriter(
+        str(tmp_path / "a=surfaces+i={surface}+cycle={cycle}+ext=.pqt"),
+        n_surf=3,
+        surf_wavs=2,
+        dstream_algo="dstream.steady_algo",
+        metadata={"globalSeed": (1, pl.UInt32)},
+        log=lambda line: None,
+        data_format="binary",
+    )
+    for k, cycle in enumerate([10, 20, 30]):
+        buffer = buffers[k % 2]
+        snapshots.wait()
+        buffer[...] = cycle
+        snapshots.submit(buffer, cycle)
+    snapshots.close()
+
+    dataset = pl.read_parquet(tmp_path / "a=surfaces+i=1+cycle=*")
+    assert sorted(dataset["snapshotCycle"].unique()) == [10, 20, 30]
+    assert (dataset["gol_state"] == dataset["snapshotCycle"]).all()
+    assert len(list(tmp_path.iterdir())) == 9
+
+
+def test_diff_surface_files(tmp_path):
+    states = np.random.default_rng(3).integers(
+        0, 2**32, size=(4, 3, 8), dtype=np.uint32
+    )
+    for name, data_format, cycle in [
+        ("expected", "hex", 1),
+        ("same", "binary", 2),
+        ("other", "hex", 1),
+    ]:
+        if name == "other":
+            states[2, 1, 3] ^= 1
+        write_surfaces(
+            states,
+            [str(tmp_path / f"{name}{i}.pqt") for i in range(3)],
+            surf_wavs=2,
+            dstream_algo="dstream.steady_algo",
+            metadata={"nCycle": (cycle, pl.UInt32)},
+            data_format=data_format,
+            log=lambda line: None,
+        )
+
+    def diff(expected, actual):
+        return diff_surface_files(tmp_path / expected, tmp_path / actual)
+
+    assert diff("expected0.pqt", "same0.pqt") == []
+    assert diff("expected1.pqt", "other1.pqt") == []
+    (mismatch,) = diff("expected0.pqt", "other0.pqt")
+    assert mismatch.startswith("data_hex differs at 1 PEs, first at position=7")
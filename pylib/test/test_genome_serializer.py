@@ -0,0 +1,44 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from pylib._genome_serializer import (
+    binary_to_series,
+    genomes_to_binary,
+    genomes_to_hex,
+)
+
+
+@pytest.mark.parametrize("n_word", [1, 3])
+def test_genomes_to_hex_matches_per_tile_ints(n_word):
+    genomes = np.random.default_rng(1).integers(
+        0, 2**32, size=(4, 5, n_word), dtype=np.uint32
+    )
+    expected = [
+        np.base_repr(
+            int.from_bytes(tile.view(np.uint8).tobytes(), byteorder="big"),
+            base=16,
+        ).zfill(n_word * 8)
+        for row in genomes
+        for tile in row
+    ]
+    genome_hex = genomes_to_hex(genomes, name="bitfield", uppercase=True)
+    assert genome_hex.name == "bitfield"
+    assert genome_hex.to_list() == expected
+
+
+def test_genomes_to_binary_big_endian():
+    genomes = np.array([[[0x01020304, 0x0A0B0C0D]]], dtype=np.uint32)
+    binary = genomes_to_binary(genomes, byteorder=">")
+    assert binary.shape == (1,)
+    assert binary[0].tobytes() == bytes([1, 2, 3, 4, 10, 11, 12, 13])
+    assert genomes_to_hex(genomes, byteorder=">").to_list() == [
+        "010203040a0b0c0d"
+    ]
+
+
+def test_binary_to_series_keeps_null_bytes():
+    genomes = np.array([[0], [256]], dtype=np.uint32)
+    series = binary_to_series(genomes_to_binary(genomes, byteorder="<"))
+    assert series.dtype == pl.Binary
+    assert series.to_list() == [b"\0\0\0\0", b"\0\1\0\0"]
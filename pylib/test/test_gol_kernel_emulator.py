@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from pylib._gol_kernel_emulator import (
+    diff_states,
+    emulate_header,
+    emulate_states,
+    kernel_generations,
+)
+
+
+def _reference_life(grid, n_gen):
+    """Bounded-edge Life, cell by cell."""
+    n_row, n_col = grid.shape
+    for __ in range(n_gen):
+        update = np.zeros_like(grid)
+        for r in range(n_row):
+            for c in range(n_col):
+                count = grid[max(r - 1, 0) : r + 2, max(c - 1, 0) : c + 2].sum()
+                count -= grid[r, c]
+                update[r, c] = count == 3 or (grid[r, c] and count == 2)
+        grid = update
+    return grid
+
+
+def test_kernel_generations():
+    assert kernel_generations(0, 8) == 0
+    assert [kernel_generations(n, 8) for n in (2, 9, 10, 40)] == [1, 1, 2, 5]
+    with pytest.raises(ValueError):
+        kernel_generations(1, 8)
+
+
+@pytest.mark.parametrize("n_cycle", [0, 2, 40, 170])
+def test_emulate_states_matches_reference_life(n_cycle):
+    initial = np.random.default_rng(1).integers(0, 2, (9, 13), dtype=np.uint32)
+    states = emulate_states(initial, n_cycle, seed=1)
+    assert states.shape == (9, 13, 8)
+
+    n_gen = kernel_generations(n_cycle, 8)
+    assert (states[..., 0] == _reference_life(initial, n_gen)).all()
+    assert (emulate_header(initial, n_cycle) == states[..., :2]).all()
+    counter = 64 + n_gen - 1 if n_gen else 0  # no launch for n_cycle 0
+    assert (states[..., 1] == states[..., 0] * counter).all()
+    assert (states[states[..., 0] == 0] == 0).all()
+    assert diff_states(states, emulate_header(initial, n_cycle)) == []
+
+
+def test_emulate_states_seeded():
+    initial = np.zeros((6, 6), dtype=np.uint32)
+    initial[1:3, 1:3] = 1  # block
+    first, second = (emulate_states(initial, 100, seed=3) for __ in range(2))
+    assert (first == second).all()
+    live = first[..., 0] != 0
+    assert (first[live, 2:] != 0).any()
+    assert not (first[~live] != 0).any()
+
+
+def test_diff_states_reports_mismatches():
+    initial = np.zeros((5, 5), dtype=np.uint32)
+    initial[2, 1:4] = 1  # blinker
+    device = emulate_states(initial, 18, seed=1)
+    emulated = emulate_header(initial, 18)
+    device[0, 0, 4] = 1
+    device[2, 2, 1] += 1
+    mismatches = diff_states(device, emulated)
+    assert len(mismatches) == 2
+    assert mismatches[0].startswith("counter differs at 1 PEs")
+    assert mismatches[1].startswith("dead surfaces differs at 1 PEs")
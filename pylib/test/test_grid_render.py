@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from pylib._grid_render import (
+    BRAILLE_CELL_SHAPE,
+    braille_image,
+    cells_image,
+    image_text,
+)
+
+
+def _reference_braille(grid, max_render_rows=None, max_render_cols=None):
+    """Braille rendering cell by cell."""
+    total_rows, total_cols = grid.shape
+    render_rows = min(total_rows, max_render_rows or total_rows)
+    render_cols = min(total_cols, max_render_cols or total_cols)
+
+    def get_cell(r, c):
+        return grid[r][c] if r < total_rows and c < total_cols else 0
+
+    bits = [(0, 0, 0x01), (1, 0, 0x02), (2, 0, 0x04), (3, 0, 0x40)]
+    bits += [(0, 1, 0x08), (1, 1, 0x10), (2, 1, 0x20), (3, 1, 0x80)]
+    return "\n".join(
+        "".join(
+            chr(
+                0x2800
+                + sum(bit for dr, dc, bit in bits if get_cell(r + dr, c + dc))
+            )
+            for c in range(0, render_cols, 2)
+        )
+        for r in range(0, render_rows, 4)
+    )
+
+
+def _reference_cells(grid, max_render_rows=None, max_render_cols=None):
+    """.cells rendering cell by cell."""
+    return "\n".join(
+        "".join("O" if val else "." for val in row[:max_render_cols])
+        for row in grid[:max_render_rows]
+    )
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (4, 2), (7, 5), (103, 210)])
+@pytest.mark.parametrize("max_render", [None, 3, 100])
+def test_renderers_match_reference(shape, max_render):
+    grid = np.random.default_rng(1).integers(0, 2, shape, dtype=np.uint32)
+
+    braille = image_text(
+        braille_image(grid), max_render, max_render, BRAILLE_CELL_SHAPE
+    )
+    assert braille == _reference_braille(grid, max_render, max_render)
+
+    cells = image_text(cells_image(grid), max_render, max_render)
+    assert cells == _reference_cells(grid, max_render, max_render)
+
+
+def test_braille_image_dots():
+    grid = np.zeros((4, 2), dtype=np.uint32)
+    assert braille_image(grid).tolist() == [[0x2800]]
+    grid[3, 1] = 1
+    assert braille_image(grid).tolist() == [[0x2880]]
+    assert image_text(braille_image(np.ones((4, 2)))) == "⣿"
+
+
+def test_image_text_empty():
+    assert image_text(cells_image(np.zeros((0, 3)))) == ""
@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+
+from pylib._hypermutator_checkpoint import load_checkpoint, save_checkpoint
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import DeNovoMutatorInit
+from pylib._hypermutator_numba_kernel import HAS_NUMBA
+from pylib._hypermutator_sharding import shard_checkpoint_path
+from pylib._hypermutator_topology import RingTopology
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=6, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+)
+kwargs = dict(
+    n_gen=20,
+    seed=3,
+    n_ben=3,
+    mutator_init=DeNovoMutatorInit(),
+    topology=RingTopology(),
+    tournament=StochasticTournament(1.5),
+    pben=0.01,
+    pdel=0.02,
+    n_replicate=2,
+)
+
+
+def test_save_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    arrays = {"a": np.arange(5), "b": np.array("numpy")}
+    save_checkpoint(path, arrays)
+    save_checkpoint(path, arrays)  # overwrites in place
+    assert os.listdir(tmp_path) == ["checkpoint.npz"]
+
+    loaded = load_checkpoint(path)
+    assert loaded.keys() == arrays.keys()
+    for name, value in arrays.items():
+        assert np.array_equal(loaded[name], value)
+
+
+def test_save_checkpoint_file_mode(tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    save_checkpoint(path, {"a": np.arange(5)})
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~umask
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(kernel="numpy"),
+        dict(kernel="numpy", counter_rng=True),
+        dict(kernel="numpy", packed=True, incremental_traits=True),
+        pytest.param(
+            dict(kernel="numba"),
+            marks=pytest.mark.skipif(not HAS_NUMBA, reason="needs numba"),
+        ),
+    ],
+)
+def test_resume_matches_uninterrupted(tmp_path, options):
+    path = str(tmp_path / "checkpoint.npz")
+    expected = run_engine(
+        geometry, checkpoint_path=path, checkpoint_every=7, **options, **kwargs
+    )
+    assert int(load_checkpoint(path)["generation"]) == 14
+
+    resumed = run_engine(geometry, resume_from=path, **options, **kwargs)
+    for res1, res2 in zip(resumed, expected):
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), key
+
+
+def test_resume_sharded_matches_uninterrupted(tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    options = dict(n_shard=2, kernel="numpy", counter_rng=True, **kwargs)
+    expected = run_engine(
+        geometry, checkpoint_path=path, checkpoint_every=7, **options
+    )
+    for shard in range(2):
+        assert os.path.exists(shard_checkpoint_path(path, shard))
+
+    resumed = run_engine(geometry, resume_from=path, **options)
+    for res1, res2 in zip(resumed, expected):
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), key
+
+
+def test_resume_rejects_mismatched_run(tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    run_engine(
+        geometry,
+        checkpoint_path=path,
+        checkpoint_every=7,
+        kernel="numpy",
+        **kwargs,
+    )
+    with pytest.raises(ValueError):
+        run_engine(
+            geometry,
+            resume_from=path,
+            kernel="numpy",
+            **{**kwargs, "seed": 4},
+        )
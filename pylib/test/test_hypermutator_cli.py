@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pylib._hypermutator_driver_config import DriverConfig
+from pylib.hypermutator import main
+
+ENV = {
+    "WSE_GOL_NCOL": "6",
+    "WSE_GOL_NROW": "6",
+    "WSE_GOL_NTRAIT": "2",
+    "WSE_GOL_GLOBAL_SEED": "1",
+    "WSE_GOL_NCYCLE_AT_LEAST": "20",
+    "WSE_GOL_MSEC_AT_LEAST": "0",
+    "WSE_GOL_TSC_AT_LEAST": "0",
+    "WSE_GOL_NCOL_SUBGRID": "3",
+    "WSE_GOL_NROW_SUBGRID": "3",
+    "WSE_GOL_POPSIZE": "4",
+    "WSE_GOL_TOURNSIZE_NUMERATOR": "3",
+    "WSE_GOL_TOURNSIZE_DENOMINATOR": "2",
+    "WSE_GOL_GENOME_FLAVOR": "test",
+    "NBEN": "3",
+}
+
+
+def test_driver_config_from_env(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.npz"
+    env = {**ENV, "WSE_GOL_CHECKPOINT_PATH": str(checkpoint_path)}
+    config = DriverConfig.from_env(env)
+    assert (config.n_row, config.n_col, config.n_wav) == (6, 6, 4)
+    assert config.tourn_size == 1.5
+    assert config.resume_from == ""
+    assert config.output_path("genomes") == (
+        "a=genomes+flavor=test+seed=1+ncycle=20+ext=.pqt"
+    )
+
+    checkpoint_path.touch()
+    assert DriverConfig.from_env(env).resume_from == str(checkpoint_path)
+
+
+def test_dry_run_skips_heavy_imports():
+    code = (
+        "import sys\n"
+        "from pylib.hypermutator import main\n"
+        "main(['--variant', 'denovo', '--dry-run'])\n"
+        "heavy = {'numpy', 'polars', 'scipy', 'pylib._hypermutator_driver'}\n"
+        "assert not heavy & sys.modules.keys(), heavy & sys.modules.keys()\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, **ENV, "PYTHONPATH": root},
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def test_driver_import_is_quiet_and_skips_pandas():
+    code = (
+        "import sys\n"
+        "import pylib._hypermutator_driver, pylib._hypermutator_5050\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert 'tqdm' not in sys.modules\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": root},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout == ""
+
+
+def test_main_rejects_unknown_variant():
+    with pytest.raises(SystemExit):
+        main(["--variant", "spatial3d"])
+
+
+def test_main_runs_variant(tmp_path, monkeypatch):
+    for key, value in ENV.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.chdir(tmp_path)
+    main(["--variant", "5050-spatial2d"])
+    outputs = sorted(path.name.split("+")[0] for path in tmp_path.iterdir())
+    assert outputs == ["a=genomes", "a=perf", "a=traits"]
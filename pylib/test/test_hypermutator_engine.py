@@ -0,0 +1,250 @@
+import numpy as np
+import pytest
+
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import (
+    DeNovoMutatorInit,
+    FiftyFiftyMutatorInit,
+)
+from pylib._hypermutator_numba_kernel import HAS_NUMBA
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    WellMixedTopology,
+)
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=6, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+)
+
+
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_run_engine_smoke(mutator_init, topology):
+    res = run_engine(
+        geometry,
+        n_gen=20,
+        seed=1,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+    )
+
+    assert res["genomes"].shape == (6, 6, 1)
+    assert res["fitnesses"].shape == (6, 6)
+    assert res["trait_counts"].shape == (6, 6, 2)
+    assert (res["trait_counts"].sum(axis=-1) == geometry.tile_pop_size).all()
+    assert res["last_seen"].shape == (6, 6, 2)
+    assert (res["last_seen"] < 20).all()
+    assert (res["genomes"] & 0xFF <= 3).all()
+
+
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_run_engine_deterministic(topology):
+    kwargs = dict(
+        n_gen=10,
+        n_ben=3,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=topology,
+        tournament=StochasticTournament(2.0),
+        pben=0.01,
+        pdel=0.02,
+    )
+    res1 = run_engine(geometry, seed=2, **kwargs)
+    res2 = run_engine(geometry, seed=2, **kwargs)
+    for key in res1.keys() - {"elapsed_ns"}:
+        assert np.array_equal(res1[key], res2[key]), key
+
+
+@pytest.mark.parametrize(
+    "options, expected",
+    [
+        (dict(), "numba" if HAS_NUMBA else "numpy"),
+        (dict(kernel="numpy"), "numpy"),
+        (dict(counter_rng=True), "numpy"),
+        (dict(histogram=True), "histogram"),
+    ],
+)
+def test_run_engine_reports_kernel(options, expected):
+    res = run_engine(
+        geometry,
+        n_gen=3,
+        seed=1,
+        n_ben=3,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=RingTopology(),
+        tournament=StochasticTournament(1.5),
+        **options,
+    )
+    assert res["kernel"] == expected
+
+
+@pytest.mark.parametrize("topology", [RingTopology(), SerpentineTopology()])
+def test_migration_permutation_stays_within_subgrid(topology):
+    tcm = topology.migration_permutation(geometry)
+    group_size = geometry.sub_size * geometry.tile_pop_size
+    assert sorted(tcm) == [*range(geometry.pop_size)]
+    assert (tcm // group_size == np.arange(tcm.size) // group_size).all()
+
+
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_run_engine_replicates_match_unbatched(mutator_init, topology):
+    kwargs = dict(
+        n_gen=15,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+    )
+    batched = run_engine(geometry, seed=5, n_replicate=3, **kwargs)
+    assert len(batched) == 3
+    for i, res1 in enumerate(batched):
+        res2 = run_engine(geometry, seed=5 + i, **kwargs)
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), (i, key)
+
+
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_run_engine_packed_matches_unpacked(mutator_init, topology):
+    kwargs = dict(
+        n_gen=15,
+        seed=3,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        n_replicate=2,
+        kernel="numpy",
+    )
+    packed = run_engine(geometry, packed=True, **kwargs)
+    unpacked = run_engine(geometry, packed=False, **kwargs)
+    for res1, res2 in zip(packed, unpacked):
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), key
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_run_engine_composed_migration_matches_two_pass(packed, topology):
+    kwargs = dict(
+        n_gen=15,
+        seed=4,
+        n_ben=3,
+        mutator_init=DeNovoMutatorInit(),
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        packed=packed,
+        kernel="numpy",
+    )
+    composed = run_engine(geometry, compose_migration=True, **kwargs)
+    two_pass = run_engine(geometry, compose_migration=False, **kwargs)
+    for key in composed.keys() - {"elapsed_ns"}:
+        assert np.array_equal(composed[key], two_pass[key]), key
+
+
+@pytest.mark.parametrize("sparse_mutation", [False, True])
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_run_engine_incremental_traits_matches_recount(
+    sparse_mutation, mutator_init, topology
+):
+    kwargs = dict(
+        n_gen=30,
+        seed=6,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.02,
+        pdel=0.02,
+        n_replicate=2,
+        sparse_mutation=sparse_mutation,
+        kernel="numpy",
+    )
+    incremental = run_engine(geometry, incremental_traits=True, **kwargs)
+    recount = run_engine(geometry, incremental_traits=False, **kwargs)
+    for res1, res2 in zip(incremental, recount):
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), key
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+def test_run_engine_sparse_mutation_smoke(packed, mutator_init):
+    res = run_engine(
+        geometry,
+        n_gen=20,
+        seed=1,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=SerpentineTopology(),
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        packed=packed,
+        sparse_mutation=True,
+    )
+    assert (res["trait_counts"].sum(axis=-1) == geometry.tile_pop_size).all()
+    assert (res["genomes"] & 0xFF <= 3).all()
+    assert (res["fitnesses"] <= 3).all()
+
+
+def test_run_engine_profile_every():
+    kwargs = dict(
+        n_gen=10,
+        seed=6,
+        n_ben=3,
+        mutator_init=DeNovoMutatorInit(),
+        topology=SerpentineTopology(),
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        kernel="numpy",
+    )
+    profiled = run_engine(geometry, profile_every=4, **kwargs)
+    unprofiled = run_engine(geometry, **kwargs)
+    assert "phase_ns" not in unprofiled
+    for key in unprofiled.keys() - {"elapsed_ns"}:
+        assert np.array_equal(profiled[key], unprofiled[key]), key
+
+    phase_ns = profiled["phase_ns"]
+    assert phase_ns["generation"].tolist() == [0, 4, 8]
+    for phase in "mutate", "select", "migrate", "last_seen":
+        assert phase_ns[phase].shape == (3,)
+        assert (phase_ns[phase] > 0).all()
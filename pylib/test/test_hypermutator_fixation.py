@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import (
+    DeNovoMutatorInit,
+    FiftyFiftyMutatorInit,
+)
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    WellMixedTopology,
+)
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=9, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(),
+        dict(packed=True, incremental_traits=True),
+        dict(counter_rng=True, compose_migration=True),
+    ],
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_fixation_retires_exactly(topology, options):
+    kwargs = dict(
+        n_gen=300,
+        seed=2,
+        n_ben=3,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        n_replicate=3,
+        kernel="numpy",
+        **options,
+    )
+    frozen = run_engine(geometry, fixation_every=4, **kwargs)
+    full = run_engine(geometry, **kwargs)
+
+    first_retired = min(res["simulated_generations"].min() for res in frozen)
+    assert first_retired < 300
+    for res1, res2 in zip(frozen, full):
+        simulated = res1["simulated_generations"]
+        assert set(np.unique(simulated)) <= {*range(4, 301, 4), 300}
+
+        retired = simulated < 300
+        trait1 = res1["trait_counts"][..., 1]
+        assert np.isin(trait1[retired], [0, 4]).all()
+        assert (res1["last_seen"][retired].max(axis=-1) == 299).all()
+
+        # until the first retirement, trajectories match the full run
+        first = simulated == first_retired
+        for key in "trait_counts", "last_seen":
+            assert np.array_equal(res1[key][first], res2[key][first]), key
+
+
+def test_fixation_ends_run_early():
+    res = run_engine(
+        geometry,
+        n_gen=10_000,
+        seed=1,
+        n_ben=3,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=WellMixedTopology(),
+        tournament=StochasticTournament(1.5),
+        kernel="numpy",
+        fixation_every=10,
+    )
+    assert res["simulated_generations"].max() < 10_000
+    assert (res["last_seen"].max(axis=-1) == 9_999).all()
+
+
+def test_fixation_denovo_keeps_wildtype_subgrids():
+    res = run_engine(
+        geometry,
+        n_gen=50,
+        seed=1,
+        n_ben=3,
+        mutator_init=DeNovoMutatorInit(),
+        topology=WellMixedTopology(),
+        tournament=StochasticTournament(1.5),
+        pben=0.001,
+        kernel="numpy",
+        fixation_every=5,
+    )
+    retired = res["simulated_generations"] < 50
+    assert (res["trait_counts"][..., 1][retired] == 4).all()
+    assert (res["last_seen"][..., 0] == 49).any()
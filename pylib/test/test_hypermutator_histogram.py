@@ -0,0 +1,119 @@
+import itertools as it
+
+import numpy as np
+import pytest
+
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_histogram import winner_probabilities
+from pylib._hypermutator_mutator_init import (
+    DeNovoMutatorInit,
+    FiftyFiftyMutatorInit,
+)
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    WellMixedTopology,
+)
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=6, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=8
+)
+
+
+def test_winner_probabilities_match_enumeration():
+    fitness = np.array([0, 1, 1, 2, -1, 3, 0, 0], dtype=np.int8)
+    count = np.array([3, 1, 2, 1, 2, 1, 4, 1])
+    group = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+    p_two = 0.25
+
+    expected = np.zeros(fitness.size)
+    for g in 0, 1:
+        # enumerate agents, then all ordered pairs of competitors
+        agents = np.repeat(np.flatnonzero(group == g), count[group == g])
+        for agent in agents:
+            expected[agent] += (1 - p_two) / agents.size
+        for tc1, tc2 in it.product(agents, repeat=2):
+            winner = tc1 if fitness[tc1] >= fitness[tc2] else tc2
+            expected[winner] += p_two / agents.size**2
+
+    actual = winner_probabilities(group, fitness, count, p_two)
+    assert np.allclose(actual, expected)
+
+
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_histogram_replicates_match_unbatched(mutator_init, topology):
+    kwargs = dict(
+        n_gen=20,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        histogram=True,
+    )
+    batched = run_engine(geometry, seed=5, n_replicate=2, **kwargs)
+    for i, res1 in enumerate(batched):
+        assert res1["genomes"].shape == (6, 6, 1)
+        assert (res1["trait_counts"].sum(axis=-1) == 8).all()
+        assert (res1["last_seen"] < 20).all()
+        assert (res1["genomes"] & 0xFF <= 3).all()
+
+        res2 = run_engine(geometry, seed=5 + i, **kwargs)
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), (i, key)
+
+
+@pytest.mark.parametrize("topology", [WellMixedTopology(), RingTopology()])
+def test_histogram_matches_agents_in_distribution(topology):
+    kwargs = dict(
+        n_gen=30,
+        seed=1,
+        n_ben=8,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.002,
+        pdel=0.004,
+        n_replicate=16,
+    )
+
+    def summarize(results):
+        fitness = np.mean([res["fitnesses"].mean() for res in results])
+        trait1 = np.mean(
+            [res["trait_counts"][..., 1].mean() for res in results]
+        )
+        return fitness, trait1 / geometry.tile_pop_size
+
+    agents_fitness, agents_trait1 = summarize(
+        run_engine(geometry, kernel="numpy", **kwargs)
+    )
+    hist_fitness, hist_trait1 = summarize(
+        run_engine(geometry, histogram=True, **kwargs)
+    )
+    assert abs(agents_fitness - hist_fitness) < 0.6
+    assert abs(agents_trait1 - hist_trait1) < 0.1
+
+
+@pytest.mark.parametrize("options", [dict(packed=True), dict(kernel="numba")])
+def test_histogram_rejects_unsupported(options):
+    with pytest.raises(ValueError):
+        run_engine(
+            geometry,
+            n_gen=1,
+            seed=1,
+            n_ben=3,
+            mutator_init=FiftyFiftyMutatorInit(),
+            topology=WellMixedTopology(),
+            tournament=StochasticTournament(1.5),
+            histogram=True,
+            **options,
+        )
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import (
+    DeNovoMutatorInit,
+    FiftyFiftyMutatorInit,
+)
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    WellMixedTopology,
+)
+from pylib._hypermutator_tournament import StochasticTournament
+
+pytest.importorskip("numba")
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=6, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+)
+
+
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_numba_kernel_replicates_match_unbatched(mutator_init, topology):
+    kwargs = dict(
+        n_gen=20,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        kernel="numba",
+    )
+    batched = run_engine(geometry, seed=5, n_replicate=3, **kwargs)
+    for i, res1 in enumerate(batched):
+        res2 = run_engine(geometry, seed=5 + i, **kwargs)
+        assert (res1["trait_counts"].sum(axis=-1) == 4).all()
+        assert (res1["last_seen"] < 20).all()
+        assert (res1["genomes"] & 0xFF <= 3).all()
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), (i, key)
+
+
+def test_numba_kernel_matches_numpy_in_distribution():
+    kwargs = dict(
+        n_gen=30,
+        seed=1,
+        n_ben=8,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=RingTopology(),
+        tournament=StochasticTournament(1.5),
+        pben=0.002,
+        pdel=0.004,
+        n_replicate=16,
+    )
+
+    def summarize(results):
+        fitness = np.mean([res["fitnesses"].mean() for res in results])
+        trait1 = np.mean(
+            [res["trait_counts"][..., 1].mean() for res in results]
+        )
+        return fitness, trait1 / geometry.tile_pop_size
+
+    numpy_fitness, numpy_trait1 = summarize(
+        run_engine(geometry, kernel="numpy", **kwargs)
+    )
+    numba_fitness, numba_trait1 = summarize(
+        run_engine(geometry, kernel="numba", **kwargs)
+    )
+    assert abs(numpy_fitness - numba_fitness) < 0.5
+    assert abs(numpy_trait1 - numba_trait1) < 0.15
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(kernel="fortran"),
+        dict(kernel="numba", packed=True),
+        dict(kernel="numba", sparse_mutation=True),
+    ],
+)
+def test_numba_kernel_rejects_unsupported(options):
+    with pytest.raises(ValueError):
+        run_engine(
+            geometry,
+            n_gen=1,
+            seed=1,
+            n_ben=3,
+            mutator_init=FiftyFiftyMutatorInit(),
+            topology=WellMixedTopology(),
+            tournament=StochasticTournament(1.5),
+            **options,
+        )
+
+
+def test_kernels_rank_wrapped_fitness_alike():
+    from pylib._hypermutator_numba_kernel import (
+        generation_kernel,
+        seed_tile_states,
+    )
+    from pylib._hypermutator_rng import ReplicateRandomState
+
+    # groups of two: ben=3, del_=-128 wraps to fitness -125, below 0, so it
+    # wins only binary tournaments against itself, about a quarter of slots
+    n_group = 2000
+    ben = np.tile(np.array([3, 0], dtype=np.int8), (1, n_group))
+    del_ = np.tile(np.array([-128, 0], dtype=np.int8), (1, n_group))
+    group_min = np.repeat(np.arange(0, 2 * n_group, 2), 2).astype(np.uint32)
+    group_max = group_min + 2
+
+    numpy_win = StochasticTournament(2.0).select(
+        ReplicateRandomState([1]), ben - del_, group_min, group_max
+    )
+
+    fields = [ben, del_, np.ones_like(ben, np.uint8), np.zeros_like(ben)]
+    spare = [np.empty_like(field) for field in fields]
+    generation_kernel(
+        *fields,
+        *spare,
+        np.zeros((1, n_group), dtype=np.int32),
+        np.zeros((1, n_group), dtype=np.int32),
+        seed_tile_states([1], n_group),
+        group_min,
+        group_max,
+        np.arange(2 * n_group, dtype=np.int32),
+        2,
+        0,
+        2.0,
+        False,
+        3,
+        0.0,
+        0.0,
+        0.0,
+    )
+
+    for wrapped in numpy_win % 2 == 0, spare[1] == -128:
+        assert 0.2 < wrapped.mean() < 0.3
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import (
+    DeNovoMutatorInit,
+    FiftyFiftyMutatorInit,
+)
+from pylib._hypermutator_rng import CounterRandomState, philox4x32
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    WellMixedTopology,
+)
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+@pytest.mark.parametrize(
+    "counter, key, expected",
+    [  # Random123 known-answer tests
+        (
+            (0, 0, 0, 0),
+            (0, 0),
+            (0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8),
+        ),
+        (
+            (0xFFFFFFFF,) * 4,
+            (0xFFFFFFFF,) * 2,
+            (0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD),
+        ),
+        (
+            (0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344),
+            (0xA4093822, 0x299F31D0),
+            (0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1),
+        ),
+    ],
+)
+def test_philox4x32_known_answers(counter, key, expected):
+    words = philox4x32(
+        [np.uint64(word) for word in counter], [np.uint64(word) for word in key]
+    )
+    assert [int(word) for word in words] == [*expected]
+
+
+def test_counter_random_state_partition_independent():
+    tile_pop_size, n_tile = 4, 10
+    full = CounterRandomState([1, 2], tile_pop_size)
+    part = CounterRandomState([2], tile_pop_size, tile_offset=6)
+    for rng in full, part:
+        rng.start_generation(3)
+        rng.rand(1)  # advance phase
+
+    expected = full.rand(tile_pop_size * n_tile)[1:, 6 * tile_pop_size :]
+    assert np.array_equal(part.rand(tile_pop_size * 4), expected)
+
+
+def test_counter_random_state_distributions():
+    rng = CounterRandomState([5], tile_pop_size=100)
+    rng.start_generation(0)
+    u = rng.rand(100_000)
+    assert u.shape == (1, 100_000)
+    assert ((0 <= u) & (u < 1)).all()
+    assert abs(u.mean() - 0.5) < 0.01
+
+    k = rng.poisson(np.full(100_000, 0.5))
+    assert abs(k.mean() - 0.5) < 0.02
+    assert abs(k.var() - 0.5) < 0.03
+
+    low = np.full(100_000, 10, dtype=np.uint32)
+    x = rng.randint(low, low + 3, dtype=np.uint32)
+    assert x.dtype == np.uint32
+    assert set(np.unique(x)) == {10, 11, 12}
+
+
+@pytest.mark.parametrize(
+    "mutator_init", [FiftyFiftyMutatorInit(), DeNovoMutatorInit()]
+)
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_counter_rng_sharded_matches_unsharded(mutator_init, topology):
+    geometry = HypermutatorGeometry(
+        n_row=6, n_col=9, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+    )
+    kwargs = dict(
+        n_gen=15,
+        seed=7,
+        n_ben=3,
+        mutator_init=mutator_init,
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        counter_rng=True,
+    )
+    unsharded = run_engine(geometry, n_replicate=2, **kwargs)
+    sharded = run_engine(geometry, n_replicate=2, n_shard=4, **kwargs)
+    unbatched = [run_engine(geometry, **kwargs)]
+    for res1, res2 in [*zip(unsharded, sharded), (unsharded[0], *unbatched)]:
+        for key in res1.keys() - {"elapsed_ns"}:
+            assert np.array_equal(res1[key], res2[key]), key
+
+
+def test_counter_rng_golden():
+    res = run_engine(
+        HypermutatorGeometry(
+            n_row=4, n_col=4, n_row_subgrid=2, n_col_subgrid=2, tile_pop_size=4
+        ),
+        n_gen=12,
+        seed=2024,
+        n_ben=3,
+        mutator_init=DeNovoMutatorInit(),
+        topology=SerpentineTopology(),
+        tournament=StochasticTournament(1.5),
+        pben=0.02,
+        pdel=0.05,
+        counter_rng=True,
+    )
+    # founder << 24 | mutator << 16 | del << 8 | ben
+    expected_genomes = [
+        [0x0A010002, 0x0A010000, 0x17010001, 0x17010001],
+        [0x0A010002, 0x0A010001, 0x17010101, 0x1C010002],
+        [0x27010103, 0x27010103, 0x31010201, 0x31010100],
+        [0x21010100, 0x2E010000, 0x34010002, 0x34010101],
+    ]
+    assert res["genomes"][..., 0].tolist() == expected_genomes
+    assert res["last_seen"][..., 1].tolist() == [
+        [9, 9, 0, 8],
+        [0, 0, 0, 0],
+        [2, 1, 0, 0],
+        [3, 0, 0, 0],
+    ]
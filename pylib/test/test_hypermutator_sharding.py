@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import FiftyFiftyMutatorInit
+from pylib._hypermutator_sharding import (
+    shard_geometry,
+    shard_seed,
+    shard_subgrids,
+    simulate_sharded,
+)
+from pylib._hypermutator_simulate import simulate
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    WellMixedTopology,
+)
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=9, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+)
+
+
+def test_shard_subgrids():
+    assert shard_subgrids(6, 4) == [
+        range(0, 1),
+        range(1, 3),
+        range(3, 4),
+        range(4, 6),
+    ]
+    assert shard_subgrids(2, 4) == [range(0, 1), range(1, 2)]
+    assert shard_subgrids(5, 1) == [range(0, 5)]
+
+
+@pytest.mark.parametrize(
+    "topology", [WellMixedTopology(), RingTopology(), SerpentineTopology()]
+)
+def test_simulate_sharded_matches_per_shard_simulation(topology):
+    kwargs = dict(
+        n_gen=10,
+        n_ben=3,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=topology,
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+    )
+    seeds = [1, 2]
+    state, _ = simulate_sharded(geometry, seeds=seeds, n_shard=4, **kwargs)
+    assert state.ben.shape == (2, geometry.pop_size)
+    assert state.last_seen0.shape == (2, geometry.n_tile)
+
+    agents_per_sub = geometry.sub_size * geometry.tile_pop_size
+    for shard, subgrids in enumerate(shard_subgrids(geometry.n_sub, 4)):
+        expected, _ = simulate(
+            shard_geometry(geometry, subgrids),
+            seeds=[shard_seed(seed, shard) for seed in seeds],
+            tile_offset=subgrids.start * geometry.sub_size,
+            progress=False,
+            **kwargs,
+        )
+        agent_slice = slice(
+            subgrids.start * agents_per_sub, subgrids.stop * agents_per_sub
+        )
+        tile_slice = slice(
+            subgrids.start * geometry.sub_size,
+            subgrids.stop * geometry.sub_size,
+        )
+        for field in "ben", "del_", "mutator", "founder":
+            assert np.array_equal(
+                getattr(state, field)[:, agent_slice], getattr(expected, field)
+            ), field
+        for field in "last_seen0", "last_seen1":
+            assert np.array_equal(
+                getattr(state, field)[:, tile_slice], getattr(expected, field)
+            ), field
@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+from scipy import stats as sps
+
+from pylib._hypermutator_mutator_init import DeNovoMutatorInit
+from pylib._hypermutator_rng import ReplicateRandomState
+from pylib._hypermutator_sparse_mutation import sample_mutation_sites
+
+
+def _poisson_chisquare_pvalue(counts: np.ndarray, lam: float) -> float:
+    kmax = 4
+    observed = np.bincount(np.minimum(counts, kmax), minlength=kmax + 1)
+    pmf = sps.poisson.pmf(np.arange(kmax), lam)
+    expected = np.append(pmf, 1 - pmf.sum()) * counts.size
+    return sps.chisquare(observed, expected).pvalue
+
+
+def test_sample_mutation_sites_matches_poisson():
+    pop_size = 40_000
+    rate = 0.01
+    weights = np.ones((2, pop_size), dtype=np.uint8)
+    weights[:, ::2] = 100
+
+    sites = sample_mutation_sites(
+        ReplicateRandomState([1, 2]), rate, pop_size, weights
+    )
+    assert len(sites) == 2
+    for row_sites in sites:
+        counts = np.bincount(row_sites, minlength=pop_size)
+
+        # hypermutators: each agent's count should be Poisson(1)
+        assert _poisson_chisquare_pvalue(counts[::2], rate * 100) > 0.001
+
+        # wildtype: total count should be Poisson(rate * n_wildtype)
+        n_expected = rate * pop_size / 2
+        assert abs(counts[1::2].sum() - n_expected) < 5 * math.sqrt(n_expected)
+
+
+def test_sample_mutation_sites_unweighted():
+    pop_size = 40_000
+    (sites,) = sample_mutation_sites(ReplicateRandomState([3]), 1.5, pop_size)
+    counts = np.bincount(sites, minlength=pop_size)
+    assert _poisson_chisquare_pvalue(counts, 1.5) > 0.001
+
+
+def test_sample_mutation_sites_empty():
+    (sites,) = sample_mutation_sites(ReplicateRandomState([4]), 0.0, 100)
+    assert sites.size == 0
+
+
+def test_denovo_sparse_mutate_matches_bernoulli():
+    pop_size = 100_000
+    pben = 0.05
+    pop_mutator = np.ones((1, pop_size), dtype=np.uint8)
+    DeNovoMutatorInit().mutate(
+        ReplicateRandomState([5]), pop_mutator, pben, sparse=True
+    )
+    assert set(np.unique(pop_mutator)) <= {1, 100}
+    n_mutator = (pop_mutator == 100).sum()
+    sd = math.sqrt(pop_size * pben * (1 - pben))
+    assert abs(n_mutator - pop_size * pben) < 5 * sd
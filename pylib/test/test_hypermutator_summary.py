@@ -0,0 +1,104 @@
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from pylib._hypermutator_engine import run_engine
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import FiftyFiftyMutatorInit
+from pylib._hypermutator_summary import SummaryWriter, summarize
+from pylib._hypermutator_topology import SerpentineTopology
+from pylib._hypermutator_tournament import StochasticTournament
+
+
+geometry = HypermutatorGeometry(
+    n_row=6, n_col=6, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+)
+
+
+def _summary(generation, n_row=2):
+    return {
+        "generation": np.full(n_row, generation, dtype=np.uint32),
+        "seed": np.arange(n_row),
+        "subgrid_fixation": np.zeros((n_row, 3), dtype=np.int8),
+    }
+
+
+@pytest.mark.parametrize("kernel", ["numpy", "auto"])
+def test_run_engine_summary_matches_final_state(tmp_path, kernel):
+    path = str(tmp_path / "summary.pqt")
+    results = run_engine(
+        geometry,
+        n_gen=20,
+        seed=1,
+        n_ben=3,
+        mutator_init=FiftyFiftyMutatorInit(),
+        topology=SerpentineTopology(),
+        tournament=StochasticTournament(1.5),
+        pben=0.01,
+        pdel=0.02,
+        n_replicate=2,
+        kernel=kernel,
+        summary_path=path,
+        summary_every=5,
+    )
+    metadata = pq.read_schema(path).metadata
+    assert metadata == {b"kernel": results[0]["kernel"].encode()}
+    summary = pq.read_table(path).to_pydict()
+    assert summary["generation"] == [4, 4, 9, 9, 14, 14, 19, 19]
+    assert summary["seed"] == [1, 2] * 4
+
+    for i, res in enumerate(results, start=-2):
+        trait1 = res["trait_counts"][..., 1]
+        assert summary["mutator_fraction"][i] == pytest.approx(
+            trait1.sum() / geometry.pop_size
+        )
+        sub_trait1 = geometry.to_grid(
+            np.arange(geometry.n_tile) // geometry.sub_size
+        )
+        sub_trait1 = np.bincount(sub_trait1.ravel(), weights=trait1.ravel())
+        fixation = summary["subgrid_fixation"][i]
+        assert fixation == [
+            0 if n == 0 else 1 if n == 36 else -1 for n in sub_trait1
+        ]
+        assert summary["n_subgrid_fixed_mutator"][i] == fixation.count(1)
+        assert summary["n_subgrid_fixed_wildtype"][i] == fixation.count(0)
+        assert 1 <= summary["founder_diversity"][i] <= 144
+        assert summary["max_fitness"][i] >= summary["mean_fitness"][i]
+
+
+def test_summary_writer_row_groups(tmp_path):
+    path = str(tmp_path / "summary.pqt")
+    writer = SummaryWriter(path, row_group_size=4)
+    for generation in range(5):
+        writer.push(_summary(generation))
+    writer.close()
+
+    file = pq.ParquetFile(path)
+    assert file.metadata.num_row_groups == 3
+    table = file.read().to_pydict()
+    assert table["generation"] == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert table["subgrid_fixation"] == [[0, 0, 0]] * 10
+
+
+def test_summary_writer_raises_write_errors(tmp_path):
+    writer = SummaryWriter(str(tmp_path / "missing" / "summary.pqt"))
+    writer.push(_summary(0))
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+
+def test_summarize_wraps_fitness_as_selection_does():
+    small = HypermutatorGeometry(
+        n_row=2, n_col=2, n_row_subgrid=1, n_col_subgrid=1, tile_pop_size=1
+    )
+    summary = summarize(
+        small,
+        0,
+        [1],
+        np.array([[3, 0, 0, 0]], dtype=np.int8),
+        np.array([[-128, 0, 0, 0]], dtype=np.int8),
+        np.zeros((1, 4), dtype=np.uint8),
+        np.zeros((1, 4), dtype=np.int64),
+    )
+    assert summary["max_fitness"][0] == 0  # 3 - -128 wraps to -125
+    assert summary["mean_fitness"][0] == -125 / 4
@@ -0,0 +1,65 @@
+import numpy as np
+import polars as pl
+import pyarrow.parquet as pq
+
+from pylib._hypermutator_5050_spatial2d import run
+from pylib._hypermutator_sweep import partition_path, run_sweep, sweep_grid
+
+
+def test_sweep_grid():
+    assert sweep_grid(n_ben=[1, 3], tourn_size=[1.5]) == [
+        dict(n_ben=1, tourn_size=1.5),
+        dict(n_ben=3, tourn_size=1.5),
+    ]
+    assert partition_path("root", dict(variant="5050", n_ben=3)) == (
+        "root/variant=5050/n_ben=3"
+    )
+
+
+def test_run_sweep_writes_partitioned_dataset(tmp_path):
+    configs = sweep_grid(
+        variant=["5050-spatial2d"],
+        n_ben=[1, 3],
+        tile_pop_size=[4],
+        tourn_size=[1.5, 2.0],
+        n_row_subgrid=[3],
+        n_col_subgrid=[3],
+    )
+    common = dict(n_row=6, n_col=6, kernel="numpy")
+    paths = run_sweep(
+        configs,
+        str(tmp_path),
+        n_gen=10,
+        n_replicate=2,
+        max_workers=2,
+        **common,
+    )
+    assert len(paths) == 4
+    assert not list(tmp_path.rglob("*.tmp"))
+    for path in paths:
+        assert pq.ParquetFile(path).metadata.num_row_groups == 2
+
+    dataset = pl.scan_parquet(
+        f"{tmp_path}/**/*.parquet", hive_partitioning=True
+    )
+    selected = (
+        dataset.filter((pl.col("n_ben") == 3) & (pl.col("tourn_size") == 2.0))
+        .sort("seed", "tile")
+        .collect()
+    )
+    assert selected["seed"].unique().to_list() == [1, 2]
+
+    expected = run(
+        **common,
+        **{k: v for k, v in configs[-1].items() if k != "variant"},
+        n_gen=10,
+        seed=2,
+    )
+    replicate = selected.filter(pl.col("seed") == 2)
+    assert np.array_equal(
+        replicate["mutator_count"].to_numpy(),
+        expected["trait_counts"][..., 1].ravel(),
+    )
+    assert np.array_equal(
+        replicate["fitness"].to_numpy(), expected["fitnesses"].ravel()
+    )
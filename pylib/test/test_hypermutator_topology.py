@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_topology import (
+    RingTopology,
+    SerpentineTopology,
+    _build_serpentine_permutation,
+    _cached_permutation,
+)
+
+
+def test_serpentine_permutation_3x3():
+    geometry = HypermutatorGeometry(
+        n_row=3, n_col=6, n_row_subgrid=3, n_col_subgrid=3, tile_pop_size=4
+    )
+    tcm = SerpentineTopology().migration_permutation(geometry)
+    # slot 0 from previous tile, slot 3 from next tile, slots 1 and 2 from
+    # the serpentine's vertical neighbors, i.e., column c <-> 2 - c
+    expected = np.array(
+        [
+            [0, 21, 2, 4],
+            [3, 17, 6, 8],
+            [7, 9, 10, 12],
+            [11, 13, 34, 16],
+            [15, 5, 30, 20],
+            [19, 1, 22, 24],
+            [23, 25, 26, 28],
+            [27, 29, 18, 32],
+            [31, 33, 14, 35],
+        ]
+    ).ravel()
+    assert tcm.dtype == np.int32
+    assert np.array_equal(tcm, np.concatenate([expected, expected + 36]))
+
+
+def test_ring_permutation_wraps_within_subgrid():
+    geometry = HypermutatorGeometry(
+        n_row=2, n_col=4, n_row_subgrid=2, n_col_subgrid=2, tile_pop_size=3
+    )
+    tcm = RingTopology().migration_permutation(geometry)
+    expected = np.array([11, 1, 3, 2, 4, 6, 5, 7, 9, 8, 10, 0])
+    assert np.array_equal(tcm, np.concatenate([expected, expected + 12]))
+
+
+def test_cached_permutation_round_trips_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("WSE_GOL_TOPOLOGY_CACHE", str(tmp_path))
+    geometry = HypermutatorGeometry(
+        n_row=4, n_col=4, n_row_subgrid=4, n_col_subgrid=4, tile_pop_size=5
+    )
+    tcm = _cached_permutation("test", geometry, _build_serpentine_permutation)
+    assert len(os.listdir(tmp_path)) == 1
+
+    def fail(geometry):
+        raise AssertionError("should load from disk")
+
+    _cached_permutation.cache_clear()
+    assert np.array_equal(_cached_permutation("test", geometry, fail), tcm)
+    other_geometry = HypermutatorGeometry(
+        n_row=4, n_col=4, n_row_subgrid=4, n_col_subgrid=4, tile_pop_size=6
+    )
+    with pytest.raises(AssertionError):
+        _cached_permutation("test", other_geometry, fail)
@@ -0,0 +1,47 @@
+import os
+
+import polars as pl
+import pytest
+
+from pylib._parquet_output import ParquetOutput, write_parquet_atomic
+
+
+def test_write_parquet_atomic_describe(tmp_path):
+    df = pl.DataFrame({"x": [1, 2, 3]})
+    lines = []
+    write_parquet_atomic(
+        df, str(tmp_path / "a.pqt"), verify="describe", log=lines.append
+    )
+    assert pl.read_parquet(tmp_path / "a.pqt").equals(df)
+    assert "- verified 3 rows" in lines
+    assert any("describe" in line for line in lines)
+    assert [path.name for path in tmp_path.iterdir()] == ["a.pqt"]
+
+
+def test_write_parquet_atomic_respects_umask(tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    write_parquet_atomic(
+        pl.DataFrame({"x": [1]}), str(tmp_path / "a.pqt"), log=lambda x: None
+    )
+    assert (tmp_path / "a.pqt").stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_parquet_output_writes_in_order(tmp_path):
+    with ParquetOutput(log=lambda line: None) as output:
+        for i in range(3):
+            output.submit(pl.DataFrame({"i": [i] * 10}), str(tmp_path / f"{i}"))
+    for i in range(3):
+        assert pl.read_parquet(tmp_path / f"{i}")["i"].to_list() == [i] * 10
+
+
+def test_parquet_output_raises_write_errors(tmp_path):
+    output = ParquetOutput(log=lambda line: None)
+    output.submit(pl.DataFrame({"x": [1]}), str(tmp_path / "missing" / "a"))
+    with pytest.raises(FileNotFoundError):
+        output.close()
+
+
+def test_parquet_output_rejects_verify_mode():
+    with pytest.raises(ValueError):
+        ParquetOutput(verify="full")
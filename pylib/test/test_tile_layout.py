@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._tile_layout import (
+    device_to_planes,
+    grid_to_subgrid_major,
+    planes_to_device,
+    subgrid_major_to_grid,
+)
+
+
+@pytest.mark.parametrize("shape", [(6, 9, 3, 3), (4, 4, 1, 4), (5, 2, 5, 1)])
+def test_subgrid_major_to_grid_matches_blocks(shape):
+    n_row, n_col, n_row_subgrid, n_col_subgrid = shape
+    geometry = HypermutatorGeometry(
+        n_row=n_row,
+        n_col=n_col,
+        n_row_subgrid=n_row_subgrid,
+        n_col_subgrid=n_col_subgrid,
+        tile_pop_size=1,
+    )
+    x = np.arange(geometry.n_tile)
+    subgrids = [
+        arr.reshape(n_row_subgrid, n_col_subgrid)
+        for arr in np.array_split(x, geometry.n_sub)
+    ]
+    expected = np.block(
+        [
+            subgrids[i : i + geometry.n_sub_col]
+            for i in range(0, geometry.n_sub, geometry.n_sub_col)
+        ]
+    )
+
+    grid = geometry.to_grid(x)
+    assert np.array_equal(grid, expected)
+    assert np.array_equal(geometry.from_grid(grid), x)
+
+
+def test_subgrid_major_to_grid_trailing_axes():
+    dims = (2, 3, 2, 2)
+    x = np.arange(24 * 5).reshape(24, 5)
+    grid = subgrid_major_to_grid(x, *dims)
+    assert grid.shape == (4, 6, 5)
+    for k in range(5):
+        assert np.array_equal(
+            grid[..., k], subgrid_major_to_grid(x[:, k], *dims)
+        )
+    assert np.array_equal(grid_to_subgrid_major(grid, *dims), x)
+
+
+def test_device_planes_round_trip():
+    x = np.arange(3 * 4 * 2, dtype=np.uint32)
+    planes = device_to_planes(x, 3, 4, 2)
+    assert planes.shape == (2, 3, 4)
+    assert np.shares_memory(planes, x)
+    assert planes[1, 2, 3] == x[(2 * 4 + 3) * 2 + 1]
+    assert np.array_equal(planes_to_device(planes), x)
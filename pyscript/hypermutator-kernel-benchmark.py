@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+print("pyscript/hypermutator-kernel-benchmark.py ############################")
+print("######################################################################")
+import contextlib
+import io
+
+print("- importing third-party dependencies")
+import polars as pl
+
+print("  - polars")
+
+print("- importing pylib")
+from pylib._hypermutator_geometry import HypermutatorGeometry
+from pylib._hypermutator_mutator_init import FiftyFiftyMutatorInit
+from pylib._hypermutator_numba_kernel import HAS_NUMBA
+from pylib._hypermutator_simulate import simulate
+from pylib._hypermutator_topology import SerpentineTopology
+from pylib._hypermutator_tournament import StochasticTournament
+
+print(f"  - {HAS_NUMBA=}")
+
+print("- setting up benchmark")
+n_gen = 50
+kernels = ["numpy", "numba"] if HAS_NUMBA else ["numpy"]
+records = []
+
+print("- running benchmark")
+for tile_pop_size in 4, 16, 64, 256:
+    geometry = HypermutatorGeometry(
+        n_row=60,
+        n_col=60,
+        n_row_subgrid=12,
+        n_col_subgrid=12,
+        tile_pop_size=tile_pop_size,
+    )
+    for kernel in kernels:
+        kwargs = dict(
+            n_ben=3,
+            seeds=[1],
+            mutator_init=FiftyFiftyMutatorInit(),
+            topology=SerpentineTopology(),
+            tournament=StochasticTournament(1.5),
+            pben=0.000001,
+            pdel=0.0001,
+            kernel=kernel,
+            progress=False,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulate(geometry, n_gen=1, **kwargs)  # warm up jit, caches
+            _state, elapsed_ns = simulate(geometry, n_gen=n_gen, **kwargs)
+
+        gens_per_sec = n_gen / (elapsed_ns / 1e9)
+        print(f"  - {tile_pop_size=} {kernel=} {gens_per_sec=:.1f}")
+        records.append(
+            {
+                "tile_pop_size": tile_pop_size,
+                "kernel": kernel,
+                "pop_size": geometry.pop_size,
+                "n_gen": n_gen,
+                "elapsed_ns": elapsed_ns,
+                "gens_per_sec": gens_per_sec,
+            }
+        )
+
+print("- summary")
+with pl.Config(tbl_rows=-1):
+    print(pl.DataFrame(records))
+
+print("- done!")
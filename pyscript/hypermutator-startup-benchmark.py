@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+print("pyscript/hypermutator-startup-benchmark.py ###########################")
+print("######################################################################")
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+print("- importing third-party dependencies")
+import polars as pl
+
+print("  - polars")
+
+print("- importing pylib")
+import pylib
+
+print("- setting up benchmark")
+n_rep = 10
+env = {
+    **os.environ,
+    "PYTHONPATH": os.path.dirname(os.path.dirname(pylib.__file__)),
+    "WSE_GOL_GLOBAL_SEED": "1",
+    "WSE_GOL_NCYCLE_AT_LEAST": "0",
+    "WSE_GOL_MSEC_AT_LEAST": "0",
+    "WSE_GOL_TSC_AT_LEAST": "0",
+    "WSE_GOL_NCOL_SUBGRID": "3",
+    "WSE_GOL_NROW_SUBGRID": "3",
+    "WSE_GOL_POPSIZE": "4",
+    "WSE_GOL_TOURNSIZE_NUMERATOR": "3",
+    "WSE_GOL_TOURNSIZE_DENOMINATOR": "2",
+    "WSE_GOL_GENOME_FLAVOR": "benchmark",
+    "NBEN": "3",
+}
+commands = {
+    "interpreter": ["-c", "pass"],
+    "help": ["-m", "pylib.hypermutator", "--help"],
+    "dry run": ["-m", "pylib.hypermutator", "--variant", "5050", "--dry-run"],
+    "driver import": ["-c", "import pylib._hypermutator_driver"],
+}
+records = []
+
+print("- running benchmark")
+for what, command in commands.items():
+    elapsed = []
+    for __ in range(n_rep):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *command],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        elapsed.append(time.perf_counter() - start)
+
+    median_sec = statistics.median(elapsed)
+    print(f"  - {what=} {median_sec=:.3f}")
+    records.append(
+        {
+            "what": what,
+            "n_rep": n_rep,
+            "median_sec": median_sec,
+            "min_sec": min(elapsed),
+            "max_sec": max(elapsed),
+        }
+    )
+
+print("- summary")
+with pl.Config(tbl_rows=-1):
+    print(pl.DataFrame(records))
+
+print("- done!")
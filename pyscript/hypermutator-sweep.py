@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Run a hypermutator parameter sweep into a hive-partitioned dataset.
+
+    hypermutator-sweep.py sweep.json out/
+
+where `sweep.json` holds either a list of configurations, under "configs",
+or axes to take every combination of, under "grid", plus any `run_sweep`
+keyword arguments (e.g., "n_gen", "n_replicate", "n_row", "n_col").
+"""
+
+import argparse
+import json
+
+from pylib._hypermutator_sweep import run_sweep, sweep_grid
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("spec", help="path to JSON sweep specification")
+    parser.add_argument("root", help="output dataset directory")
+    args = parser.parse_args()
+
+    with open(args.spec) as file:
+        spec = json.load(file)
+    configs = spec.pop("configs", None) or sweep_grid(**spec.pop("grid"))
+    print(f"- running {len(configs)} configurations into {args.root}")
+    for path in run_sweep(configs, args.root, **spec):
+        print(f"  - wrote {path}")
+    print("- done!")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Check that kernel-gol surface files hold the same per-PE data.
+
+    kernel-gol-compare-surfaces.py expected.pqt actual.pqt [...]
+
+Arguments pair up expected and actual files, e.g., final surfaces from a
+single-launch run and snapshot surfaces from a segmented run at the same
+cycle. Exits nonzero if any pair differs.
+"""
+
+import argparse
+import sys
+
+from pylib._fossil_surfaces import diff_surface_files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="+", help="expected, actual, ...")
+    args = parser.parse_args()
+    if len(args.paths) % 2:
+        parser.error("paths must come in expected, actual pairs")
+
+    n_differ = 0
+    for expected, actual in zip(args.paths[::2], args.paths[1::2]):
+        mismatches = diff_surface_files(expected, actual)
+        print(f"- {expected} vs {actual}: {len(mismatches)} mismatches")
+        for mismatch in mismatches:
+            print(f"  - {mismatch}")
+        n_differ += bool(mismatches)
+
+    sys.exit(n_differ > 0)